@@ -23,7 +23,9 @@ from .datasets import (
 # Tables
 from .tables import (
     add_column,
+    add_columns,
     add_synonym,
+    add_synonyms,
     add_table,
     get_schema_for_llm,
     get_table_by_id,
@@ -53,7 +55,10 @@ from .reports import (
 )
 
 # Settings
-from .settings import get_all_settings, get_setting, set_setting
+from .settings import clear_settings_cache, get_all_settings, get_setting, set_setting
+
+# Cache des réponses LLM
+from .llm_cache import clear_llm_cache, get_llm_cache, set_llm_cache
 
 # Widgets
 from .widgets import (
@@ -82,6 +87,7 @@ from .jobs import (
     reset_job_for_retry,
     update_job_result,
     update_job_status,
+    update_job_total_steps,
 )
 
 # Workflow
@@ -92,6 +98,7 @@ __all__ = [
     "WorkflowManager",
     "WorkflowStep",
     "add_column",
+    "add_columns",
     # Datasources
     "add_datasource",
     # Datasets
@@ -108,10 +115,14 @@ __all__ = [
     # Questions
     "add_suggested_question",
     "add_synonym",
+    "add_synonyms",
     # Tables
     "add_table",
     # Widgets
     "add_widget",
+    # Cache LLM
+    "clear_llm_cache",
+    "clear_settings_cache",
     "clear_widget_cache",
     # Jobs
     "create_catalog_job",
@@ -128,6 +139,7 @@ __all__ = [
     "get_catalog_jobs",
     "get_conversations",
     "get_latest_run_id",
+    "get_llm_cache",
     "get_messages",
     "get_report_by_token",
     "get_run_jobs",
@@ -142,6 +154,7 @@ __all__ = [
     "get_widgets",
     # Reports
     "save_report",
+    "set_llm_cache",
     "set_setting",
     "set_table_enabled",
     "set_widget_cache",
@@ -149,4 +162,5 @@ __all__ = [
     "toggle_table_enabled",
     "update_job_result",
     "update_job_status",
+    "update_job_total_steps",
 ]
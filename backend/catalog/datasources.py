@@ -18,6 +18,7 @@ def add_datasource(
     sync_config: dict[str, Any] | None = None,
     sync_mode: str = "full_refresh",
     ingestion_catalog: dict[str, Any] | None = None,
+    conn: Any = None,
 ) -> int | None:
     """
     Ajoute une source de données.
@@ -32,8 +33,11 @@ def add_datasource(
         sync_config: Configuration JSON pour PyAirbyte
         sync_mode: Mode de sync (full_refresh, incremental)
         ingestion_catalog: Catalogue des tables sélectionnées (JSON)
+        conn: Connexion existante (commit et fermeture à la charge de l'appelant)
     """
-    conn = get_connection()
+    own_conn = conn is None
+    if own_conn:
+        conn = get_connection()
     cursor = conn.cursor()
 
     sync_config_json = json.dumps(sync_config) if sync_config else None
@@ -61,8 +65,9 @@ def add_datasource(
         ),
     )
     datasource_id = cursor.fetchone()["id"]
-    conn.commit()
-    conn.close()
+    if own_conn:
+        conn.commit()
+        conn.close()
     return datasource_id
 
 
@@ -144,6 +149,7 @@ def update_datasource(
     is_active: bool | None = None,
     sync_mode: str | None = None,
     ingestion_catalog: dict[str, Any] | None = None,
+    data_period: str | None = None,
 ) -> bool:
     """
     Met à jour une datasource.
@@ -157,6 +163,7 @@ def update_datasource(
         is_active: Activer/désactiver (optionnel)
         sync_mode: Mode de synchronisation (optionnel)
         ingestion_catalog: Catalogue des tables sélectionnées (optionnel)
+        data_period: Période couverte par les données (optionnel)
     """
     updates = []
     params = []
@@ -182,6 +189,9 @@ def update_datasource(
     if ingestion_catalog is not None:
         updates.append("ingestion_catalog = %s")
         params.append(json.dumps(ingestion_catalog))
+    if data_period is not None:
+        updates.append("data_period = %s")
+        params.append(data_period)
 
     if not updates:
         return False
@@ -245,6 +255,33 @@ def update_sync_status(
     return affected > 0
 
 
+def reset_data_period(dataset_id: str) -> int:
+    """
+    Efface la période des données stockée sur les datasources d'un dataset.
+
+    Appelé après une synchronisation: les données DuckDB ont changé, la période
+    calculée à l'extraction n'est plus fiable et sera recalculée (NULL = à recalculer).
+
+    Args:
+        dataset_id: ID du dataset synchronisé
+
+    Returns:
+        Nombre de datasources mises à jour
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute(
+        """UPDATE datasources
+           SET data_period = NULL, updated_at = CURRENT_TIMESTAMP
+           WHERE dataset_id = %s AND data_period IS NOT NULL""",
+        (dataset_id,),
+    )
+    conn.commit()
+    affected: int = cursor.rowcount
+    conn.close()
+    return affected
+
+
 def is_sync_running(dataset_id: str) -> bool:
     """
     Vérifie si une synchronisation est en cours sur le dataset.
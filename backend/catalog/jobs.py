@@ -142,6 +142,26 @@ def update_job_result(job_id: int, result: dict[str, Any]) -> None:
         conn.close()
 
 
+def update_job_total_steps(job_id: int, total_steps: int) -> None:
+    """
+    Corrige le nombre total de steps d'un job (base du calcul de progress).
+
+    Args:
+        job_id: ID du job
+        total_steps: Nombre total de steps, connu une fois le travail planifié
+    """
+
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            "UPDATE catalog_jobs SET total_steps = %s WHERE id = %s", (total_steps, job_id)
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
 def get_catalog_job(job_id: int) -> dict[str, Any] | None:
     """Récupère un job par son ID."""
 
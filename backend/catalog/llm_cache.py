@@ -0,0 +1,58 @@
+"""
+CRUD operations for the LLM response cache.
+"""
+
+from db import get_connection
+
+
+def get_llm_cache(cache_key: str) -> str | None:
+    """Récupère une réponse LLM en cache (JSON) si elle n'a pas expiré."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute(
+        """
+        SELECT response FROM llm_cache
+        WHERE cache_key = %s
+          AND (expires_at IS NULL OR expires_at > CURRENT_TIMESTAMP)
+    """,
+        (cache_key,),
+    )
+    result = cursor.fetchone()
+    conn.close()
+    return result["response"] if result else None
+
+
+def set_llm_cache(cache_key: str, response: str, ttl_minutes: int | None = None) -> None:
+    """Met en cache une réponse LLM (JSON), avec expiration optionnelle.
+
+    Les entrées expirées sont purgées au passage (get_llm_cache les ignore déjà).
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM llm_cache WHERE expires_at < CURRENT_TIMESTAMP")
+    cursor.execute(
+        """
+        INSERT INTO llm_cache (cache_key, response, created_at, expires_at)
+        VALUES (
+            %s, %s, CURRENT_TIMESTAMP,
+            CASE WHEN %s::INTEGER IS NULL THEN NULL
+                 ELSE CURRENT_TIMESTAMP + make_interval(mins => %s::INTEGER) END
+        )
+        ON CONFLICT (cache_key) DO UPDATE SET
+            response = EXCLUDED.response,
+            created_at = EXCLUDED.created_at,
+            expires_at = EXCLUDED.expires_at
+    """,
+        (cache_key, response, ttl_minutes, ttl_minutes),
+    )
+    conn.commit()
+    conn.close()
+
+
+def clear_llm_cache() -> None:
+    """Vide tout le cache des réponses LLM."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM llm_cache")
+    conn.commit()
+    conn.close()
@@ -2,21 +2,35 @@
 CRUD operations for settings.
 """
 
+import time
 from typing import Any
 
 from db import get_connection
 
+# Valeurs déjà lues, par clé: (valeur ou None si absente, instant de lecture).
+# Invalidées par set_setting; le TTL borne le délai de prise en compte d'une
+# modification faite par un autre process (API vs worker); les tasks Celery le
+# vident au démarrage de chaque job (tasks.catalog.refresh_config_caches).
+_SETTINGS_TTL_SECONDS = 30.0
+_settings_cache: dict[str, tuple[str | None, float]] = {}
+
 
 def get_setting(key: str, default: str | None = None) -> str | None:
-    """Récupère une valeur de configuration."""
-    conn = get_connection()
-    try:
-        cursor = conn.cursor()
-        cursor.execute("SELECT value FROM settings WHERE key = %s", (key,))
-        result = cursor.fetchone()
-        return result["value"] if result else default
-    finally:
-        conn.close()
+    """Récupère une valeur de configuration (mise en cache, voir _SETTINGS_TTL_SECONDS)."""
+    cached = _settings_cache.get(key)
+    if cached is not None and time.monotonic() - cached[1] < _SETTINGS_TTL_SECONDS:
+        value = cached[0]
+    else:
+        conn = get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT value FROM settings WHERE key = %s", (key,))
+            result = cursor.fetchone()
+        finally:
+            conn.close()
+        value = result["value"] if result else None
+        _settings_cache[key] = (value, time.monotonic())
+    return default if value is None else value
 
 
 def set_setting(key: str, value: str) -> None:
@@ -33,6 +47,12 @@ def set_setting(key: str, value: str) -> None:
     )
     conn.commit()
     conn.close()
+    _settings_cache.pop(key, None)
+
+
+def clear_settings_cache() -> None:
+    """Vide le cache des settings (prochaine lecture depuis PostgreSQL)."""
+    _settings_cache.clear()
 
 
 def get_all_settings() -> dict[str, Any]:
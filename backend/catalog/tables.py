@@ -4,14 +4,27 @@ CRUD operations for tables, columns, and synonyms.
 
 from typing import Any
 
+from psycopg2.extras import execute_values
+
 from db import get_connection
 
 
 def add_table(
-    datasource_id: int, name: str, description: str | None = None, row_count: int | None = None
+    datasource_id: int,
+    name: str,
+    description: str | None = None,
+    row_count: int | None = None,
+    conn: Any = None,
 ) -> int | None:
-    """Ajoute une table au catalogue."""
-    conn = get_connection()
+    """
+    Ajoute une table au catalogue.
+
+    Si `conn` est fourni, l'insertion se fait dans sa transaction
+    (commit et fermeture à la charge de l'appelant).
+    """
+    own_conn = conn is None
+    if own_conn:
+        conn = get_connection()
     cursor = conn.cursor()
     cursor.execute(
         """
@@ -26,8 +39,9 @@ def add_table(
         (datasource_id, name, description, row_count),
     )
     table_id = cursor.fetchone()["id"]
-    conn.commit()
-    conn.close()
+    if own_conn:
+        conn.commit()
+        conn.close()
     return table_id
 
 
@@ -40,9 +54,17 @@ def add_column(
     value_range: str | None = None,
     is_primary_key: bool = False,
     full_context: str | None = None,
+    conn: Any = None,
 ) -> int | None:
-    """Ajoute une colonne au catalogue."""
-    conn = get_connection()
+    """
+    Ajoute une colonne au catalogue.
+
+    Si `conn` est fourni, l'insertion se fait dans sa transaction
+    (commit et fermeture à la charge de l'appelant).
+    """
+    own_conn = conn is None
+    if own_conn:
+        conn = get_connection()
     cursor = conn.cursor()
     cursor.execute(
         """
@@ -71,20 +93,117 @@ def add_column(
         ),
     )
     column_id = cursor.fetchone()["id"]
-    conn.commit()
-    conn.close()
+    if own_conn:
+        conn.commit()
+        conn.close()
     return column_id
 
 
+def add_columns(table_id: int, columns: list[dict[str, Any]], conn: Any = None) -> list[int]:
+    """
+    Ajoute plusieurs colonnes d'une table en une seule requête (upsert).
+
+    Args:
+        table_id: ID de la table
+        columns: Dicts avec les mêmes clés que les paramètres de add_column
+            (name, data_type, description, sample_values, value_range,
+            is_primary_key, full_context)
+        conn: Connexion existante (commit et fermeture à la charge de l'appelant)
+
+    Returns:
+        IDs des colonnes insérées ou mises à jour
+    """
+    if not columns:
+        return []
+
+    rows = [
+        (
+            table_id,
+            col["name"],
+            col["data_type"],
+            col.get("description"),
+            col.get("sample_values"),
+            col.get("value_range"),
+            col.get("is_primary_key", False),
+            col.get("full_context"),
+        )
+        for col in columns
+    ]
+
+    own_conn = conn is None
+    if own_conn:
+        conn = get_connection()
+    cursor = conn.cursor()
+    result = execute_values(
+        cursor,
+        """
+        INSERT INTO columns
+        (table_id, name, data_type, description, sample_values, value_range, is_primary_key, full_context, updated_at)
+        VALUES %s
+        ON CONFLICT (table_id, name) DO UPDATE SET
+            data_type = EXCLUDED.data_type,
+            description = EXCLUDED.description,
+            sample_values = EXCLUDED.sample_values,
+            value_range = EXCLUDED.value_range,
+            is_primary_key = EXCLUDED.is_primary_key,
+            full_context = EXCLUDED.full_context,
+            updated_at = CURRENT_TIMESTAMP
+        RETURNING id
+    """,
+        rows,
+        template="(%s, %s, %s, %s, %s, %s, %s, %s, CURRENT_TIMESTAMP)",
+        page_size=len(rows),
+        fetch=True,
+    )
+    if own_conn:
+        conn.commit()
+        conn.close()
+    return [row["id"] for row in result]
+
+
 def add_synonym(column_id: int, term: str) -> None:
-    """Ajoute un synonyme pour une colonne."""
+    """Ajoute un synonyme pour une colonne (ignoré s'il existe déjà)."""
     conn = get_connection()
     cursor = conn.cursor()
-    cursor.execute("INSERT INTO synonyms (column_id, term) VALUES (%s, %s)", (column_id, term))
+    cursor.execute(
+        "INSERT INTO synonyms (column_id, term) VALUES (%s, %s) ON CONFLICT DO NOTHING",
+        (column_id, term),
+    )
     conn.commit()
     conn.close()
 
 
+def add_synonyms(synonyms: list[tuple[int, str]], conn: Any = None) -> int:
+    """
+    Ajoute plusieurs synonymes en une seule requête (doublons ignorés).
+
+    Args:
+        synonyms: Tuples (column_id, term)
+        conn: Connexion existante (commit et fermeture à la charge de l'appelant)
+
+    Returns:
+        Nombre de synonymes réellement insérés
+    """
+    if not synonyms:
+        return 0
+
+    own_conn = conn is None
+    if own_conn:
+        conn = get_connection()
+    cursor = conn.cursor()
+    result = execute_values(
+        cursor,
+        "INSERT INTO synonyms (column_id, term) VALUES %s ON CONFLICT DO NOTHING RETURNING id",
+        synonyms,
+        page_size=len(synonyms),
+        fetch=True,
+    )
+    if own_conn:
+        conn.commit()
+        conn.close()
+    return len(result)
+
+
 def get_schema_for_llm(datasource_name: str | None = None) -> str:
     """
     Génère le schéma formaté pour le contexte LLM (text-to-SQL).
@@ -122,11 +241,10 @@ def get_schema_for_llm(datasource_name: str | None = None) -> str:
         tables = cursor.fetchall()
 
         for table in tables:
-            table_desc = f"Table: {table['name']}"
             if table["row_count"]:
-                table_desc += f" ({table['row_count']:,} lignes)"
-
-            schema_parts.append(table_desc)
+                schema_parts.append(f"Table: {table['name']} ({table['row_count']:,} lignes)")
+            else:
+                schema_parts.append(f"Table: {table['name']}")
 
             # Récupérer les colonnes
             cursor.execute(
@@ -138,25 +256,25 @@ def get_schema_for_llm(datasource_name: str | None = None) -> str:
             columns = cursor.fetchall()
 
             for col in columns:
-                col_line = f"- {col['name']} ({col['data_type']})"
+                # Morceaux de la ligne, joints une seule fois
+                col_parts = ["- ", col["name"], " (", col["data_type"], ")"]
 
-                if col["description"]:
+                description = col["description"]
+                if description:
                     # Tronquer description longue
-                    desc = (
-                        col["description"][:80] + "..."
-                        if len(col["description"] or "") > 80
-                        else col["description"]
+                    col_parts += (
+                        ": ",
+                        description[:80] + "..." if len(description) > 80 else description,
                     )
-                    col_line += f": {desc}"
 
                 if use_full and col["full_context"]:
                     # Mode FULL: ajouter le full_context (stats calculées à l'extraction)
-                    col_line += f" | {col['full_context']}"
+                    col_parts += (" | ", col["full_context"])
                 elif col["value_range"]:
                     # Mode COMPACT ou pas de full_context: juste le range
-                    col_line += f" [{col['value_range']}]"
+                    col_parts += (" [", col["value_range"], "]")
 
-                schema_parts.append(col_line)
+                schema_parts.append("".join(col_parts))
 
             schema_parts.append("")  # Ligne vide entre tables
 
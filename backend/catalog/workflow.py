@@ -4,7 +4,7 @@ Workflow manager for catalog operations.
 
 import logging
 
-from .jobs import update_job_status
+from .jobs import update_job_status, update_job_total_steps
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +34,12 @@ class WorkflowManager:
         """Retourne un context manager pour une étape du workflow."""
         return WorkflowStep(self, name)
 
+    def set_total_steps(self, total_steps: int) -> None:
+        """Corrige le nombre total de steps (ex: batches connus après planification)."""
+        if total_steps != self.total_steps:
+            self.total_steps = total_steps
+            update_job_total_steps(self.job_id, total_steps)
+
 
 class WorkflowStep:
     """Context manager pour une étape de workflow."""
@@ -19,7 +19,9 @@ la compatibilité avec les imports existants:
 # Mais si ce fichier est importé directement, il délègue au package
 from catalog_engine import (
     COMMON_PATTERNS,
+    CatalogEnrichment,
     CatalogValidationResult,
+    ColumnEnrichment,
     ColumnMetadata,
     ExtractedCatalog,
     KpiDefinition,
@@ -27,21 +29,24 @@ from catalog_engine import (
     KpiValidationResult,
     PromptMode,
     PromptNotConfiguredError,
+    TableEnrichment,
     TableMetadata,
     ValueFrequency,
     build_column_full_context,
-    build_response_model,
     check_token_limit,
     detect_pattern,
     enrich_selected_tables,
     enrich_with_llm,
+    enrichment_to_dict,
     estimate_tokens,
     extract_column_stats,
     extract_metadata_from_connection,
     extract_only,
     generate_kpis,
     generate_suggested_questions,
+    get_column_full_context,
     get_data_period,
+    get_sample_values_str,
     save_kpis,
     save_suggested_questions,
     save_to_catalog,
@@ -3,69 +3,127 @@ Moteur de génération de catalogue.
 
 Architecture:
 1. extract_metadata_from_connection() - DuckDB native
-2. build_response_model() - Pydantic create_model()
+2. CatalogEnrichment - modèle de réponse LLM statique
 3. enrich_with_llm() - llm_service.call_llm_structured()
 4. save_to_catalog() - PostgreSQL update
 5. generate_kpis() - Génération des 4 KPIs
 
 Ce module réexporte toutes les fonctions et classes publiques
 pour maintenir la compatibilité avec l'ancien catalog_engine.py.
+Les réexports sont chargés au premier accès (voir _LAZY_EXPORTS).
 """
 
-from typing import TYPE_CHECKING
-
-# Réexports depuis les sous-modules
-from .enrichment import (
-    PromptNotConfiguredError,
-    build_response_model,
-    check_token_limit,
-    enrich_with_llm,
-    estimate_tokens,
-    validate_catalog_enrichment,
-)
-from .filters import (
-    EXCLUDED_PREFIXES,
-    is_internal_column,
-    is_internal_table,
-)
-from .extraction import (
-    COMMON_PATTERNS,
-    build_column_full_context,
-    detect_pattern,
-    extract_column_stats,
-    extract_metadata_from_connection,
-)
-from .kpis import (
-    generate_kpis,
-    get_data_period,
-    save_kpis,
-    validate_all_kpis,
-    validate_kpi,
-)
-from .models import (
-    CatalogValidationResult,
-    ColumnMetadata,
-    ExtractedCatalog,
-    KpiDefinition,
-    KpisGenerationResult,
-    KpiValidationResult,
-    TableMetadata,
-    ValueFrequency,
-)
-from .persistence import (
-    save_to_catalog,
-    update_descriptions,
-)
-from .questions import generate_suggested_questions, save_suggested_questions
+import importlib
+from typing import TYPE_CHECKING, Any
 
 if TYPE_CHECKING:
-    pass
+    from .enrichment import (
+        PromptNotConfiguredError,
+        check_token_limit,
+        enrich_with_llm,
+        enrichment_to_dict,
+        estimate_tokens,
+        validate_catalog_enrichment,
+    )
+    from .filters import (
+        EXCLUDED_PREFIXES,
+        is_internal_column,
+        is_internal_table,
+    )
+    from .extraction import (
+        COMMON_PATTERNS,
+        build_column_full_context,
+        detect_pattern,
+        extract_column_stats,
+        extract_metadata_from_connection,
+        get_column_full_context,
+        get_sample_values_str,
+    )
+    from .kpis import (
+        generate_kpis,
+        get_data_period,
+        save_kpis,
+        validate_all_kpis,
+        validate_kpi,
+    )
+    from .models import (
+        CatalogEnrichment,
+        CatalogValidationResult,
+        ColumnEnrichment,
+        ColumnMetadata,
+        ExtractedCatalog,
+        KpiDefinition,
+        KpisGenerationResult,
+        KpiValidationResult,
+        TableEnrichment,
+        TableMetadata,
+        ValueFrequency,
+    )
+    from .persistence import (
+        save_to_catalog,
+        update_descriptions,
+    )
+    from .questions import generate_suggested_questions, save_suggested_questions
+    from .orchestration import enrich_selected_tables, extract_only
 
 # Type alias pour le mode de prompt
 PromptMode = str  # "compact" ou "full"
 
-# Réexports depuis orchestration (workflows complexes)
-from .orchestration import enrich_selected_tables, extract_only
+# Réexports chargés à la demande (PEP 562): importer catalog_engine.models ou
+# catalog_engine.extraction ne charge pas enrichment -> llm_service (litellm)
+_LAZY_EXPORTS: dict[str, str] = {
+    "PromptNotConfiguredError": "enrichment",
+    "check_token_limit": "enrichment",
+    "enrich_with_llm": "enrichment",
+    "enrichment_to_dict": "enrichment",
+    "estimate_tokens": "enrichment",
+    "validate_catalog_enrichment": "enrichment",
+    "EXCLUDED_PREFIXES": "filters",
+    "is_internal_column": "filters",
+    "is_internal_table": "filters",
+    "COMMON_PATTERNS": "extraction",
+    "build_column_full_context": "extraction",
+    "detect_pattern": "extraction",
+    "extract_column_stats": "extraction",
+    "extract_metadata_from_connection": "extraction",
+    "get_column_full_context": "extraction",
+    "get_sample_values_str": "extraction",
+    "generate_kpis": "kpis",
+    "get_data_period": "kpis",
+    "save_kpis": "kpis",
+    "validate_all_kpis": "kpis",
+    "validate_kpi": "kpis",
+    "CatalogEnrichment": "models",
+    "CatalogValidationResult": "models",
+    "ColumnEnrichment": "models",
+    "ColumnMetadata": "models",
+    "ExtractedCatalog": "models",
+    "KpiDefinition": "models",
+    "KpisGenerationResult": "models",
+    "KpiValidationResult": "models",
+    "TableEnrichment": "models",
+    "TableMetadata": "models",
+    "ValueFrequency": "models",
+    "save_to_catalog": "persistence",
+    "update_descriptions": "persistence",
+    "generate_suggested_questions": "questions",
+    "save_suggested_questions": "questions",
+    "enrich_selected_tables": "orchestration",
+    "extract_only": "orchestration",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value  # Résolu une seule fois
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
 
 
 # =============================================================================
@@ -77,7 +135,9 @@ __all__ = [
     "COMMON_PATTERNS",
     # Filters
     "EXCLUDED_PREFIXES",
+    "CatalogEnrichment",
     "CatalogValidationResult",
+    "ColumnEnrichment",
     "ColumnMetadata",
     "ExtractedCatalog",
     "KpiDefinition",
@@ -85,15 +145,16 @@ __all__ = [
     "KpisGenerationResult",
     "PromptMode",
     "PromptNotConfiguredError",
+    "TableEnrichment",
     "TableMetadata",
     # Models
     "ValueFrequency",
     "build_column_full_context",
-    "build_response_model",
     "check_token_limit",
     "detect_pattern",
     "enrich_selected_tables",
     "enrich_with_llm",
+    "enrichment_to_dict",
     # Enrichment
     "estimate_tokens",
     "extract_column_stats",
@@ -103,7 +164,9 @@ __all__ = [
     "generate_kpis",
     # Questions
     "generate_suggested_questions",
+    "get_column_full_context",
     "get_data_period",
+    "get_sample_values_str",
     "is_internal_column",
     "is_internal_table",
     "save_kpis",
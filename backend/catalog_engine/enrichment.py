@@ -1,22 +1,83 @@
 """
 Enrichissement LLM du catalogue.
 
-Appels LLM pour descriptions, modèle de réponse dynamique, validation.
+Appels LLM pour descriptions, conversion de la réponse, validation.
 """
 
+import hashlib
+import io
+import json
 import logging
+from functools import cache
 from typing import Any
 
-from pydantic import BaseModel, Field, create_model
+from pydantic import BaseModel
 
 logger = logging.getLogger(__name__)
 
-from llm_config import get_active_prompt
+from catalog import get_llm_cache, set_llm_cache
+from constants import CatalogConfig
+from llm_config import get_active_prompt, get_default_model
 from llm_service import call_llm_structured
 from llm_utils import EnrichmentError, call_with_retry
 
 from .filters import is_internal_column
-from .models import CatalogValidationResult, ColumnMetadata, ExtractedCatalog
+from .models import (
+    CatalogEnrichment,
+    ColumnEnrichment,
+    CatalogValidationResult,
+    ColumnMetadata,
+    ExtractedCatalog,
+)
+
+
+# =============================================================================
+# CACHE DES RÉPONSES D'ENRICHISSEMENT
+# =============================================================================
+
+
+@cache
+def _response_schema(response_model: type[BaseModel]) -> dict[str, Any]:
+    """Schéma JSON d'un modèle de réponse (généré une fois par classe, pas par appel)."""
+    return response_model.model_json_schema()
+
+
+def _enrichment_cache_key(prompt: str, response_model: type[BaseModel]) -> str | None:
+    """
+    Clé de cache d'un appel d'enrichissement: sha256 du modèle LLM, du prompt
+    et du schéma de réponse. None si aucun modèle par défaut n'est configuré.
+    """
+    model = get_default_model()
+    if not model:
+        return None
+    payload = json.dumps(
+        [model["model_id"], prompt, _response_schema(response_model)],
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _read_cached_enrichment(cache_key: str) -> dict[str, Any] | None:
+    """Lit un enrichissement en cache (None si absent, expiré ou cache indisponible)."""
+    try:
+        cached = get_llm_cache(cache_key)
+    except Exception as e:
+        logger.warning("Cache LLM indisponible: %s", e)
+        return None
+    return json.loads(cached) if cached else None
+
+
+def _store_enrichment(cache_key: str, enrichment: dict[str, Any]) -> None:
+    """Met en cache un enrichissement validé (une erreur de cache n'interrompt pas le job)."""
+    try:
+        set_llm_cache(
+            cache_key,
+            json.dumps(enrichment, ensure_ascii=False),
+            ttl_minutes=CatalogConfig.LLM_CACHE_TTL_MINUTES,
+        )
+    except Exception as e:
+        logger.warning("Échec mise en cache de l'enrichissement: %s", e)
 
 
 # =============================================================================
@@ -32,18 +93,23 @@ def estimate_tokens(text: str) -> int:
     return len(text) // 4
 
 
-def check_token_limit(prompt: str, max_input_tokens: int = 100000) -> tuple[bool, int, str]:
+def check_token_limit(
+    prompt: str, max_input_tokens: int = 100000, *, system_prompt: str | None = None
+) -> tuple[bool, int, str]:
     """
     Vérifie si le prompt ne dépasse pas la limite de tokens.
 
     Args:
         prompt: Le texte du prompt
         max_input_tokens: Limite maximale (défaut 100k pour Gemini)
+        system_prompt: Message système compté avec le prompt (sans les concaténer)
 
     Returns:
         (is_ok, token_count, message)
     """
     token_count = estimate_tokens(prompt)
+    if system_prompt:
+        token_count += estimate_tokens(system_prompt)
 
     if token_count > max_input_tokens:
         return (
@@ -70,15 +136,21 @@ class PromptNotConfiguredError(Exception):
 
 
 # =============================================================================
-# CONSTRUCTION DU MODÈLE DE RÉPONSE DYNAMIQUE
+# CONVERSION DE LA RÉPONSE LLM
 # =============================================================================
 
 
-def build_response_model(catalog: ExtractedCatalog) -> type[BaseModel]:
-    """
-    Crée dynamiquement un modèle Pydantic basé sur la structure du catalogue.
+def _column_to_dict(col_result: ColumnEnrichment | None) -> dict[str, Any]:
+    """Colonne au format enrichment_to_dict (vide si le LLM l'a omise)."""
+    if col_result is None:
+        return {"description": "", "synonyms": []}
+    # La réponse LLM est jetée après conversion: ses synonymes sont repris sans copie
+    return {"description": col_result.description, "synonyms": col_result.synonyms}
+
 
-    Le LLM devra retourner un JSON conforme à ce schéma:
+def enrichment_to_dict(catalog: ExtractedCatalog, result: CatalogEnrichment) -> dict[str, Any]:
+    """
+    Convertit la réponse LLM (schéma statique CatalogEnrichment) au format:
     {
         "table_name": {
             "description": "...",
@@ -89,53 +161,28 @@ def build_response_model(catalog: ExtractedCatalog) -> type[BaseModel]:
         }
     }
 
-    Note: Les colonnes internes (prefixées par _airbyte_, _dlt_, __) sont exclues
-    car Pydantic n'accepte pas les noms commençant par underscore.
+    Seules les tables et colonnes du catalogue sont gardées (hors colonnes internes
+    _airbyte_, _dlt_, __). Celles que le LLM a omises reçoivent une description vide,
+    signalée ensuite par validate_catalog_enrichment().
     """
-
-    # Modèle pour une colonne enrichie
-    class ColumnEnrichment(BaseModel):
-        description: str = Field(description="Description métier de la colonne")
-        synonyms: list[str] = Field(default=[], description="Termes alternatifs pour recherche NLP")
-
-    # Pour chaque table, créer un modèle dynamique
-    table_models: dict[str, tuple[type, Any]] = {}
+    tables_by_name = {t.name: t for t in result.tables}
+    enrichment: dict[str, Any] = {}
 
     for table in catalog.tables:
-        # Créer le modèle des colonnes pour cette table (exclure colonnes internes)
-        column_fields: dict[str, tuple[type, Any]] = {}
-        for col in table.columns:
-            # Exclure les colonnes internes (Airbyte, DLT, etc.)
-            if is_internal_column(col.name):
-                continue
-            column_fields[col.name] = (
-                ColumnEnrichment,
-                Field(description=f"Enrichissement pour la colonne {col.name}"),
-            )
-
-        ColumnsModel = create_model(  # type: ignore[call-overload]
-            f"{table.name}_Columns",
-            **column_fields,
-        )
-
-        # Créer le modèle de la table
-        TableModel = create_model(
-            f"{table.name}_Enrichment",
-            description=(str, Field(description=f"Description métier de la table {table.name}")),
-            columns=(ColumnsModel, Field(description="Enrichissement des colonnes")),
-        )
+        table_result = tables_by_name.get(table.name)
+        columns_by_name = {c.name: c for c in table_result.columns} if table_result else {}
 
-        table_models[table.name] = (
-            TableModel,
-            Field(description=f"Enrichissement de la table {table.name}"),
-        )
+        enrichment[table.name] = {
+            "description": table_result.description if table_result else "",
+            "columns": {
+                col.name: _column_to_dict(columns_by_name.get(col.name))
+                for col in table.columns
+                # Exclure les colonnes internes (Airbyte, DLT, etc.)
+                if not is_internal_column(col.name)
+            },
+        }
 
-    # Modèle global
-    model: type[BaseModel] = create_model(  # type: ignore[call-overload]
-        "CatalogEnrichment",
-        **table_models,
-    )
-    return model
+    return enrichment
 
 
 # =============================================================================
@@ -157,15 +204,24 @@ def _build_full_context(catalog: ExtractedCatalog) -> str:
 
     Note: Les colonnes internes (prefixées par _airbyte_, _dlt_, __) sont exclues.
     """
-    tables_context = []
-    for table in catalog.tables:
-        cols_desc = []
+    buf = io.StringIO()
+    write = buf.write
+    for table_idx, table in enumerate(catalog.tables):
+        if table_idx:
+            write("\n")
+        write(f"\nTable: {table.name} ({table.row_count:,} lignes)\nColonnes:\n")
+
+        first_col = True
         for col in table.columns:
             # Exclure les colonnes internes
             if is_internal_column(col.name):
                 continue
+            if not first_col:
+                write("\n")
+            first_col = False
+
             # Ligne principale: nom, type, stats de base
-            col_info = f"  - {col.name} ({col.data_type})"
+            write(f"  - {col.name} ({col.data_type})")
 
             # Statistiques de base
             stats_parts = []
@@ -174,45 +230,43 @@ def _build_full_context(catalog: ExtractedCatalog) -> str:
             if col.distinct_count > 0:
                 stats_parts.append(f"{col.distinct_count} valeurs distinctes")
             if stats_parts:
-                col_info += f" [{', '.join(stats_parts)}]"
+                write(f" [{', '.join(stats_parts)}]")
 
             # Valeurs (catégorielle = toutes, sinon échantillon)
             if col.sample_values:
                 if col.is_categorical:
-                    col_info += f"\n      ENUM: {', '.join(col.sample_values)}"
+                    write(f"\n      ENUM: {', '.join(col.sample_values)}")
                 else:
-                    col_info += f"\n      Exemples: {', '.join(col.sample_values[:3])}"
+                    write(f"\n      Exemples: {', '.join(col.sample_values[:3])}")
 
             # Distribution (top valeurs avec %)
             if col.top_values and not col.is_categorical:
                 top_str = ", ".join([f"{v.value}({v.percentage}%)" for v in col.top_values[:3]])
-                col_info += f"\n      Top valeurs: {top_str}"
+                write(f"\n      Top valeurs: {top_str}")
 
             # Statistiques numériques
             if col.value_range:
-                col_info += f"\n      Range: {col.value_range}"
+                write(f"\n      Range: {col.value_range}")
             if col.mean is not None:
-                col_info += f" | Moyenne: {col.mean}"
+                write(f" | Moyenne: {col.mean}")
             if col.median is not None:
-                col_info += f" | Médiane: {col.median}"
+                write(f" | Médiane: {col.median}")
 
             # Statistiques texte
             if col.min_length is not None and col.max_length is not None:
-                col_info += f"\n      Longueur: {col.min_length}-{col.max_length} chars (avg: {col.avg_length})"
+                write(
+                    f"\n      Longueur: {col.min_length}-{col.max_length} chars (avg: {col.avg_length})"
+                )
 
             # Pattern détecté
             if col.detected_pattern and col.pattern_match_rate is not None:
-                col_info += f"\n      Pattern détecté: {col.detected_pattern} ({col.pattern_match_rate * 100:.0f}% match)"
+                write(
+                    f"\n      Pattern détecté: {col.detected_pattern} ({col.pattern_match_rate * 100:.0f}% match)"
+                )
 
-            cols_desc.append(col_info)
+        write("\n")
 
-        tables_context.append(f"""
-Table: {table.name} ({table.row_count:,} lignes)
-Colonnes:
-{chr(10).join(cols_desc)}
-""")
-
-    return chr(10).join(tables_context)
+    return buf.getvalue()
 
 
 # =============================================================================
@@ -221,16 +275,21 @@ Colonnes:
 
 
 def enrich_with_llm(
-    catalog: ExtractedCatalog, tables_context: str | None = None, max_retries: int = 2
+    catalog: ExtractedCatalog,
+    tables_context: str | None = None,
+    max_retries: int = 2,
+    use_cache: bool = True,
 ) -> dict[str, Any]:
     """
     Appelle le LLM via llm_service pour obtenir les descriptions avec retry.
 
     Args:
-        catalog: Catalogue extrait à enrichir (pour construire le modèle de réponse)
+        catalog: Catalogue extrait à enrichir (tables et colonnes attendues en réponse)
         tables_context: Contexte pré-construit depuis PostgreSQL (full_context).
                         Si None, utilise _build_full_context() (fallback).
         max_retries: Nombre de tentatives supplémentaires en cas d'échec
+        use_cache: Réutilise une réponse identique déjà obtenue (même modèle, prompts
+                   et schéma de réponse). False force un nouvel appel LLM.
 
     Utilise call_llm_structured() qui gère:
     - Multi-provider (Gemini, OpenAI, Anthropic, etc.)
@@ -241,9 +300,6 @@ def enrich_with_llm(
         PromptNotConfiguredError: Si le prompt catalog_enrichment n'est pas en base.
         EnrichmentError: Si l'enrichissement échoue après tous les retries.
     """
-    # Construire le modèle de réponse dynamique
-    ResponseModel = build_response_model(catalog)
-
     # Utiliser le contexte fourni ou fallback sur _build_full_context
     if tables_context is None:
         tables_context = _build_full_context(catalog)
@@ -268,25 +324,34 @@ def enrich_with_llm(
     def _call_enrichment_llm() -> dict[str, Any]:
         result, _metadata = call_llm_structured(
             prompt=prompt,
-            response_model=ResponseModel,
+            response_model=CatalogEnrichment,
             source="catalog_engine",
             max_tokens=8192,
         )
-        result_dict: dict[str, Any] = result.model_dump()
         # Vérifier qu'on a au moins une table avec des données
-        if not result_dict or all(
-            not table_data.get("description") and not table_data.get("columns")
-            for table_data in result_dict.values()
+        if not result.tables or all(
+            not table.description and not table.columns for table in result.tables
         ):
             raise EnrichmentError("Enrichissement vide - aucune description générée")
-        return result_dict
+        return enrichment_to_dict(catalog, result)
 
-    return call_with_retry(
+    # Enrichissement déterministe (température 0): même entrée, même réponse
+    cache_key = _enrichment_cache_key(prompt, CatalogEnrichment) if use_cache else None
+    if cache_key:
+        cached = _read_cached_enrichment(cache_key)
+        if cached is not None:
+            logger.info("  Enrichissement lu depuis le cache LLM")
+            return cached
+
+    enrichment: dict[str, Any] = call_with_retry(
         _call_enrichment_llm,
         max_retries=max_retries,
         error_class=EnrichmentError,
         context="Enrichissement",
     )
+    if cache_key:
+        _store_enrichment(cache_key, enrichment)
+    return enrichment
 
 
 # =============================================================================
@@ -294,6 +359,10 @@ def enrich_with_llm(
 # =============================================================================
 
 
+# Enrichissement absent (table/colonne omise): lu seulement, jamais modifié
+_NO_ENRICHMENT: dict[str, Any] = {}
+
+
 def validate_catalog_enrichment(
     catalog: ExtractedCatalog, enrichment: dict[str, Any]
 ) -> CatalogValidationResult:
@@ -310,32 +379,32 @@ def validate_catalog_enrichment(
     result = CatalogValidationResult()
 
     for table in catalog.tables:
-        table_enrichment = enrichment.get(table.name, {})
+        table_enrichment = enrichment.get(table.name) or _NO_ENRICHMENT
 
         # Vérifier la description de la table
         table_desc = table_enrichment.get("description")
-        if table_desc and len(str(table_desc)) > 5:
+        if isinstance(table_desc, str) and len(table_desc) > 5:
             result.tables_ok += 1
         else:
             result.tables_warning += 1
-            result.issues.append(f"Table '{table.name}': description manquante")
+            result.add_issue(f"Table '{table.name}': description manquante")
 
         # Vérifier chaque colonne (exclure colonnes internes)
-        columns_enrichment = table_enrichment.get("columns", {})
+        columns_enrichment = table_enrichment.get("columns") or _NO_ENRICHMENT
         for col in table.columns:
             if is_internal_column(col.name):
                 continue
-            col_enrichment = columns_enrichment.get(col.name, {})
+            col_enrichment = columns_enrichment.get(col.name) or _NO_ENRICHMENT
 
             col_desc = col_enrichment.get("description")
-            col_synonyms = col_enrichment.get("synonyms", [])
-
-            if col_desc and len(str(col_desc)) > 3:
+            if isinstance(col_desc, str) and len(col_desc) > 3:
                 result.columns_ok += 1
             else:
                 result.columns_warning += 1
-                result.issues.append(f"Colonne '{table.name}.{col.name}': description manquante")
+                result.add_issue(f"Colonne '{table.name}.{col.name}': description manquante")
 
-            result.synonyms_total += len(col_synonyms) if col_synonyms else 0
+            col_synonyms = col_enrichment.get("synonyms")
+            if col_synonyms:
+                result.synonyms_total += len(col_synonyms)
 
     return result
@@ -6,11 +6,15 @@ Lecture du schéma, statistiques des colonnes, détection de patterns.
 
 import logging
 import re
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import suppress
+from functools import cache, partial
 from typing import Any
 
 logger = logging.getLogger(__name__)
 
+from constants import CatalogConfig
 from type_defs import DuckDBConnection
 
 from .filters import is_internal_column, is_internal_table
@@ -20,64 +24,215 @@ from .models import ColumnMetadata, ExtractedCatalog, TableMetadata, ValueFreque
 # PATTERNS COMMUNS POUR DÉTECTION AUTOMATIQUE
 # =============================================================================
 
+# Ordonnés du plus fréquent au plus rare: detect_pattern s'arrête dès qu'un
+# pattern atteint STRONG_MATCH_RATE (les patterns sont mutuellement exclusifs).
 COMMON_PATTERNS = {
+    "date_iso": r"^\d{4}-\d{2}-\d{2}$",
     "email": r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$",
+    "datetime_iso": r"^\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}",
     "uuid": r"^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$",
-    "phone_fr": r"^(?:\+33|0)[1-9](?:[0-9]{8}|[0-9]{2}(?:\s|\.|-)?[0-9]{2}(?:\s|\.|-)?[0-9]{2}(?:\s|\.|-)?[0-9]{2})$",
     "url": r"^https?://[^\s]+$",
-    "ip_address": r"^(?:\d{1,3}\.){3}\d{1,3}$",
-    "date_iso": r"^\d{4}-\d{2}-\d{2}$",
-    "datetime_iso": r"^\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}",
+    "phone_fr": r"^(?:\+33|0)[1-9](?:[0-9]{8}|[0-9]{2}(?:\s|\.|-)?[0-9]{2}(?:\s|\.|-)?[0-9]{2}(?:\s|\.|-)?[0-9]{2})$",
     "postal_code_fr": r"^\d{5}$",
+    "ip_address": r"^(?:\d{1,3}\.){3}\d{1,3}$",
     "siret": r"^\d{14}$",
     "siren": r"^\d{9}$",
 }
 
+# (nom, méthode match liée) des patterns à tester, dans l'ordre de COMMON_PATTERNS
+_PatternMatchers = tuple[tuple[str, Callable[[str], re.Match[str] | None]], ...]
+
+# Compilés une fois au chargement du module
+_COMPILED_PATTERNS: _PatternMatchers = tuple(
+    (name, re.compile(regex).match) for name, regex in COMMON_PATTERNS.items()
+)
+
+# Longueurs (min, max) qu'une valeur doit avoir pour matcher; None = non bornée
+_PATTERN_LENGTHS: dict[str, tuple[int, int | None]] = {
+    "date_iso": (10, 10),
+    "email": (6, None),
+    "datetime_iso": (19, None),
+    "uuid": (36, 36),
+    "url": (8, None),
+    "phone_fr": (10, 15),
+    "postal_code_fr": (5, 5),
+    "ip_address": (7, 15),
+    "siret": (14, 14),
+    "siren": (9, 9),
+}
+
+# Taux à partir duquel un pattern est retenu sans tester les suivants
+STRONG_MATCH_RATE = 0.95
+
 
-def detect_pattern(values: list[str]) -> tuple[str | None, float | None]:
+def _quote_ident(name: str) -> str:
+    """
+    Quote un identifiant SQL pour DuckDB (les guillemets internes sont doublés).
+
+    DuckDB ne permet pas de binder un nom de table/colonne en paramètre:
+    l'identifiant est quoté une fois puis réutilisé dans toutes les requêtes.
+    """
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _candidate_patterns(min_length: int | None, max_length: int | None) -> _PatternMatchers:
+    """
+    Patterns compatibles avec les longueurs d'une colonne (dans l'ordre de COMMON_PATTERNS).
+
+    Un pattern ne peut matcher la majorité des valeurs que si sa plage de longueurs
+    recoupe [min_length, max_length]. Sans longueurs connues, tous sont candidats.
+    """
+    if min_length is None or max_length is None:
+        return _COMPILED_PATTERNS
+    candidates = []
+    for name, match in _COMPILED_PATTERNS:
+        lo, hi = _PATTERN_LENGTHS[name]
+        if lo <= max_length and (hi is None or hi >= min_length):
+            candidates.append((name, match))
+    return tuple(candidates)
+
+
+def detect_pattern(
+    values: list[str], patterns: _PatternMatchers | None = None
+) -> tuple[str | None, float | None]:
     """
     Détecte un pattern commun dans une liste de valeurs.
 
+    Args:
+        patterns: Patterns à tester (voir _candidate_patterns); tous par défaut.
+
     Returns:
         (pattern_name, match_rate) ou (None, None) si aucun pattern trouvé
     """
     if not values:
         return None, None
+    if patterns is None:
+        patterns = _COMPILED_PATTERNS
+
+    total = len(values)
+    # Valeurs converties une seule fois (et non une fois par pattern)
+    texts = [str(v) for v in values if v]
 
     best_pattern = None
     best_rate = 0.0
 
-    for pattern_name, regex in COMMON_PATTERNS.items():
-        try:
-            compiled = re.compile(regex)
-            matches = sum(1 for v in values if v and compiled.match(str(v)))
-            rate = matches / len(values) if values else 0
+    for pattern_name, match in patterns:
+        # Un pattern n'est retenu qu'au-delà de 70% et du meilleur taux courant
+        needed = max(0.7, best_rate) * total
+        remaining = len(texts)
+        matches = 0
+        for text in texts:
+            remaining -= 1
+            if match(text):
+                matches += 1
+            elif matches + remaining <= needed:
+                break  # Même si tout le reste matche, le pattern ne peut plus l'emporter
+        else:
+            rate = matches / total
+
+            # Match quasi-total: inutile de tester les patterns suivants
+            if rate >= STRONG_MATCH_RATE:
+                return pattern_name, rate
 
             # On garde si >70% des valeurs matchent
             if rate > 0.7 and rate > best_rate:
                 best_pattern = pattern_name
                 best_rate = rate
-        except (re.error, TypeError):
-            # Regex invalide ou type non compatible
-            continue
 
     return (best_pattern, best_rate) if best_pattern else (None, None)
 
 
+# =============================================================================
+# AGRÉGATS PAR COLONNE (UN SEUL SCAN PAR TABLE)
+# =============================================================================
+
+# Nombre d'agrégats de base par colonne: null_count, distinct_count
+_BASE_AGGREGATES = 2
+
+# Familles de types DuckDB (recherche de sous-chaîne, insensible à la casse)
+_NUMERIC_TYPE_RE = re.compile(r"int|float|decimal|double|numeric|real", re.IGNORECASE)
+_TEXT_TYPE_RE = re.compile(r"varchar|text|char|string", re.IGNORECASE)
+
+
+@cache
+def _column_kind(col_type: str) -> tuple[bool, bool]:
+    """
+    Retourne (is_numeric, is_text) d'après le type DuckDB de la colonne.
+
+    Mis en cache: un schéma n'utilise qu'une poignée de types distincts.
+    """
+    return bool(_NUMERIC_TYPE_RE.search(col_type)), bool(_TEXT_TYPE_RE.search(col_type))
+
+
+def _column_aggregates(col_name: str, col_type: str) -> list[str]:
+    """
+    Expressions d'agrégat d'une colonne, dans l'ordre lu par extract_column_stats:
+    null_count, distinct_count, puis min/max/avg/median (numérique)
+    et min/max/avg des longueurs (texte).
+
+    Les agrégats ignorent les NULL: équivalent aux anciennes requêtes WHERE col IS NOT NULL.
+    """
+    col = _quote_ident(col_name)
+    is_numeric, is_text = _column_kind(col_type)
+    exprs = [f"COUNT(*) - COUNT({col})", f"COUNT(DISTINCT {col})"]
+    if is_numeric:
+        exprs += [f"MIN({col})", f"MAX({col})", f"AVG({col})", f"MEDIAN({col})"]
+    if is_text:
+        exprs += [f"MIN(LENGTH({col}))", f"MAX(LENGTH({col}))", f"AVG(LENGTH({col}))"]
+    return exprs
+
+
+def _fetch_table_aggregates(
+    conn: DuckDBConnection, table_name: str, columns: list[tuple[str, str]]
+) -> tuple[int, list[tuple[Any, ...]]] | None:
+    """
+    Calcule en une requête (un scan) le nombre de lignes et les agrégats de toutes
+    les colonnes d'une table.
+
+    Returns:
+        (row_count, agrégats par colonne dans l'ordre de columns), ou None si la
+        requête échoue (type non agrégeable...): l'appelant retombe alors sur
+        des requêtes par colonne.
+    """
+    per_column = [_column_aggregates(col_name, col_type) for col_name, col_type in columns]
+    select_list = ", ".join(["COUNT(*)"] + [expr for exprs in per_column for expr in exprs])
+    try:
+        row = conn.execute(f"SELECT {select_list} FROM {_quote_ident(table_name)}").fetchone()
+    except Exception as e:
+        logger.debug("Agrégats groupés impossibles pour %s: %s", table_name, e)
+        return None
+    if row is None:
+        return None
+
+    aggregates: list[tuple[Any, ...]] = []
+    offset = 1
+    for exprs in per_column:
+        aggregates.append(tuple(row[offset : offset + len(exprs)]))
+        offset += len(exprs)
+    return row[0] or 0, aggregates
+
+
 def extract_column_stats(
-    conn: DuckDBConnection, table_name: str, col_name: str, col_type: str, row_count: int
+    conn: DuckDBConnection,
+    table_name: str,
+    col_name: str,
+    col_type: str,
+    row_count: int,
+    aggregates: tuple[Any, ...] | None = None,
 ) -> ColumnMetadata:
     """
     Extrait les statistiques complètes d'une colonne.
 
     Inspiré des data catalogs professionnels (dbt, DataHub, Amundsen, Great Expectations).
+
+    Args:
+        aggregates: Agrégats déjà calculés pour la table (voir _column_aggregates).
+                    Si None, ils sont calculés ici en une requête.
     """
     categorical_threshold = 50
-    col_type_lower = col_type.lower()
-    is_numeric = any(
-        t in col_type_lower for t in ["int", "float", "decimal", "double", "numeric", "real"]
-    )
-    is_text = any(t in col_type_lower for t in ["varchar", "text", "char", "string"])
+    col = _quote_ident(col_name)
+    table = _quote_ident(table_name)
+    is_numeric, is_text = _column_kind(col_type)
 
     # Initialiser les valeurs par défaut
     stats: dict[str, Any] = {
@@ -105,18 +260,22 @@ def extract_column_stats(
     }
 
     try:
-        # 1. Statistiques de base (null_count, distinct_count)
-        base_stats = conn.execute(f"""
-            SELECT
-                COUNT(*) - COUNT("{col_name}") as null_count,
-                COUNT(DISTINCT "{col_name}") as distinct_count
-            FROM "{table_name}"
-        """).fetchone()
-
-        if base_stats is None:
+        # 1. Statistiques de base (null_count, distinct_count) + numériques/texte
+        if aggregates is None:
+            try:
+                aggregates = conn.execute(
+                    f"SELECT {', '.join(_column_aggregates(col_name, col_type))} FROM {table}"
+                ).fetchone()
+            except Exception:
+                # Agrégat numérique/texte non supporté pour ce type: stats de base seules
+                aggregates = conn.execute(
+                    f"SELECT COUNT(*) - COUNT({col}), COUNT(DISTINCT {col}) FROM {table}"
+                ).fetchone()
+
+        if aggregates is None:
             return ColumnMetadata(**stats)
-        null_count = base_stats[0] or 0
-        distinct_count = base_stats[1] or 0
+        null_count = aggregates[0] or 0
+        distinct_count = aggregates[1] or 0
 
         stats["null_count"] = null_count
         stats["null_rate"] = round(null_count / row_count, 4) if row_count > 0 else 0.0
@@ -126,31 +285,35 @@ def extract_column_stats(
         # 2. Détection catégorielle et valeurs
         stats["is_categorical"] = distinct_count <= categorical_threshold
 
+        # Colonne entièrement NULL: ni valeurs, ni distribution, ni pattern à lire
+        if distinct_count == 0:
+            return ColumnMetadata(**stats)
+
         if stats["is_categorical"]:
             # Récupérer TOUTES les valeurs pour colonnes catégorielles
             samples = conn.execute(f"""
-                SELECT DISTINCT CAST("{col_name}" AS VARCHAR) as val
-                FROM "{table_name}"
-                WHERE "{col_name}" IS NOT NULL
+                SELECT DISTINCT CAST({col} AS VARCHAR) as val
+                FROM {table}
+                WHERE {col} IS NOT NULL
                 ORDER BY val
             """).fetchall()
             stats["sample_values"] = [str(s[0])[:100] for s in samples if s[0]]
         else:
             # Échantillon de 5 valeurs
             samples = conn.execute(f"""
-                SELECT DISTINCT CAST("{col_name}" AS VARCHAR) as val
-                FROM "{table_name}"
-                WHERE "{col_name}" IS NOT NULL
+                SELECT DISTINCT CAST({col} AS VARCHAR) as val
+                FROM {table}
+                WHERE {col} IS NOT NULL
                 LIMIT 5
             """).fetchall()
             stats["sample_values"] = [str(s[0])[:50] for s in samples if s[0]]
 
         # 3. Top 10 valeurs avec fréquences (distribution)
         top_values_result = conn.execute(f"""
-            SELECT CAST("{col_name}" AS VARCHAR) as val, COUNT(*) as cnt
-            FROM "{table_name}"
-            WHERE "{col_name}" IS NOT NULL
-            GROUP BY "{col_name}"
+            SELECT CAST({col} AS VARCHAR) as val, COUNT(*) as cnt
+            FROM {table}
+            WHERE {col} IS NOT NULL
+            GROUP BY {col}
             ORDER BY cnt DESC
             LIMIT 10
         """).fetchall()
@@ -164,53 +327,42 @@ def extract_column_stats(
             for v in top_values_result
         ]
 
-        # 4. Statistiques numériques
+        # 4. Statistiques numériques (lues dans les agrégats)
+        extra = list(aggregates[_BASE_AGGREGATES:])
         if is_numeric:
-            with suppress(Exception):
-                num_stats = conn.execute(f"""
-                    SELECT
-                        MIN("{col_name}"),
-                        MAX("{col_name}"),
-                        AVG("{col_name}"),
-                        MEDIAN("{col_name}")
-                    FROM "{table_name}"
-                    WHERE "{col_name}" IS NOT NULL
-                """).fetchone()
-
-                if num_stats is not None and num_stats[0] is not None:
-                    stats["value_range"] = f"{num_stats[0]} - {num_stats[1]}"
+            num_stats, extra = extra[:4], extra[4:]
+            if len(num_stats) == 4 and num_stats[0] is not None:
+                stats["value_range"] = f"{num_stats[0]} - {num_stats[1]}"
+                with suppress(TypeError, ValueError):
                     stats["mean"] = round(float(num_stats[2]), 4) if num_stats[2] else None
                     stats["median"] = round(float(num_stats[3]), 4) if num_stats[3] else None
 
         # 5. Statistiques texte (longueurs)
         if is_text:
-            with suppress(Exception):
-                text_stats = conn.execute(f"""
-                    SELECT
-                        MIN(LENGTH("{col_name}")),
-                        MAX(LENGTH("{col_name}")),
-                        AVG(LENGTH("{col_name}"))
-                    FROM "{table_name}"
-                    WHERE "{col_name}" IS NOT NULL
-                """).fetchone()
-
-                if text_stats is not None and text_stats[0] is not None:
-                    stats["min_length"] = text_stats[0]
-                    stats["max_length"] = text_stats[1]
-                    stats["avg_length"] = round(float(text_stats[2]), 2) if text_stats[2] else None
-
-        # 6. Détection de patterns (sur échantillon pour performance)
-        if is_text and distinct_count > 10:
+            text_stats = extra[:3]
+            if len(text_stats) == 3 and text_stats[0] is not None:
+                stats["min_length"] = text_stats[0]
+                stats["max_length"] = text_stats[1]
+                stats["avg_length"] = round(float(text_stats[2]), 2) if text_stats[2] else None
+
+        # 6. Détection de patterns (sur échantillon pour performance), seulement
+        # si un pattern est compatible avec les longueurs de la colonne
+        candidates = (
+            _candidate_patterns(stats["min_length"], stats["max_length"])
+            if is_text and distinct_count > 10
+            else ()
+        )
+        if candidates:
             with suppress(Exception):
                 pattern_samples = conn.execute(f"""
-                    SELECT CAST("{col_name}" AS VARCHAR)
-                    FROM "{table_name}"
-                    WHERE "{col_name}" IS NOT NULL
+                    SELECT CAST({col} AS VARCHAR)
+                    FROM {table}
+                    WHERE {col} IS NOT NULL
                     LIMIT 100
                 """).fetchall()
                 sample_values_for_pattern = [str(s[0]) for s in pattern_samples if s[0]]
 
-                pattern, rate = detect_pattern(sample_values_for_pattern)
+                pattern, rate = detect_pattern(sample_values_for_pattern, candidates)
                 if pattern:
                     stats["detected_pattern"] = pattern
                     stats["pattern_match_rate"] = round(rate, 4) if rate else None
@@ -221,6 +373,51 @@ def extract_column_stats(
     return ColumnMetadata(**stats)
 
 
+def _extract_table(conn: DuckDBConnection, table_name: str) -> TableMetadata:
+    """Extrait les métadonnées d'une table (colonnes, row_count, statistiques)."""
+    # Colonnes via information_schema (hors colonnes internes Airbyte, DLT, etc.)
+    columns_info = conn.execute(
+        """
+        SELECT column_name, data_type
+        FROM information_schema.columns
+        WHERE table_name = ?
+        ORDER BY ordinal_position
+        """,
+        [table_name],
+    ).fetchall()
+    columns_info = [(name, typ) for name, typ in columns_info if not is_internal_column(name)]
+
+    # Nombre de lignes + agrégats de toutes les colonnes en un seul scan
+    column_aggregates: Sequence[tuple[Any, ...] | None]
+    table_aggregates = _fetch_table_aggregates(conn, table_name, columns_info)
+    if table_aggregates is not None:
+        row_count, column_aggregates = table_aggregates
+    else:
+        row_result = conn.execute(f"SELECT COUNT(*) FROM {_quote_ident(table_name)}").fetchone()
+        row_count = row_result[0] if row_result else 0
+        column_aggregates = [None] * len(columns_info)
+
+    logger.debug("  %s: %d colonnes, %d lignes", table_name, len(columns_info), row_count)
+
+    columns_result: list[ColumnMetadata] = []
+
+    for (col_name, col_type), aggregates in zip(columns_info, column_aggregates, strict=True):
+        col_metadata = extract_column_stats(
+            conn, table_name, col_name, col_type, row_count, aggregates=aggregates
+        )
+        get_sample_values_str(col_metadata)
+        get_column_full_context(col_metadata)
+        columns_result.append(col_metadata)
+
+    return TableMetadata(name=table_name, row_count=row_count, columns=columns_result)
+
+
+def _extract_table_with_cursor(conn: DuckDBConnection, table_name: str) -> TableMetadata:
+    """Extrait une table sur un curseur dédié (une connexion DuckDB par thread)."""
+    with conn.cursor() as cursor:
+        return _extract_table(cursor, table_name)
+
+
 def extract_metadata_from_connection(conn: DuckDBConnection) -> ExtractedCatalog:
     """
     Extrait les métadonnées avancées depuis une connexion DuckDB.
@@ -235,8 +432,6 @@ def extract_metadata_from_connection(conn: DuckDBConnection) -> ExtractedCatalog
     Args:
         conn: Connexion DuckDB native (duckdb.DuckDBPyConnection)
     """
-    tables_result: list[TableMetadata] = []
-
     # Récupérer les tables (exclure les tables internes)
     tables = conn.execute("""
         SELECT table_name
@@ -250,33 +445,17 @@ def extract_metadata_from_connection(conn: DuckDBConnection) -> ExtractedCatalog
 
     logger.info("Extraction avancée de %d tables (après exclusion tables internes)", len(tables))
 
-    for (table_name,) in tables:
-        # Nombre de lignes
-        row_result = conn.execute(f'SELECT COUNT(*) FROM "{table_name}"').fetchone()
-        row_count = row_result[0] if row_result else 0
-
-        # Colonnes via information_schema
-        columns_info = conn.execute(f"""
-            SELECT column_name, data_type
-            FROM information_schema.columns
-            WHERE table_name = '{table_name}'
-            ORDER BY ordinal_position
-        """).fetchall()
-
-        logger.info("  %s: %d colonnes, %d lignes", table_name, len(columns_info), row_count)
-
-        columns_result: list[ColumnMetadata] = []
-
-        for col_name, col_type in columns_info:
-            # Exclure les colonnes internes (Airbyte, DLT, etc.)
-            if is_internal_column(col_name):
-                continue
-            col_metadata = extract_column_stats(conn, table_name, col_name, col_type, row_count)
-            columns_result.append(col_metadata)
-
-        tables_result.append(
-            TableMetadata(name=table_name, row_count=row_count, columns=columns_result)
-        )
+    # Tables indépendantes: extraites en parallèle, chaque worker sur son propre
+    # curseur (connexion dupliquée sur la même base DuckDB). Ordre conservé.
+    table_names = [table_name for (table_name,) in tables]
+    if len(table_names) > 1:
+        max_workers = min(CatalogConfig.EXTRACTION_MAX_PARALLEL, len(table_names))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            tables_result = list(
+                executor.map(partial(_extract_table_with_cursor, conn), table_names)
+            )
+    else:
+        tables_result = [_extract_table(conn, table_name) for table_name in table_names]
 
     return ExtractedCatalog(datasource="g7_analytics.duckdb", tables=tables_result)
 
@@ -305,7 +484,7 @@ def build_column_full_context(col: ColumnMetadata) -> str:
     # Valeurs (catégorielle = toutes, sinon échantillon)
     if col.sample_values:
         if col.is_categorical:
-            parts.append(f"ENUM: {', '.join(col.sample_values)}")
+            parts.append(f"ENUM: {get_sample_values_str(col)}")
         else:
             parts.append(f"Exemples: {', '.join(col.sample_values[:5])}")
 
@@ -334,3 +513,25 @@ def build_column_full_context(col: ColumnMetadata) -> str:
         parts.append(f"Pattern: {col.detected_pattern} ({col.pattern_match_rate * 100:.0f}% match)")
 
     return " | ".join(parts) if parts else ""
+
+
+def get_column_full_context(col: ColumnMetadata) -> str:
+    """
+    Retourne le contexte complet d'une colonne, calculé une seule fois.
+
+    Le résultat de build_column_full_context est mémorisé dans col.full_context.
+    """
+    if col.full_context is None:
+        col.full_context = build_column_full_context(col)
+    return col.full_context
+
+
+def get_sample_values_str(col: ColumnMetadata) -> str | None:
+    """
+    Retourne les valeurs d'exemple jointes par ", " (None si aucune), jointes une seule fois.
+
+    Le résultat est mémorisé dans col.sample_values_str.
+    """
+    if col.sample_values_str is None and col.sample_values:
+        col.sample_values_str = ", ".join(col.sample_values)
+    return col.sample_values_str
@@ -5,20 +5,40 @@ Appels LLM pour génération, validation, persistence.
 """
 
 import logging
+import re
 from contextlib import suppress
+from operator import attrgetter
 from typing import Any
 
 logger = logging.getLogger(__name__)
 
+from psycopg2.extras import execute_values
 from type_defs import DuckDBConnection
 
-from db import get_connection
+from constants import LLMConfig
+from db import get_connection, set_async_commit
 from llm_config import get_active_prompt
 from llm_service import call_llm_structured
 from llm_utils import KpiGenerationError, call_with_retry
 
-from .enrichment import check_token_limit
-from .models import ExtractedCatalog, KpiDefinition, KpisGenerationResult, KpiValidationResult
+from .enrichment import check_token_limit, estimate_tokens
+from .models import (
+    ColumnMetadata,
+    ExtractedCatalog,
+    KpiDefinition,
+    KpisGenerationResult,
+    KpiValidationResult,
+    TableMetadata,
+)
+
+# Détection d'une requête SELECT sans copier la chaîne en majuscules
+_SELECT_RE = re.compile(r"\bselect\b", re.IGNORECASE)
+
+# Champs SQL d'un KPI qui doivent contenir un SELECT
+_KPI_SQL_FIELDS = ("sql_value", "sql_trend", "sql_sparkline")
+
+# Libellé injecté dans le prompt KPI quand la période est indéterminable (jamais stocké)
+DATA_PERIOD_UNKNOWN = "Période non déterminée"
 
 
 def validate_kpi(kpi: KpiDefinition) -> KpiValidationResult:
@@ -28,7 +48,7 @@ def validate_kpi(kpi: KpiDefinition) -> KpiValidationResult:
     Returns:
         KpiValidationResult avec status OK ou WARNING et liste des problèmes
     """
-    issues = []
+    issues: list[str] = []
 
     # Vérifier les champs obligatoires
     if not kpi.id or len(kpi.id) < 2:
@@ -37,14 +57,10 @@ def validate_kpi(kpi: KpiDefinition) -> KpiValidationResult:
     if not kpi.title or len(kpi.title) < 2:
         issues.append("title manquant ou trop court")
 
-    if not kpi.sql_value or "SELECT" not in kpi.sql_value.upper():
-        issues.append("sql_value invalide (pas de SELECT)")
-
-    if not kpi.sql_trend or "SELECT" not in kpi.sql_trend.upper():
-        issues.append("sql_trend invalide (pas de SELECT)")
-
-    if not kpi.sql_sparkline or "SELECT" not in kpi.sql_sparkline.upper():
-        issues.append("sql_sparkline invalide (pas de SELECT)")
+    for field_name in _KPI_SQL_FIELDS:
+        sql = getattr(kpi, field_name)
+        if not sql or not _SELECT_RE.search(sql):
+            issues.append(f"{field_name} invalide (pas de SELECT)")
 
     if kpi.sparkline_type not in ("area", "bar"):
         issues.append(f"sparkline_type invalide: {kpi.sparkline_type}")
@@ -52,7 +68,8 @@ def validate_kpi(kpi: KpiDefinition) -> KpiValidationResult:
     if not kpi.footer:
         issues.append("footer manquant")
 
-    return KpiValidationResult(
+    # Champs déjà typés (KpiDefinition validé): pas de re-validation Pydantic
+    return KpiValidationResult.model_construct(
         kpi_id=kpi.id, status="OK" if not issues else "WARNING", issues=issues
     )
 
@@ -61,6 +78,9 @@ def validate_all_kpis(result: KpisGenerationResult) -> dict[str, Any]:
     """
     Valide tous les KPIs générés.
 
+    Args:
+        result: KPIs générés par le LLM
+
     Returns:
         {
             "total": 4,
@@ -69,9 +89,16 @@ def validate_all_kpis(result: KpisGenerationResult) -> dict[str, Any]:
             "details": [KpiValidationResult, ...]
         }
     """
-    details = [validate_kpi(kpi) for kpi in result.kpis]
-    ok_count = sum(1 for d in details if d.status == "OK")
-    warning_count = sum(1 for d in details if d.status == "WARNING")
+    details: list[KpiValidationResult] = []
+    ok_count = 0
+    warning_count = 0
+    for kpi in result.kpis:
+        detail = validate_kpi(kpi)
+        details.append(detail)
+        if detail.status == "OK":
+            ok_count += 1
+        else:
+            warning_count += 1
 
     return {
         "total": len(result.kpis),
@@ -81,18 +108,28 @@ def validate_all_kpis(result: KpisGenerationResult) -> dict[str, Any]:
     }
 
 
-def get_data_period(conn: DuckDBConnection) -> str:
+def get_data_period(conn: DuckDBConnection) -> str | None:
     """
     Récupère la période des données depuis la colonne de date principale.
+
+    Calculée à l'extraction et stockée sur la datasource (data_period): les
+    générations de KPIs la relisent de là plutôt que de rescanner la table.
+    Retourne None si la période n'est pas déterminable (rien n'est alors stocké,
+    la période sera recalculée à la prochaine génération).
     """
     with suppress(Exception):
         # Essayer avec dat_course (table evaluations)
+        # Jours distincts via GROUP BY (agrégation parallèle, ~2x plus rapide
+        # que COUNT(DISTINCT ...) dans DuckDB), puis min/max sur les jours
         result = conn.execute("""
             SELECT
-                MIN(dat_course)::DATE as min_date,
-                MAX(dat_course)::DATE as max_date,
-                COUNT(DISTINCT dat_course::DATE) as nb_jours
-            FROM evaluations
+                MIN(jour) as min_date,
+                MAX(jour) as max_date,
+                COUNT(*) as nb_jours
+            FROM (
+                SELECT dat_course::DATE as jour FROM evaluations
+                WHERE dat_course IS NOT NULL GROUP BY jour
+            )
         """).fetchone()
 
         if result and result[0]:
@@ -101,16 +138,72 @@ def get_data_period(conn: DuckDBConnection) -> str:
             nb_jours = result[2]
             return f"Du {min_date} au {max_date} ({nb_jours} jours de données)"
 
-    return "Période non déterminée"
+    return None
+
+
+def _format_kpi_column(col: ColumnMetadata) -> str:
+    """Formate une colonne pour le schéma du prompt KPI."""
+    examples = f" [Exemples: {', '.join(col.sample_values[:3])}]" if col.sample_values else ""
+    value_range = f" [Range: {col.value_range}]" if col.value_range else ""
+    return f"  - {col.name} ({col.data_type}){examples}{value_range}"
+
+
+def _format_kpi_table(table: TableMetadata) -> str:
+    """Formate une table (en-tête + une ligne par colonne) pour le schéma du prompt KPI."""
+    return "\n".join(
+        (
+            f"Table: {table.name} ({table.row_count:,} lignes)",
+            *map(_format_kpi_column, table.columns),
+        )
+    )
+
+
+def _build_kpi_schema(catalog: ExtractedCatalog, max_tokens: int | None = None) -> str:
+    """
+    Construit le schéma texte du catalogue pour le prompt KPI.
+
+    Un bloc par table (en-tête + une ligne par colonne), séparés par une ligne vide.
+
+    Avec max_tokens, les tables sont retenues de la plus volumineuse (row_count)
+    à la plus petite jusqu'à épuisement du budget; les tables écartées sont
+    signalées par une ligne finale "… (+N tables)". L'ordre du catalogue est conservé.
+    """
+    blocks = [_format_kpi_table(table) + "\n" for table in catalog.tables]
+    if max_tokens is None:
+        return "\n".join(blocks)
+
+    # Budget en caractères (même heuristique que estimate_tokens: ~4 caractères/token)
+    budget_chars = max_tokens * 4
+    kept: set[int] = set()
+    used = 0
+    by_size = sorted(range(len(blocks)), key=lambda i: catalog.tables[i].row_count, reverse=True)
+    for i in by_size:
+        size = len(blocks[i]) + 1
+        if used + size > budget_chars:
+            break
+        kept.add(i)
+        used += size
+
+    schema = "\n".join(block for i, block in enumerate(blocks) if i in kept)
+    dropped = len(blocks) - len(kept)
+    if dropped:
+        logger.warning("Schéma KPI tronqué: %d tables écartées (budget tokens)", dropped)
+        schema += f"\n… (+{dropped} tables)\n"
+    return schema
 
 
 def generate_kpis(
-    catalog: ExtractedCatalog, db_connection: DuckDBConnection, max_retries: int = 2
+    catalog: ExtractedCatalog,
+    db_connection: DuckDBConnection,
+    max_retries: int = 2,
+    data_period: str | None = None,
 ) -> KpisGenerationResult:
     """
     Génère les 4 KPIs via LLM avec retry.
 
     Utilise le prompt 'widgets_generation' de la base de données.
+    La période des données est lue depuis DuckDB si elle n'est pas fournie
+    (datasources.data_period, calculée à l'extraction).
 
     Raises:
         KpiGenerationError: Si la génération échoue après tous les retries
@@ -122,21 +215,9 @@ def generate_kpis(
             "Prompt 'widgets_generation' non configuré. Exécutez: python seed_prompts.py --force"
         )
 
-    # Construire le schéma pour le prompt
-    schema_lines = []
-    for table in catalog.tables:
-        schema_lines.append(f"Table: {table.name} ({table.row_count:,} lignes)")
-        for col in table.columns:
-            col_line = f"  - {col.name} ({col.data_type})"
-            if col.sample_values:
-                col_line += f" [Exemples: {', '.join(col.sample_values[:3])}]"
-            if col.value_range:
-                col_line += f" [Range: {col.value_range}]"
-            schema_lines.append(col_line)
-        schema_lines.append("")
-
-    # Récupérer la période des données
-    data_period = get_data_period(db_connection)
+    # Récupérer la période des données (précalculée à l'extraction si disponible)
+    if not data_period:
+        data_period = get_data_period(db_connection) or DATA_PERIOD_UNKNOWN
 
     # Générer la description des champs KPI depuis le modèle Pydantic
     kpi_fields = KpiDefinition.get_fields_description()
@@ -144,11 +225,14 @@ def generate_kpis(
     # Utiliser replace() au lieu de format() pour éviter les conflits
     # avec les accolades JSON dans le contenu dynamique
     prompt = prompt_data["content"]
-    prompt = prompt.replace("{schema}", "\n".join(schema_lines))
     prompt = prompt.replace("{data_period}", data_period)
     prompt = prompt.replace("{kpi_fields}", kpi_fields)
 
-    # Vérifier la taille du prompt avant l'appel
+    # Schéma tronqué au budget restant une fois le reste du prompt compté
+    schema_budget = LLMConfig.MAX_INPUT_TOKENS - estimate_tokens(prompt)
+    prompt = prompt.replace("{schema}", _build_kpi_schema(catalog, max_tokens=schema_budget))
+
+    # Garde-fou: le budget du schéma garantit normalement la limite
     is_ok, token_count, token_msg = check_token_limit(prompt)
     logger.info("  Tokens input: %s", token_msg)
     if not is_ok:
@@ -174,44 +258,59 @@ def generate_kpis(
     return kpis_result
 
 
+# Champs de KpiDefinition insérés dans la table kpis (ordre des colonnes de l'INSERT)
+_kpi_row_values = attrgetter(
+    "id",
+    "title",
+    "sql_value",
+    "sql_trend",
+    "sql_sparkline",
+    "sparkline_type",
+    "footer",
+    "trend_label",
+    "invert_trend",
+)
+
+
 def save_kpis(result: KpisGenerationResult) -> dict[str, int]:
     """
     Sauvegarde les KPIs générés dans PostgreSQL.
+
+    Les KPIs sont insérés en une seule requête multi-lignes, dans la même
+    transaction que la purge : en cas d'erreur, les anciens KPIs sont conservés.
+    Le commit n'attend pas le flush du WAL (KPIs régénérables, voir db.set_async_commit).
     """
+    # Lecture directe des attributs (déjà validés à la réponse LLM), sans model_dump
+    rows = [(*_kpi_row_values(kpi), i) for i, kpi in enumerate(result.kpis)]
+
     conn = get_connection()
     cursor = conn.cursor()
 
-    # Vider les anciens KPIs
-    cursor.execute("DELETE FROM kpis")
-
     stats = {"kpis": 0}
 
-    for i, kpi in enumerate(result.kpis):
-        try:
-            cursor.execute(
+    try:
+        set_async_commit(cursor)
+
+        # Vider les anciens KPIs
+        cursor.execute("DELETE FROM kpis")
+        if rows:
+            execute_values(
+                cursor,
                 """
                 INSERT INTO kpis (
                     kpi_id, title, sql_value, sql_trend, sql_sparkline,
                     sparkline_type, footer, trend_label, invert_trend, display_order, is_enabled
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, TRUE)
+                ) VALUES %s
             """,
-                (
-                    kpi.id,
-                    kpi.title,
-                    kpi.sql_value,
-                    kpi.sql_trend,
-                    kpi.sql_sparkline,
-                    kpi.sparkline_type,
-                    kpi.footer,
-                    kpi.trend_label,
-                    kpi.invert_trend,
-                    i,
-                ),
+                rows,
+                template="(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, TRUE)",
+                page_size=len(rows),
             )
-            stats["kpis"] += 1
-        except Exception as e:
-            logger.warning("Erreur KPI %s: %s", kpi.id, e)
-
-    conn.commit()
-    conn.close()
+        conn.commit()
+        stats["kpis"] = len(rows)
+    except Exception as e:
+        conn.rollback()
+        logger.warning("Erreur sauvegarde KPIs: %s", e)
+    finally:
+        conn.close()
     return stats
@@ -4,6 +4,7 @@ Modèles Pydantic pour le catalogue.
 Définit les structures de données utilisées par tous les autres modules.
 """
 
+from functools import cache
 from typing import Any
 
 from pydantic import BaseModel, Field
@@ -47,6 +48,7 @@ class ColumnMetadata(BaseModel):
 
     # Valeurs
     sample_values: list[str] = []  # Échantillon ou toutes valeurs si catégoriel
+    sample_values_str: str | None = None  # sample_values joint par ", " (calculé une fois)
     top_values: list[ValueFrequency] = []  # Top 10 valeurs avec fréquences
     is_categorical: bool = False  # True si colonne catégorielle (≤50 valeurs distinctes)
 
@@ -68,6 +70,9 @@ class ColumnMetadata(BaseModel):
     potential_fk_table: str | None = None  # Table référencée potentielle
     potential_fk_column: str | None = None  # Colonne référencée potentielle
 
+    # Contexte complet (calculé une fois, voir extraction.get_column_full_context)
+    full_context: str | None = None
+
 
 class TableMetadata(BaseModel):
     """Métadonnées d'une table extraites de la DB."""
@@ -84,14 +89,61 @@ class ExtractedCatalog(BaseModel):
     tables: list[TableMetadata]
 
 
+# =============================================================================
+# MODÈLES D'ENRICHISSEMENT (RÉPONSE LLM)
+# =============================================================================
+
+
+class ColumnEnrichment(BaseModel):
+    """Enrichissement d'une colonne par le LLM."""
+
+    name: str = Field(description="Nom exact de la colonne, tel que dans la structure")
+    description: str = Field(description="Description métier de la colonne")
+    synonyms: list[str] = Field(default=[], description="Termes alternatifs pour recherche NLP")
+
+
+class TableEnrichment(BaseModel):
+    """Enrichissement d'une table par le LLM."""
+
+    name: str = Field(description="Nom exact de la table, tel que dans la structure")
+    description: str = Field(description="Description métier de la table")
+    columns: list[ColumnEnrichment] = Field(
+        default=[], description="Enrichissement de chaque colonne de la table"
+    )
+
+
+class CatalogEnrichment(BaseModel):
+    """
+    Réponse LLM d'enrichissement: schéma statique, quel que soit le catalogue.
+
+    Les noms de tables/colonnes sont des valeurs (pas des champs): le schéma
+    envoyé au LLM ne grossit pas avec le catalogue.
+    """
+
+    tables: list[TableEnrichment] = Field(description="Enrichissement de chaque table")
+
+
 # =============================================================================
 # MODÈLES DE VALIDATION
 # =============================================================================
 
+# Problèmes conservés au plus (les suivants sont seulement comptés)
+_MAX_ISSUES = 50
+
 
 class CatalogValidationResult:
     """Résultat de validation du catalogue complet."""
 
+    __slots__ = (
+        "columns_ok",
+        "columns_warning",
+        "issues",
+        "issues_truncated",
+        "synonyms_total",
+        "tables_ok",
+        "tables_warning",
+    )
+
     def __init__(self) -> None:
         self.tables_ok = 0
         self.tables_warning = 0
@@ -99,6 +151,7 @@ class CatalogValidationResult:
         self.columns_warning = 0
         self.synonyms_total = 0
         self.issues: list[str] = []
+        self.issues_truncated = 0
 
     @property
     def status(self) -> str:
@@ -107,6 +160,24 @@ class CatalogValidationResult:
             return "OK"
         return "WARNING"
 
+    def add_issue(self, issue: str) -> None:
+        """Enregistre un problème; au-delà de _MAX_ISSUES, il est seulement compté."""
+        if len(self.issues) < _MAX_ISSUES:
+            self.issues.append(issue)
+        else:
+            self.issues_truncated += 1
+
+    def merge(self, other: "CatalogValidationResult") -> None:
+        """Ajoute les compteurs et problèmes d'un autre résultat (fusion des batches)."""
+        self.tables_ok += other.tables_ok
+        self.tables_warning += other.tables_warning
+        self.columns_ok += other.columns_ok
+        self.columns_warning += other.columns_warning
+        self.synonyms_total += other.synonyms_total
+        room = _MAX_ISSUES - len(self.issues)
+        self.issues.extend(other.issues[:room])
+        self.issues_truncated += other.issues_truncated + max(len(other.issues) - room, 0)
+
     def to_dict(self) -> dict[str, Any]:
         return {
             "status": self.status,
@@ -114,6 +185,7 @@ class CatalogValidationResult:
             "columns": {"ok": self.columns_ok, "warning": self.columns_warning},
             "synonyms": self.synonyms_total,
             "issues": self.issues,
+            "issues_truncated": self.issues_truncated,
         }
 
 
@@ -141,10 +213,13 @@ class KpiDefinition(BaseModel):
     )
 
     @classmethod
+    @cache
     def get_fields_description(cls) -> str:
         """
         Génère automatiquement la description des champs pour le prompt LLM.
         Extrait les infos du modèle Pydantic (nom, type, description, défaut).
+
+        Le résultat ne dépend que de la classe : il est calculé une seule fois.
         """
         lines = []
         for field_name, field_info in cls.model_fields.items():
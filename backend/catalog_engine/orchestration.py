@@ -9,17 +9,28 @@ Contient:
 
 import logging
 from collections.abc import Generator
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 from typing import TYPE_CHECKING, Any
 
-from catalog import WorkflowManager, add_column, add_datasource, add_table, get_setting
-from db import get_connection
+from catalog import WorkflowManager, add_columns, add_datasource, add_table, get_setting
+from catalog.datasources import update_datasource
+from constants import CatalogConfig, LLMConfig
+from db import get_connection, get_db, set_async_commit
 from llm_utils import KpiGenerationError, QuestionGenerationError
 from type_defs import DuckDBConnection
 
-from .enrichment import enrich_with_llm, validate_catalog_enrichment
-from .extraction import build_column_full_context, extract_metadata_from_connection
-from .kpis import generate_kpis, save_kpis
+from .enrichment import (
+    enrich_with_llm,
+    estimate_tokens,
+    validate_catalog_enrichment,
+)
+from .extraction import (
+    extract_metadata_from_connection,
+    get_column_full_context,
+    get_sample_values_str,
+)
+from .kpis import DATA_PERIOD_UNKNOWN, generate_kpis, get_data_period, save_kpis
 from .models import (
     CatalogValidationResult,
     ExtractedCatalog,
@@ -34,6 +45,19 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 
 
+# ========================================================================
+# QUESTIONS SUGGÉRÉES EN ARRIÈRE-PLAN
+# ========================================================================
+
+# L'appel LLM des questions tourne dans un worker pendant que le thread principal
+# génère les KPIs. Le worker ne touche pas DuckDB mais lit le schéma enrichi dans
+# PostgreSQL (get_schema_for_llm): il est lancé après la sauvegarde des descriptions.
+# Pas de pool partagé: get_connection() ouvre une connexion propre à chaque appel,
+# donc au thread. Hors log_cost de l'appel LLM, les sauvegardes (KPIs, questions)
+# restent sur le thread principal, dans l'ordre.
+_questions_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="questions")
+
+
 @contextmanager
 def _dummy_context() -> Generator[None, None, None]:
     """Context manager vide pour compatibilité quand job_id est None."""
@@ -70,95 +94,81 @@ def extract_only(
     with workflow.step("extract_metadata") if workflow else _dummy_context():
         logger.info("1/2 - Extraction des métadonnées depuis DuckDB")
         catalog = extract_metadata_from_connection(db_connection)
-        logger.info(
-            "  %d tables, %d colonnes",
-            len(catalog.tables),
-            sum(len(t.columns) for t in catalog.tables),
-        )
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "  %d tables, %d colonnes",
+                len(catalog.tables),
+                sum(len(t.columns) for t in catalog.tables),
+            )
 
     # Step 2: Sauvegarde dans PostgreSQL
     with workflow.step("save_to_catalog") if workflow else _dummy_context():
         logger.info("2/2 - Sauvegarde dans PostgreSQL (sans descriptions)")
 
+        # Nom de la source (calculé une fois, réutilisé dans la réponse)
+        source_name = catalog.datasource.removesuffix(".duckdb")
+
         # Générer un nom unique basé sur le dataset_id (évite les conflits entre datasets)
         # Format: ds_{8 premiers chars du UUID} - court et unique
-        datasource_name = f"ds_{dataset_id[:8]}" if dataset_id else catalog.datasource.replace(".duckdb", "")
-
-        # Créer la datasource (associée au dataset actif)
-        datasource_id = add_datasource(
-            name=datasource_name,
-            ds_type="duckdb",
-            dataset_id=dataset_id,
-            path=duckdb_path,
-            description="Base analytique - En attente d'enrichissement",
-        )
-
-        if datasource_id is None:
-            # Fallback: chercher la datasource existante PAR DATASET_ID (pas par nom!)
-            # Ceci évite de récupérer une datasource d'un autre dataset
-            conn = get_connection()
-            cursor = conn.cursor()
-            if dataset_id:
-                cursor.execute(
-                    "SELECT id FROM datasources WHERE dataset_id = %s",
-                    (dataset_id,),
-                )
-            else:
-                # Legacy: recherche par nom si pas de dataset_id
-                cursor.execute(
-                    "SELECT id FROM datasources WHERE name = %s",
-                    (datasource_name,),
-                )
-            row = cursor.fetchone()
-            datasource_id = row["id"] if row else None
-            conn.close()
-
-        if datasource_id is None:
-            raise ValueError("Impossible de créer la datasource")
+        datasource_name = f"ds_{dataset_id[:8]}" if dataset_id else source_name
 
         stats = {"tables": 0, "columns": 0}
 
-        for table in catalog.tables:
-            # Créer la table SANS description (sera enrichie plus tard)
-            table_id = add_table(
-                datasource_id=datasource_id,
-                name=table.name,
-                description=None,  # Pas de description pour l'instant
-                row_count=table.row_count,
+        # Une seule connexion (et transaction) pour toute la sauvegarde, sans attendre
+        # le flush du WAL au commit (extraction régénérable)
+        with get_db() as conn:
+            set_async_commit(conn.cursor())
+
+            # Créer la datasource (associée au dataset actif, id via RETURNING)
+            datasource_id = add_datasource(
+                name=datasource_name,
+                ds_type="duckdb",
+                dataset_id=dataset_id,
+                path=duckdb_path,
+                description="Base analytique - En attente d'enrichissement",
+                conn=conn,
             )
 
-            if table_id is None:
-                conn = get_connection()
-                cursor = conn.cursor()
-                cursor.execute(
-                    "SELECT id FROM tables WHERE datasource_id = %s AND name = %s",
-                    (datasource_id, table.name),
+            if datasource_id is None:
+                raise ValueError("Impossible de créer la datasource")
+
+            for table in catalog.tables:
+                # Créer la table SANS description (sera enrichie plus tard)
+                # L'upsert (ON CONFLICT ... RETURNING id) renvoie l'id même si elle existe déjà
+                table_id = add_table(
+                    datasource_id=datasource_id,
+                    name=table.name,
+                    description=None,  # Pas de description pour l'instant
+                    row_count=table.row_count,
+                    conn=conn,
                 )
-                row = cursor.fetchone()
-                table_id = row["id"] if row else None
-                conn.close()
-
-            if table_id:
-                stats["tables"] += 1
-
-                for col in table.columns:
-                    # Construire le full_context pour cette colonne (stats complètes)
-                    full_context = build_column_full_context(col)
-
-                    # Créer la colonne SANS description mais AVEC full_context
-                    column_id = add_column(
-                        table_id=table_id,
-                        name=col.name,
-                        data_type=col.data_type,
-                        description=None,  # Sera enrichi par LLM plus tard
-                        sample_values=", ".join(col.sample_values) if col.sample_values else None,
-                        value_range=col.value_range,
-                        is_primary_key=col.is_primary_key,
-                        full_context=full_context if full_context else None,
+
+                if table_id:
+                    stats["tables"] += 1
+
+                    # Colonnes SANS description (enrichies par LLM plus tard) mais AVEC
+                    # full_context (stats complètes), insérées en une seule requête
+                    column_ids = add_columns(
+                        table_id,
+                        [
+                            {
+                                "name": col.name,
+                                "data_type": col.data_type,
+                                "sample_values": get_sample_values_str(col),
+                                "value_range": col.value_range,
+                                "is_primary_key": col.is_primary_key,
+                                "full_context": get_column_full_context(col) or None,
+                            }
+                            for col in table.columns
+                        ],
+                        conn=conn,
                     )
+                    stats["columns"] += len(column_ids)
 
-                    if column_id:
-                        stats["columns"] += 1
+        # Calculer la période des données une fois pour toutes (réutilisée par les KPIs).
+        # Période indéterminable: None n'est pas écrit, la colonne reste NULL et
+        # la période sera recalculée à la génération des KPIs
+        update_datasource(datasource_id, data_period=get_data_period(db_connection))
 
         logger.info("  %d tables, %d colonnes extraites", stats["tables"], stats["columns"])
     logger.info("Vous pouvez maintenant désactiver les tables non souhaitées")
@@ -168,13 +178,16 @@ def extract_only(
         "status": "ok",
         "message": f"Extraction terminée: {stats['tables']} tables extraites",
         "stats": stats,
-        "datasource": catalog.datasource.replace(".duckdb", ""),
+        "datasource": source_name,
         "tables": [t.name for t in catalog.tables],
     }
 
 
 def enrich_selected_tables(
-    table_ids: list[int], db_connection: DuckDBConnection, job_id: int | None = None
+    table_ids: list[int],
+    db_connection: DuckDBConnection,
+    job_id: int | None = None,
+    use_cache: bool = True,
 ) -> dict[str, Any]:
     """
     Enrichit les tables sélectionnées par l'utilisateur.
@@ -188,6 +201,7 @@ def enrich_selected_tables(
         table_ids: Liste des IDs des tables à enrichir
         db_connection: Connexion DuckDB native (pour KPIs uniquement)
         job_id: ID du job pour le tracking (optionnel)
+        use_cache: Réutilise les réponses LLM en cache; False force de nouveaux appels
 
     Returns:
         Stats d'enrichissement + validation
@@ -201,9 +215,12 @@ def enrich_selected_tables(
             "stats": {"tables": 0, "columns": 0, "synonyms": 0, "kpis": 0},
         }
 
-    # Calculer nombre de steps dynamiquement
+    # Calculer nombre de steps dynamiquement (estimation par nombre de tables,
+    # corrigée par _enrich_tables une fois les batches constitués)
     max_batch_setting = get_setting("max_tables_per_batch")
-    max_tables_per_batch = int(max_batch_setting) if max_batch_setting else 4
+    max_tables_per_batch = (
+        int(max_batch_setting) if max_batch_setting else CatalogConfig.DEFAULT_MAX_TABLES_PER_BATCH
+    )
     num_batches = (len(table_ids) + max_tables_per_batch - 1) // max_tables_per_batch
     # Steps: update_enabled + fetch_tables + N*llm_batch + save_descriptions + generate_kpis + generate_questions
     total_steps = 2 + num_batches + 3
@@ -217,14 +234,15 @@ def enrich_selected_tables(
         conn = get_connection()
         cursor = conn.cursor()
 
-        # Désactiver toutes les tables
-        cursor.execute("UPDATE tables SET is_enabled = FALSE")
-
-        # Activer seulement les tables sélectionnées
-        placeholders = ",".join("%s" for _ in table_ids)
+        # Activer seulement les tables sélectionnées, désactiver les autres (une requête,
+        # SQL constant: la liste d'IDs est passée en tableau). Les lignes déjà dans le
+        # bon état ne sont pas réécrites (pas de nouvelle version MVCC ni de WAL)
         cursor.execute(
-            f"UPDATE tables SET is_enabled = TRUE WHERE id IN ({placeholders})",  # noqa: S608
-            table_ids,
+            """
+            UPDATE tables SET is_enabled = (id = ANY(%s))
+            WHERE is_enabled IS DISTINCT FROM (id = ANY(%s))
+        """,
+            (table_ids, table_ids),
         )
         conn.commit()
 
@@ -234,18 +252,20 @@ def enrich_selected_tables(
     with workflow.step("fetch_tables") if workflow else _dummy_context():
         logger.info("2/N - Récupération des tables sélectionnées")
         cursor.execute(
-            f"""
-            SELECT t.id, t.name, t.row_count, d.id as datasource_id, d.name as datasource_name
+            """
+            SELECT t.id, t.name, t.row_count, d.id as datasource_id, d.name as datasource_name,
+                   d.data_period
             FROM tables t
             JOIN datasources d ON t.datasource_id = d.id
-            WHERE t.id IN ({placeholders})
+            WHERE t.id = ANY(%s)
         """,
-            table_ids,
+            (table_ids,),
         )
         selected_tables = cursor.fetchall()
 
-        # Récupérer le nom de la datasource (même pour toutes les tables)
+        # Récupérer le nom et la période de la datasource (mêmes pour toutes les tables)
         datasource_name = selected_tables[0]["datasource_name"] if selected_tables else "DuckDB"
+        data_period = selected_tables[0].get("data_period") if selected_tables else None
         conn.close()
 
         if not selected_tables:
@@ -258,83 +278,158 @@ def enrich_selected_tables(
         logger.info("  %d tables à enrichir", len(selected_tables))
 
     # Suite: construire le catalogue et enrichir
-    return _enrich_tables(selected_tables, db_connection, workflow, datasource_name)
+    return _enrich_tables(
+        selected_tables,
+        db_connection,
+        workflow,
+        datasource_name,
+        data_period,
+        max_tables_per_batch=max_tables_per_batch,
+        use_cache=use_cache,
+    )
 
 
-def _run_llm_batches(
+def _pack_batches(
     tables_info: list[tuple[TableMetadata, str]],
+    max_tables_per_batch: int,
+    max_tokens: int,
+) -> list[list[tuple[TableMetadata, str]]]:
+    """
+    Regroupe les tables en batches consécutifs, remplis jusqu'à max_tables_per_batch
+    tables ou max_tokens tokens estimés de contexte.
+
+    Une table dont le contexte dépasse seul le budget forme son propre batch
+    (la limite du prompt est vérifiée par enrich_with_llm).
+    """
+    batches: list[list[tuple[TableMetadata, str]]] = []
+    current: list[tuple[TableMetadata, str]] = []
+    current_tokens = 0
+
+    for info in tables_info:
+        tokens = estimate_tokens(info[1])
+        if current and (
+            len(current) >= max_tables_per_batch or current_tokens + tokens > max_tokens
+        ):
+            batches.append(current)
+            current = []
+            current_tokens = 0
+        current.append(info)
+        current_tokens += tokens
+
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _plan_batches(
+    tables_info: list[tuple[TableMetadata, str]], max_tables_per_batch: int
+) -> list[list[tuple[TableMetadata, str]]]:
+    """Découpe les tables en batches LLM (bornés en tables et en tokens estimés)."""
+    max_batch_tokens = int(LLMConfig.MAX_INPUT_TOKENS * CatalogConfig.LLM_BATCH_INPUT_RATIO)
+    batches = _pack_batches(tables_info, max_tables_per_batch, max_batch_tokens)
+
+    logger.info(
+        "Enrichissement avec LLM (%d batch(es) de %d tables / ~%d tokens max)",
+        len(batches),
+        max_tables_per_batch,
+        max_batch_tokens,
+    )
+    return batches
+
+
+def _run_llm_batches(
+    batches: list[list[tuple[TableMetadata, str]]],
     workflow: "WorkflowManager | None",
     max_tables_per_batch: int,
-) -> tuple[dict[str, Any], list[CatalogValidationResult]] | dict[str, Any]:
+    use_cache: bool = True,
+) -> tuple[dict[str, Any], CatalogValidationResult] | dict[str, Any]:
     """
     Enrichit les tables par batch avec gestion des erreurs Vertex AI.
 
     Args:
-        tables_info: Liste de (TableMetadata, context_string)
+        batches: Batches de (TableMetadata, context_string), voir _plan_batches
         workflow: WorkflowManager pour tracking (optionnel)
-        max_tables_per_batch: Nombre max de tables par batch
+        max_tables_per_batch: Nombre max de tables par batch (message d'erreur)
+        use_cache: Réutilise les réponses LLM en cache (voir enrich_with_llm)
 
     Returns:
-        Tuple (enrichments_dict, validations_list) ou dict erreur
+        Tuple (enrichments_dict, validation cumulée des batches) ou dict erreur
     """
-    # Diviser en batches
-    batches = [
-        tables_info[i : i + max_tables_per_batch]
-        for i in range(0, len(tables_info), max_tables_per_batch)
-    ]
-
-    logger.info(
-        "Enrichissement avec LLM (%d batch(es) de %d tables max)",
-        len(batches),
-        max_tables_per_batch,
+    max_parallel_setting = get_setting("llm_max_parallel")
+    max_parallel = (
+        int(max_parallel_setting)
+        if max_parallel_setting
+        else CatalogConfig.DEFAULT_LLM_MAX_PARALLEL
     )
 
     all_enrichments: dict[str, Any] = {}
-    all_validations: list[CatalogValidationResult] = []
+    # Validation cumulée au fil des batches (pas de liste de résultats à fusionner)
+    validation = CatalogValidationResult()
 
-    for batch_idx, batch in enumerate(batches):
-        batch_tables = [info[0] for info in batch]
-        batch_context = chr(10).join([info[1] for info in batch])
+    batch_inputs = [
+        (
+            ExtractedCatalog(datasource="g7_analytics.duckdb", tables=[info[0] for info in batch]),
+            "\n".join([info[1] for info in batch]),
+        )
+        for batch in batches
+    ]
 
-        with workflow.step(f"llm_batch_{batch_idx + 1}") if workflow else _dummy_context():
-            logger.info(
-                "  Batch %d/%d: %s", batch_idx + 1, len(batches), [t.name for t in batch_tables]
+    # Les batches sont indépendants: appels LLM concurrents (bornés par llm_max_parallel),
+    # résultats consommés dans l'ordre pour garder la progression du workflow.
+    with ThreadPoolExecutor(max_workers=max(1, min(max_parallel, len(batches)))) as executor:
+        futures = [
+            executor.submit(
+                enrich_with_llm, batch_catalog, tables_context=batch_context, use_cache=use_cache
             )
-            batch_catalog = ExtractedCatalog(datasource="g7_analytics.duckdb", tables=batch_tables)
-
-            try:
-                batch_enrichment = enrich_with_llm(batch_catalog, tables_context=batch_context)
-            except Exception as e:
-                error_msg = str(e).lower()
-                if "too many states" in error_msg or "constraint" in error_msg:
-                    total_cols = sum(len(t.columns) for t in batch_tables)
+            for batch_catalog, batch_context in batch_inputs
+        ]
+
+        for batch_idx, future in enumerate(futures):
+            batch_catalog = batch_inputs[batch_idx][0]
+            batch_tables = batch_catalog.tables
+
+            with workflow.step(f"llm_batch_{batch_idx + 1}") if workflow else _dummy_context():
+                logger.info(
+                    "  Batch %d/%d: %d tables", batch_idx + 1, len(batches), len(batch_tables)
+                )
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("    Tables: %s", ", ".join(t.name for t in batch_tables))
+
+                try:
+                    batch_enrichment = future.result()
+                except Exception as e:
+                    # Ne pas lancer les batches encore en attente
+                    for pending in futures:
+                        pending.cancel()
+                    error_msg = str(e).lower()
+                    if "too many states" in error_msg or "constraint" in error_msg:
+                        total_cols = sum(len(t.columns) for t in batch_tables)
+                        return {
+                            "status": "error",
+                            "error_type": "vertex_ai_schema_too_complex",
+                            "message": (
+                                f"Erreur Vertex AI: schéma trop complexe ({len(batch_tables)} tables, "
+                                f"{total_cols} colonnes). Réduisez 'Batch Size' dans Settings > Database "
+                                f"(actuel: {max_tables_per_batch})."
+                            ),
+                            "suggestion": f"Essayez avec max_tables_per_batch = {max(1, max_tables_per_batch // 2)}",
+                            "stats": {"tables": 0, "columns": 0, "synonyms": 0, "kpis": 0},
+                        }
                     return {
                         "status": "error",
-                        "error_type": "vertex_ai_schema_too_complex",
-                        "message": (
-                            f"Erreur Vertex AI: schéma trop complexe ({len(batch_tables)} tables, "
-                            f"{total_cols} colonnes). Réduisez 'Batch Size' dans Settings > Database "
-                            f"(actuel: {max_tables_per_batch})."
-                        ),
-                        "suggestion": f"Essayez avec max_tables_per_batch = {max(1, max_tables_per_batch // 2)}",
+                        "error_type": "llm_error",
+                        "message": f"Erreur LLM lors du batch {batch_idx + 1}: {e!s}",
                         "stats": {"tables": 0, "columns": 0, "synonyms": 0, "kpis": 0},
                     }
-                return {
-                    "status": "error",
-                    "error_type": "llm_error",
-                    "message": f"Erreur LLM lors du batch {batch_idx + 1}: {e!s}",
-                    "stats": {"tables": 0, "columns": 0, "synonyms": 0, "kpis": 0},
-                }
 
-            all_enrichments.update(batch_enrichment)
-            batch_validation = validate_catalog_enrichment(batch_catalog, batch_enrichment)
-            all_validations.append(batch_validation)
+                all_enrichments.update(batch_enrichment)
+                validation.merge(validate_catalog_enrichment(batch_catalog, batch_enrichment))
 
-    return all_enrichments, all_validations
+    return all_enrichments, validation
 
 
 def _persist_enrichments(
-    tables_info: list[tuple[TableMetadata, str]],
+    full_catalog: ExtractedCatalog,
     enrichments: dict[str, Any],
     workflow: "WorkflowManager | None",
 ) -> dict[str, int | str]:
@@ -342,16 +437,13 @@ def _persist_enrichments(
     Sauvegarde les descriptions enrichies dans PostgreSQL.
 
     Args:
-        tables_info: Liste de (TableMetadata, context_string)
+        full_catalog: Catalogue de toutes les tables enrichies
         enrichments: Dictionnaire des enrichissements LLM
         workflow: WorkflowManager pour tracking (optionnel)
 
     Returns:
         Stats dict avec tables, columns, synonyms
     """
-    all_tables_metadata = [info[0] for info in tables_info]
-    full_catalog = ExtractedCatalog(datasource="g7_analytics.duckdb", tables=all_tables_metadata)
-
     with workflow.step("save_descriptions") if workflow else _dummy_context():
         logger.info("Mise à jour des descriptions")
         desc_stats = update_descriptions(full_catalog, enrichments)
@@ -371,31 +463,40 @@ def _persist_enrichments(
 
 
 def _generate_artifacts(
-    tables_info: list[tuple[TableMetadata, str]],
+    full_catalog: ExtractedCatalog,
     db_connection: DuckDBConnection,
     stats: dict[str, int | str],
     workflow: "WorkflowManager | None",
+    data_period: str | None = None,
 ) -> dict[str, int | str]:
     """
     Génère les KPIs et questions suggérées.
 
+    Appelé après update_descriptions (les questions relisent les descriptions
+    commitées). Les deux appels LLM se chevauchent: latence ≈ max(kpis, questions).
+
     Args:
-        tables_info: Liste de (TableMetadata, context_string)
+        full_catalog: Catalogue de toutes les tables enrichies
         db_connection: Connexion DuckDB pour les KPIs
         stats: Stats existantes à enrichir
         workflow: WorkflowManager pour tracking (optionnel)
+        data_period: Période calculée à l'extraction (sinon recalculée depuis DuckDB)
 
     Returns:
         Stats enrichies avec kpis et questions
     """
-    all_tables_metadata = [info[0] for info in tables_info]
-    full_catalog = ExtractedCatalog(datasource="g7_analytics.duckdb", tables=all_tables_metadata)
+    # Période lue avant de lancer le worker: DuckDB reste sur ce thread
+    if not data_period:
+        data_period = get_data_period(db_connection) or DATA_PERIOD_UNKNOWN
+
+    # Questions lancées en arrière-plan: leur appel LLM chevauche la génération des KPIs
+    questions_future = _questions_executor.submit(generate_suggested_questions, full_catalog)
 
     # Génération des KPIs
     with workflow.step("generate_kpis") if workflow else _dummy_context():
         logger.info("Génération des KPIs")
         try:
-            kpis_result = generate_kpis(full_catalog, db_connection)
+            kpis_result = generate_kpis(full_catalog, db_connection, data_period=data_period)
             kpis_stats = save_kpis(kpis_result)
             stats["kpis"] = kpis_stats["kpis"]
             logger.info("  %d KPIs générés", kpis_stats["kpis"])
@@ -408,8 +509,7 @@ def _generate_artifacts(
     with workflow.step("generate_questions") if workflow else _dummy_context():
         logger.info("Génération des questions suggérées")
         try:
-            questions = generate_suggested_questions(full_catalog)
-            questions_stats = save_suggested_questions(questions)
+            questions_stats = save_suggested_questions(questions_future.result())
             stats["questions"] = questions_stats["questions"]
             logger.info("  %d questions générées", questions_stats["questions"])
         except QuestionGenerationError as e:
@@ -422,7 +522,7 @@ def _generate_artifacts(
 
 def _build_enrichment_response(
     stats: dict[str, int | str],
-    validations: list[CatalogValidationResult],
+    validation: CatalogValidationResult,
     datasource_name: str,
 ) -> dict[str, Any]:
     """
@@ -430,34 +530,25 @@ def _build_enrichment_response(
 
     Args:
         stats: Statistiques d'enrichissement
-        validations: Liste des résultats de validation par batch
+        validation: Validation cumulée des batches
         datasource_name: Nom de la datasource
 
     Returns:
         Réponse formatée pour l'API
     """
     # Log du résumé des validations
-    total_issues = sum(len(v.issues) for v in validations)
+    total_issues = len(validation.issues) + validation.issues_truncated
     if total_issues == 0:
         logger.info("  Validation: [OK]")
     else:
         logger.warning("  Validation: %d problèmes", total_issues)
 
-    # Fusionner les validations
-    combined_validation = CatalogValidationResult()
-    combined_validation.tables_ok = sum(v.tables_ok for v in validations)
-    combined_validation.tables_warning = sum(v.tables_warning for v in validations)
-    combined_validation.columns_ok = sum(v.columns_ok for v in validations)
-    combined_validation.columns_warning = sum(v.columns_warning for v in validations)
-    combined_validation.synonyms_total = sum(v.synonyms_total for v in validations)
-    combined_validation.issues = [issue for v in validations for issue in v.issues]
-
     return {
         "status": "ok",
         "message": f"Enrichissement terminé: {stats['tables']} tables enrichies",
         "stats": stats,
         "datasource": datasource_name,
-        "validation": combined_validation.to_dict(),
+        "validation": validation.to_dict(),
     }
 
 
@@ -466,6 +557,9 @@ def _enrich_tables(
     db_connection: DuckDBConnection,
     workflow: "WorkflowManager | None" = None,
     datasource_name: str = "DuckDB",
+    data_period: str | None = None,
+    max_tables_per_batch: int = CatalogConfig.DEFAULT_MAX_TABLES_PER_BATCH,
+    use_cache: bool = True,
 ) -> dict[str, Any]:
     """
     Fonction interne d'enrichissement (orchestration).
@@ -481,29 +575,37 @@ def _enrich_tables(
         db_connection: Connexion DuckDB (pour les KPIs uniquement)
         workflow: WorkflowManager pour tracking (optionnel)
         datasource_name: Nom de la datasource pour le retour
+        data_period: Période des données calculée à l'extraction (optionnel)
+        max_tables_per_batch: Nombre max de tables par batch LLM
+        use_cache: Réutilise les réponses LLM en cache (voir enrich_with_llm)
 
     Returns:
         Stats d'enrichissement
     """
-    # Configuration batch
-    max_batch_setting = get_setting("max_tables_per_batch")
-    max_tables_per_batch = int(max_batch_setting) if max_batch_setting else 15
-
     # 1. Charger le contexte des tables
     tables_info = load_tables_context(tables_rows)
 
-    # 2. Enrichir par batches
-    result = _run_llm_batches(tables_info, workflow, max_tables_per_batch)
+    # 2. Enrichir par batches (découpage fait une fois: il fixe aussi le nombre de steps)
+    batches = _plan_batches(tables_info, max_tables_per_batch)
+    if workflow:
+        # Steps restants: N*llm_batch + save_descriptions + generate_kpis + generate_questions
+        workflow.set_total_steps(workflow.current_step_index + len(batches) + 3)
+    result = _run_llm_batches(batches, workflow, max_tables_per_batch, use_cache)
     if isinstance(result, dict):
         # Erreur retournée
         return result
-    enrichments, validations = result
+    enrichments, validation = result
+
+    # Catalogue complet construit une fois pour la persistance et les artefacts
+    full_catalog = ExtractedCatalog(
+        datasource="g7_analytics.duckdb", tables=[info[0] for info in tables_info]
+    )
 
     # 3. Persister les enrichissements
-    stats = _persist_enrichments(tables_info, enrichments, workflow)
+    stats = _persist_enrichments(full_catalog, enrichments, workflow)
 
     # 4. Générer les artefacts
-    stats = _generate_artifacts(tables_info, db_connection, stats, workflow)
+    stats = _generate_artifacts(full_catalog, db_connection, stats, workflow, data_period)
 
     # 5. Construire la réponse
-    return _build_enrichment_response(stats, validations, datasource_name)
+    return _build_enrichment_response(stats, validation, datasource_name)
@@ -6,16 +6,26 @@ Chargement du contexte des tables pour enrichissement.
 """
 
 import logging
-from contextlib import suppress
 from typing import Any
 
-from catalog import add_column, add_datasource, add_synonym, add_table
-from db import get_connection
+import psycopg2.extensions
+from psycopg2.extras import execute_values
 
+from catalog import add_columns, add_datasource, add_synonyms, add_table
+from db import get_connection, get_db, set_async_commit
+
+from .extraction import get_sample_values_str
 from .models import ColumnMetadata, ExtractedCatalog, TableMetadata
 
 logger = logging.getLogger(__name__)
 
+# Lignes reçues par aller-retour du curseur serveur de load_tables_context
+_COLUMNS_ITERSIZE = 256
+
+# Ligne de colonne du contexte LLM (méthodes format liées une seule fois)
+_COL_FMT = "  - {} ({}) {}".format
+_COL_FMT_NO_CONTEXT = "  - {} ({})".format
+
 
 def save_to_catalog(
     catalog: ExtractedCatalog, enrichment: dict[str, Any], db_path: str | None = None
@@ -23,96 +33,74 @@ def save_to_catalog(
     """
     Sauvegarde le catalogue enrichi dans PostgreSQL.
 
+    Une seule connexion et une seule transaction: une requête par table, une
+    requête multi-lignes pour ses colonnes, puis une pour tous les synonymes.
+    Le commit n'attend pas le flush du WAL (catalogue régénérable, voir
+    db.set_async_commit).
+
     Retourne les statistiques: tables, columns, synonyms créés.
     """
-    # Créer la datasource
-    datasource_id = add_datasource(
-        name=catalog.datasource.replace(".duckdb", ""),
-        ds_type="duckdb",
-        path=db_path,
-        description="Base analytique générée automatiquement",
-    )
+    datasource_name = catalog.datasource.removesuffix(".duckdb")
+    stats = {"tables": 0, "columns": 0, "synonyms": 0}
 
-    if datasource_id is None:
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT id FROM datasources WHERE name = %s",
-            (catalog.datasource.replace(".duckdb", ""),),
-        )
-        row = cursor.fetchone()
-        datasource_id = row["id"] if row else None
-        conn.close()
+    with get_db() as conn:
+        set_async_commit(conn.cursor())
 
-    if datasource_id is None:
-        raise ValueError("Impossible de créer la datasource")
+        # Créer la datasource (id via RETURNING, pas de relecture)
+        datasource_id = add_datasource(
+            name=datasource_name,
+            ds_type="duckdb",
+            path=db_path,
+            description="Base analytique générée automatiquement",
+            conn=conn,
+        )
 
-    stats = {"tables": 0, "columns": 0, "synonyms": 0}
+        if datasource_id is None:
+            raise ValueError("Impossible de créer la datasource")
 
-    for table in catalog.tables:
-        # Récupérer l'enrichissement de la table
-        table_enrichment = enrichment.get(table.name, {})
-        table_description = table_enrichment.get("description")
-        columns_enrichment = table_enrichment.get("columns", {})
+        synonym_rows: list[tuple[int, str]] = []
 
-        # Créer la table
-        table_id = add_table(
-            datasource_id=datasource_id,
-            name=table.name,
-            description=table_description,
-            row_count=table.row_count,
-        )
+        for table in catalog.tables:
+            # Récupérer l'enrichissement de la table
+            table_enrichment = enrichment.get(table.name, {})
+            columns_enrichment = table_enrichment.get("columns", {})
 
-        if table_id is None:
-            conn = get_connection()
-            cursor = conn.cursor()
-            cursor.execute(
-                "SELECT id FROM tables WHERE datasource_id = %s AND name = %s",
-                (datasource_id, table.name),
+            # Créer la table (upsert: l'id est renvoyé même si elle existe déjà)
+            table_id = add_table(
+                datasource_id=datasource_id,
+                name=table.name,
+                description=table_enrichment.get("description"),
+                row_count=table.row_count,
+                conn=conn,
             )
-            row = cursor.fetchone()
-            table_id = row["id"] if row else None
-            conn.close()
-
-        if table_id:
+            if not table_id:
+                continue
             stats["tables"] += 1
 
-            for col in table.columns:
-                # Récupérer l'enrichissement de la colonne
-                col_enrichment = columns_enrichment.get(col.name, {})
-                col_description = col_enrichment.get("description")
-                synonyms = col_enrichment.get("synonyms", [])
-
-                # Créer la colonne
-                column_id = add_column(
-                    table_id=table_id,
-                    name=col.name,
-                    data_type=col.data_type,
-                    description=col_description,
-                    sample_values=", ".join(col.sample_values) if col.sample_values else None,
-                    value_range=col.value_range,
-                    is_primary_key=col.is_primary_key,
-                )
+            # Colonnes de la table en une seule requête (ids dans l'ordre des colonnes)
+            column_ids = add_columns(
+                table_id,
+                [
+                    {
+                        "name": col.name,
+                        "data_type": col.data_type,
+                        "description": columns_enrichment.get(col.name, {}).get("description"),
+                        "sample_values": get_sample_values_str(col),
+                        "value_range": col.value_range,
+                        "is_primary_key": col.is_primary_key,
+                    }
+                    for col in table.columns
+                ],
+                conn=conn,
+            )
+            stats["columns"] += len(column_ids)
 
-                if column_id is None:
-                    conn = get_connection()
-                    cursor = conn.cursor()
-                    cursor.execute(
-                        "SELECT id FROM columns WHERE table_id = %s AND name = %s",
-                        (table_id, col.name),
-                    )
-                    row = cursor.fetchone()
-                    column_id = row["id"] if row else None
-                    conn.close()
-
-                if column_id:
-                    stats["columns"] += 1
-
-                    # Ajouter les synonymes
-                    for synonym in synonyms:
-                        with suppress(Exception):  # Ignorer les doublons
-                            add_synonym(column_id, synonym)
-                            stats["synonyms"] += 1
+            for column_id, col in zip(column_ids, table.columns, strict=True):
+                synonyms = columns_enrichment.get(col.name, {}).get("synonyms", [])
+                synonym_rows.extend((column_id, synonym) for synonym in synonyms)
+
+        # Tous les synonymes en une seule requête
+        stats["synonyms"] = add_synonyms(synonym_rows, conn=conn)
 
     return stats
 
@@ -120,75 +108,117 @@ def save_to_catalog(
 def update_descriptions(catalog: ExtractedCatalog, enrichment: dict[str, Any]) -> dict[str, int]:
     """
     Met à jour les descriptions des tables et colonnes existantes.
-    Utilise une seule connexion pour éviter les deadlocks PostgreSQL.
+
+    Une seule connexion (évite les deadlocks PostgreSQL) et un nombre constant de
+    requêtes: une lecture des ids, puis une requête multi-lignes par type d'écriture,
+    le tout dans une transaction.
+
+    Le commit n'attend pas le flush du WAL (db.set_async_commit): un crash peut
+    perdre ce dernier enrichissement, et il suffit de le relancer.
     """
+    stats = {"tables": 0, "columns": 0, "synonyms": 0}
+    table_names = [table.name for table in catalog.tables]
+    if not table_names:
+        return stats
+
     conn = get_connection()
     cursor = conn.cursor()
 
-    stats = {"tables": 0, "columns": 0, "synonyms": 0}
+    # Ids des tables et de leurs colonnes en une requête
+    cursor.execute(
+        """
+        SELECT t.id AS table_id, t.name AS table_name, c.id AS column_id, c.name AS column_name
+        FROM tables t
+        LEFT JOIN columns c ON c.table_id = t.id
+        WHERE t.name = ANY(%s)
+        ORDER BY t.id
+    """,
+        (table_names,),
+    )
+    table_ids: dict[str, int] = {}
+    column_ids: dict[tuple[int, str], int] = {}
+    for row in cursor.fetchall():
+        table_ids.setdefault(row["table_name"], row["table_id"])
+        if row["column_id"] is not None:
+            column_ids[(row["table_id"], row["column_name"])] = row["column_id"]
+
+    table_updates: list[tuple[str, str]] = []
+    column_updates: list[tuple[int, str]] = []
+    synonym_inserts: list[tuple[int, str]] = []
 
     for table in catalog.tables:
         table_enrichment = enrichment.get(table.name, {})
         table_description = table_enrichment.get("description")
         columns_enrichment = table_enrichment.get("columns", {})
 
-        # Mettre à jour la description de la table
         if table_description:
-            cursor.execute(
-                """
-                UPDATE tables SET description = %s, updated_at = CURRENT_TIMESTAMP
-                WHERE name = %s
-            """,
-                (table_description, table.name),
-            )
-            if cursor.rowcount > 0:
-                stats["tables"] += 1
+            table_updates.append((table.name, table_description))
 
-        # Récupérer l'ID de la table
-        cursor.execute("SELECT id FROM tables WHERE name = %s", (table.name,))
-        table_row = cursor.fetchone()
-        if not table_row:
+        table_id = table_ids.get(table.name)
+        if table_id is None:
             continue
-        table_id = table_row["id"]
 
-        # Mettre à jour les colonnes
         for col in table.columns:
+            column_id = column_ids.get((table_id, col.name))
+            if column_id is None:
+                continue
             col_enrichment = columns_enrichment.get(col.name, {})
             col_description = col_enrichment.get("description")
-            synonyms = col_enrichment.get("synonyms", [])
-
             if col_description:
-                cursor.execute(
-                    """
-                    UPDATE columns SET description = %s
-                    WHERE table_id = %s AND name = %s
-                """,
-                    (col_description, table_id, col.name),
-                )
-                if cursor.rowcount > 0:
-                    stats["columns"] += 1
-
-            # Ajouter les synonymes (directement, sans ouvrir une nouvelle connexion)
-            if synonyms:
-                cursor.execute(
-                    """
-                    SELECT id FROM columns WHERE table_id = %s AND name = %s
-                """,
-                    (table_id, col.name),
-                )
-                col_row = cursor.fetchone()
-                if col_row:
-                    column_id = col_row["id"]
-                    for synonym in synonyms:
-                        with suppress(Exception):
-                            cursor.execute(
-                                "INSERT INTO synonyms (column_id, term) VALUES (%s, %s)",
-                                (column_id, synonym),
-                            )
-                            stats["synonyms"] += 1
-
-    conn.commit()
-    conn.close()
+                column_updates.append((column_id, col_description))
+            synonym_inserts.extend(
+                (column_id, synonym) for synonym in col_enrichment.get("synonyms", [])
+            )
+
+    try:
+        set_async_commit(cursor)
+
+        if table_updates:
+            updated = execute_values(
+                cursor,
+                """
+                UPDATE tables SET description = v.description, updated_at = CURRENT_TIMESTAMP
+                FROM (VALUES %s) AS v(name, description)
+                WHERE tables.name = v.name
+                RETURNING v.name
+            """,
+                table_updates,
+                page_size=len(table_updates),
+                fetch=True,
+            )
+            stats["tables"] = len({row["name"] for row in updated})
+
+        if column_updates:
+            updated = execute_values(
+                cursor,
+                """
+                UPDATE columns SET description = v.description
+                FROM (VALUES %s) AS v(id, description)
+                WHERE columns.id = v.id
+                RETURNING columns.id
+            """,
+                column_updates,
+                page_size=len(column_updates),
+                fetch=True,
+            )
+            stats["columns"] = len(updated)
+
+        if synonym_inserts:
+            inserted = execute_values(
+                cursor,
+                """
+                INSERT INTO synonyms (column_id, term) VALUES %s
+                ON CONFLICT DO NOTHING RETURNING id
+            """,
+                synonym_inserts,
+                page_size=len(synonym_inserts),
+                fetch=True,
+            )
+            stats["synonyms"] = len(inserted)
+
+        conn.commit()
+    finally:
+        conn.close()
     return stats
 
 
@@ -207,56 +237,58 @@ def load_tables_context(
     Returns:
         Liste de tuples (TableMetadata, context_string)
     """
-    conn = get_connection()
-    cursor = conn.cursor()
     tables_info: list[tuple[TableMetadata, str]] = []
-
-    for table_row in tables_rows:
-        table_id = table_row["id"]
-        table_name = table_row["name"]
-        row_count = table_row["row_count"] or 0
-
-        # Récupérer les colonnes depuis PostgreSQL (avec full_context)
+    if not tables_rows:
+        return tables_info
+
+    # Une seule requête pour les colonnes de toutes les tables (avec full_context).
+    # Curseur serveur: les lignes arrivent par paquets et chacune est transformée dès
+    # sa lecture, sans matérialiser tout le résultat. Curseur tuple (pas de dict par
+    # ligne comme RealDictCursor): les colonnes sont dépaquetées par position.
+    columns_by_table: dict[int, tuple[list[str], list[ColumnMetadata]]] = {}
+    conn = get_connection()
+    try:
+        cursor = conn.cursor(name="load_tables_context", cursor_factory=psycopg2.extensions.cursor)
+        cursor.itersize = _COLUMNS_ITERSIZE
         cursor.execute(
             """
-            SELECT name, data_type, full_context, sample_values, value_range
-            FROM columns WHERE table_id = %s ORDER BY id
+            SELECT table_id, name, data_type, full_context, sample_values, value_range
+            FROM columns WHERE table_id = ANY(%s) ORDER BY table_id, id
             """,
-            (table_id,),
+            ([row["id"] for row in tables_rows],),
         )
-        columns_rows = cursor.fetchall()
-        logger.info("  Lecture depuis PostgreSQL: %s (%d colonnes)", table_name, len(columns_rows))
-
-        # Construire le contexte et les métadonnées
-        cols_desc = []
-        columns_result = []
-
-        for col_row in columns_rows:
-            col_name = col_row["name"]
-            col_type = col_row["data_type"]
-            full_context = col_row["full_context"] or ""
-
-            col_line = f"  - {col_name} ({col_type})"
-            if full_context:
-                col_line += f" {full_context}"
-            cols_desc.append(col_line)
+        for table_id, col_name, col_type, full_context, sample_values, value_range in cursor:
+            col_lines, columns = columns_by_table.setdefault(table_id, ([], []))
+            col_lines.append(
+                _COL_FMT(col_name, col_type, full_context)
+                if full_context
+                else _COL_FMT_NO_CONTEXT(col_name, col_type)
+            )
 
-            columns_result.append(
+            columns.append(
                 ColumnMetadata(
                     name=col_name,
                     data_type=col_type,
-                    sample_values=col_row["sample_values"].split(", ")
-                    if col_row["sample_values"]
-                    else [],
-                    value_range=col_row["value_range"],
+                    sample_values=sample_values.split(", ") if sample_values else [],
+                    # Déjà stocké joint par ", " (get_sample_values_str): pas de re-join
+                    sample_values_str=sample_values or None,
+                    value_range=value_range,
                 )
             )
+    finally:
+        conn.close()
+
+    for table_row in tables_rows:
+        table_name = table_row["name"]
+        row_count = table_row["row_count"] or 0
+        col_lines, columns_result = columns_by_table.get(table_row["id"], ([], []))
+        logger.debug("  Lecture depuis PostgreSQL: %s (%d colonnes)", table_name, len(col_lines))
 
-        context_part = (
-            f"\nTable: {table_name} ({row_count:,} lignes)\nColonnes:\n{chr(10).join(cols_desc)}\n"
+        # Contexte de la table (lignes jointes une seule fois)
+        context_part = "\n".join(
+            [f"\nTable: {table_name} ({row_count:,} lignes)", "Colonnes:", *col_lines, ""]
         )
         table_metadata = TableMetadata(name=table_name, row_count=row_count, columns=columns_result)
         tables_info.append((table_metadata, context_part))
 
-    conn.close()
     return tables_info
@@ -9,6 +9,8 @@ from typing import Any
 
 logger = logging.getLogger(__name__)
 
+from psycopg2.extras import execute_values
+
 from catalog import get_schema_for_llm
 from db import get_connection
 from llm_config import get_active_prompt
@@ -96,28 +98,32 @@ def save_suggested_questions(questions: list[dict[str, str]]) -> dict[str, int]:
     if not questions:
         return {"questions": 0}
 
+    rows = [
+        (q.get("question"), q.get("category"), q.get("icon"), i) for i, q in enumerate(questions)
+    ]
+
     conn = get_connection()
     cursor = conn.cursor()
 
     stats = {"questions": 0}
 
-    # Vider les anciennes questions
-    cursor.execute("DELETE FROM suggested_questions")
-
-    # Insérer les nouvelles
-    for i, q in enumerate(questions):
-        try:
-            cursor.execute(
-                """
-                INSERT INTO suggested_questions (question, category, icon, display_order, is_enabled)
-                VALUES (%s, %s, %s, %s, TRUE)
-            """,
-                (q.get("question"), q.get("category"), q.get("icon"), i),
-            )
-            stats["questions"] += 1
-        except Exception as e:
-            logger.warning("Erreur sauvegarde question: %s", e)
-
-    conn.commit()
-    conn.close()
+    try:
+        # Vider les anciennes questions et insérer les nouvelles (une transaction)
+        cursor.execute("DELETE FROM suggested_questions")
+        execute_values(
+            cursor,
+            """
+            INSERT INTO suggested_questions (question, category, icon, display_order, is_enabled)
+            VALUES %s
+        """,
+            rows,
+            template="(%s, %s, %s, %s, TRUE)",
+        )
+        conn.commit()
+        stats["questions"] = len(rows)
+    except Exception as e:
+        conn.rollback()
+        logger.warning("Erreur sauvegarde questions: %s", e)
+    finally:
+        conn.close()
     return stats
@@ -47,6 +47,18 @@ class CatalogConfig:
     DEFAULT_MAX_TABLES_PER_BATCH = 15
     """Nombre max de tables par batch d'enrichissement LLM."""
 
+    LLM_BATCH_INPUT_RATIO = 0.7
+    """Part de LLMConfig.MAX_INPUT_TOKENS allouée au contexte des tables d'un batch."""
+
+    DEFAULT_LLM_MAX_PARALLEL = 4
+    """Nombre max de batches d'enrichissement envoyés au LLM en parallèle."""
+
+    EXTRACTION_MAX_PARALLEL = 4
+    """Nombre max de tables DuckDB extraites en parallèle (un curseur par thread)."""
+
+    LLM_CACHE_TTL_MINUTES = 7 * 24 * 60
+    """Durée de vie des réponses d'enrichissement en cache (7 jours)."""
+
     MAX_SAMPLE_VALUES = 10
     """Nombre max de valeurs d'exemple par colonne."""
 
@@ -134,6 +134,17 @@ def get_db() -> Generator[psycopg2.extensions.connection, None, None]:
         conn.close()
 
 
+def set_async_commit(cursor: Any) -> None:
+    """
+    Le commit de la transaction courante n'attend pas le flush du WAL.
+
+    Réservé aux écritures en masse régénérables (extraction, enrichissement,
+    KPIs): un crash peut perdre la dernière transaction, sans corrompre la base.
+    SET LOCAL: le réglage prend fin avec la transaction, rien à restaurer.
+    """
+    cursor.execute("SET LOCAL synchronous_commit TO OFF")
+
+
 def _run_migrations_safe() -> None:
     """Exécute les migrations de manière sécurisée."""
     conn = get_connection()
@@ -260,6 +260,54 @@ def _migration_009_bedrock_provider(cursor: Any) -> None:
         """, (provider_id, model_id, display_name, context_window, cost_input, cost_output))
 
 
+def _migration_010_datasource_data_period(cursor: Any) -> None:
+    """Ajoute la période des données (calculée à l'extraction) aux datasources."""
+    if not _table_exists(cursor, "datasources"):
+        return
+
+    if not _column_exists(cursor, "datasources", "data_period"):
+        cursor.execute("ALTER TABLE datasources ADD COLUMN data_period TEXT")
+
+
+def _migration_011_llm_cache(cursor: Any) -> None:
+    """Crée la table de cache des réponses LLM (enrichissement du catalogue)."""
+    if _table_exists(cursor, "llm_cache"):
+        return
+
+    cursor.execute("""
+        CREATE TABLE llm_cache (
+            cache_key TEXT PRIMARY KEY,
+            response TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            expires_at TIMESTAMP
+        )
+    """)
+
+
+def _migration_012_catalog_indexes(cursor: Any) -> None:
+    """Index pour les lookups du catalogue (enrichissement, update_descriptions)."""
+    # columns(table_id) et columns(table_id, name) sont déjà couverts par UNIQUE(table_id, name),
+    # synonyms(column_id) par l'index unique (column_id, term) de la migration 013
+    if _table_exists(cursor, "tables"):
+        # Non unique : le nom d'une table n'est unique que par datasource
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_tables_name ON tables(name)")
+
+
+def _migration_013_synonyms_unique(cursor: Any) -> None:
+    """Un synonyme par (colonne, terme): dédoublonnage par ON CONFLICT DO NOTHING."""
+    if not _table_exists(cursor, "synonyms"):
+        return
+    # Supprimer les doublons existants (garder le plus ancien)
+    cursor.execute("""
+        DELETE FROM synonyms s
+        USING synonyms d
+        WHERE s.column_id = d.column_id AND s.term = d.term AND s.id > d.id
+    """)
+    cursor.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_synonyms_column_term ON synonyms(column_id, term)"
+    )
+
+
 # =============================================================================
 # EXECUTION
 # =============================================================================
@@ -276,6 +324,10 @@ MIGRATIONS = [
     ("007", _migration_007_datasets),
     ("008", _migration_008_datasources_sync),
     ("009", _migration_009_bedrock_provider),
+    ("010", _migration_010_datasource_data_period),
+    ("011", _migration_011_llm_cache),
+    ("012", _migration_012_catalog_indexes),
+    ("013", _migration_013_synonyms_unique),
 ]
 
 
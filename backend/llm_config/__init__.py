@@ -27,6 +27,7 @@ from .models import (
 )
 from .prompts import (
     add_prompt,
+    clear_active_prompt_cache,
     delete_prompt,
     get_active_prompt,
     get_all_prompts,
@@ -57,6 +58,7 @@ __all__ = [
     # Prompts
     "add_prompt",
     "check_local_provider_available",
+    "clear_active_prompt_cache",
     "delete_prompt",
     "get_active_prompt",
     "get_all_prompts",
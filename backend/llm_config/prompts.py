@@ -4,10 +4,18 @@ CRUD operations for LLM prompts.
 Manages prompt templates with versioning and activation.
 """
 
+import time
 from typing import Any
 
 from db import get_connection
 
+# Prompts actifs déjà lus, par clé: (prompt ou None si absent, instant de lecture).
+# Invalidés par toute écriture de prompt; le TTL borne le délai de prise en compte
+# d'une modification faite par un autre process (API vs worker); les tasks
+# Celery le vident au démarrage de chaque job (tasks.catalog.refresh_config_caches).
+_ACTIVE_PROMPT_TTL_SECONDS = 30.0
+_active_prompt_cache: dict[str, tuple[dict[str, Any] | None, float]] = {}
+
 
 def get_prompts(category: str | None = None, active_only: bool = False) -> list[dict[str, Any]]:
     """Récupère la liste des prompts."""
@@ -42,18 +50,31 @@ def get_prompt(key: str, version: str = "normal") -> dict[str, Any] | None:
 
 
 def get_active_prompt(key: str) -> dict[str, Any] | None:
-    """Récupère le prompt actif pour une clé donnée."""
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM llm_prompts WHERE key = %s AND is_active = TRUE", (key,))
-    row = cursor.fetchone()
-    conn.close()
+    """
+    Récupère le prompt actif pour une clé donnée.
 
-    # Fallback: si aucun prompt actif, prendre la version "normal"
-    if not row:
-        return get_prompt(key, "normal")
+    Mis en cache (voir _ACTIVE_PROMPT_TTL_SECONDS); chaque appel reçoit sa propre copie.
+    """
+    cached = _active_prompt_cache.get(key)
+    if cached is not None and time.monotonic() - cached[1] < _ACTIVE_PROMPT_TTL_SECONDS:
+        prompt = cached[0]
+    else:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM llm_prompts WHERE key = %s AND is_active = TRUE", (key,))
+        row = cursor.fetchone()
+        conn.close()
 
-    return dict(row) if row else None
+        # Fallback: si aucun prompt actif, prendre la version "normal"
+        prompt = dict(row) if row else get_prompt(key, "normal")
+        _active_prompt_cache[key] = (prompt, time.monotonic())
+
+    return dict(prompt) if prompt else None
+
+
+def clear_active_prompt_cache() -> None:
+    """Vide le cache des prompts actifs (prochaine lecture depuis PostgreSQL)."""
+    _active_prompt_cache.clear()
 
 
 def add_prompt(
@@ -83,6 +104,7 @@ def add_prompt(
         prompt_id = cursor.fetchone()["id"]
         conn.commit()
         conn.close()
+        clear_active_prompt_cache()
         return prompt_id
     except Exception:
         conn.close()
@@ -116,6 +138,7 @@ def update_prompt(
     conn.commit()
     affected = cursor.rowcount
     conn.close()
+    clear_active_prompt_cache()
     return affected > 0
 
 
@@ -142,6 +165,7 @@ def set_active_prompt(key: str, version: str) -> bool:
     conn.commit()
     affected = cursor.rowcount
     conn.close()
+    _active_prompt_cache.pop(key, None)
     return affected > 0
 
 
@@ -153,6 +177,7 @@ def delete_prompt(prompt_id: int) -> bool:
     conn.commit()
     affected = cursor.rowcount
     conn.close()
+    clear_active_prompt_cache()
     return affected > 0
 
 
@@ -196,6 +221,7 @@ def update_prompt_content(key: str, content: str) -> bool:
         )
 
         conn.commit()
+        _active_prompt_cache.pop(key, None)
         return cursor.rowcount > 0
     finally:
         conn.close()
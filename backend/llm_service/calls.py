@@ -177,9 +177,18 @@ def _handle_llm_failure(
     return llm_error
 
 
+def _build_messages(prompt: str, system_prompt: str | None) -> list[dict[str, Any]]:
+    """Construit les messages (système optionnel + utilisateur) pour litellm.completion."""
+    messages: list[dict[str, Any]] = []
+    if system_prompt:
+        messages.append({"role": "system", "content": system_prompt})
+    messages.append({"role": "user", "content": prompt})
+    return messages
+
+
 def _build_completion_kwargs(
     litellm_model: str,
-    messages: list[dict[str, str]],
+    messages: list[dict[str, Any]],
     api_key: str | None,
     model: dict[str, Any],
     temperature: float,
@@ -252,10 +261,7 @@ def call_llm(
     model, litellm_model, api_key = _prepare_llm_call(model_id)
 
     # Construire les messages
-    messages: list[dict[str, str]] = []
-    if system_prompt:
-        messages.append({"role": "system", "content": system_prompt})
-    messages.append({"role": "user", "content": prompt})
+    messages = _build_messages(prompt, system_prompt)
 
     # Construire les kwargs
     completion_kwargs = _build_completion_kwargs(
@@ -334,10 +340,7 @@ def call_llm_structured(
     model, litellm_model, api_key = _prepare_llm_call(model_id)
 
     # Construire les messages
-    messages: list[dict[str, str]] = []
-    if system_prompt:
-        messages.append({"role": "system", "content": system_prompt})
-    messages.append({"role": "user", "content": prompt})
+    messages = _build_messages(prompt, system_prompt)
 
     # Déterminer le mode Instructor basé sur le provider
     # Gemini ne supporte pas bien le mode TOOLS, utiliser JSON
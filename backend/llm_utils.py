@@ -8,18 +8,24 @@ Utilitaires pour les appels LLM.
 
 import json
 import logging
+import re
 from collections.abc import Callable
 from typing import Any, TypeVar
 
 logger = logging.getLogger(__name__)
 
 
+import orjson
 from tenacity import (
     retry,
     stop_after_attempt,
     wait_exponential,
 )
 
+# orjson parse le JSON 2 à 3x plus vite que json ; ses erreurs héritent de
+# json.JSONDecodeError, la gestion d'erreur reste identique.
+_json_loads: Callable[[str], Any] = orjson.loads
+
 
 # =============================================================================
 # EXCEPTIONS PERSONNALISÉES
@@ -51,6 +57,13 @@ class LLMJsonParseError(LLMGenerationError):
 # =============================================================================
 
 
+# Bloc markdown ```lang ... ``` englobant toute la réponse (capture le contenu)
+_FENCE_RE = re.compile(r"^```[^\n]*\n?(.*?)\n?```$", re.DOTALL)
+
+# Premier caractère ouvrant un objet ou un tableau JSON
+_JSON_START_RE = re.compile(r"[{\[]")
+
+
 def parse_llm_json(content: str, context: str = "LLM") -> dict[str, Any]:
     """
     Parse une réponse JSON depuis un LLM avec nettoyage automatique.
@@ -76,30 +89,18 @@ def parse_llm_json(content: str, context: str = "LLM") -> dict[str, Any]:
     cleaned = content.strip()
 
     # Enlever les balises markdown ```json ou ```
-    if cleaned.startswith("```"):
-        lines = cleaned.split("\n")
-        # Enlever la première ligne (```json ou ```)
-        if lines[0].startswith("```"):
-            lines = lines[1:]
-        # Enlever la dernière ligne si c'est ```
-        if lines and lines[-1].strip() == "```":
-            lines = lines[:-1]
-        cleaned = "\n".join(lines).strip()
+    fence = _FENCE_RE.match(cleaned)
+    if fence:
+        cleaned = fence.group(1).strip()
 
     # Trouver le JSON dans le contenu (chercher { ou [)
-    json_start = -1
-    json_char = None
-
-    for i, char in enumerate(cleaned):
-        if char in "{[":
-            json_start = i
-            json_char = char
-            break
-
-    if json_start == -1 or json_char is None:
+    start = _JSON_START_RE.search(cleaned)
+    if start is None:
         raise LLMJsonParseError(
             f"Réponse {context} ne contient pas de JSON valide: {cleaned[:100]}..."
         )
+    json_start = start.start()
+    json_char = start.group()
 
     # Extraire depuis le début du JSON
     json_content = cleaned[json_start:]
@@ -124,7 +125,7 @@ def parse_llm_json(content: str, context: str = "LLM") -> dict[str, Any]:
 
     # Parser le JSON
     try:
-        parsed: dict[str, Any] = json.loads(json_content)
+        parsed: dict[str, Any] = _json_loads(json_content)
         return parsed
     except json.JSONDecodeError as e:
         raise LLMJsonParseError(
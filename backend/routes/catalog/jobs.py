@@ -143,7 +143,9 @@ async def retry_job(job_id: int) -> dict[str, Any]:
                     status_code=400,
                     detail="Cannot retry enrichment: no table_ids in job details",
                 )
-            task = enrich_catalog_task.delay(run_id, job_id, table_ids, dataset_id)
+            task = enrich_catalog_task.delay(
+                run_id, job_id, table_ids, dataset_id, use_cache=not details.get("force", False)
+            )
             task_id = task.id
             logger.info("Retry enrichment job %s -> task %s", job_id, task_id)
 
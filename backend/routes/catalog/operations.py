@@ -194,6 +194,9 @@ async def enrich_catalog_endpoint(request: EnrichCatalogRequest) -> dict[str, An
 
     Prérequis: avoir fait /catalog/extract d'abord.
 
+    Les réponses LLM identiques sont réutilisées depuis le cache (llm_cache);
+    force=True relance les appels LLM.
+
     Mode:
     - Avec Celery: retourne immédiatement, enrichissement en background
     - Sans Celery: bloque jusqu'à la fin (peut prendre plusieurs minutes)
@@ -240,13 +243,20 @@ async def enrich_catalog_endpoint(request: EnrichCatalogRequest) -> dict[str, An
             "num_batches": num_batches,
             "dataset_id": dataset_id,
             "dataset_name": dataset_name,
+            "force": request.force,
         },
     )
 
     # Lancer l'enrichissement
     if CELERY_AVAILABLE:
         # Mode async: dispatcher vers Celery avec dataset_id pour isolation
-        enrich_catalog_task.delay(run_id=run_id, job_id=job_id, table_ids=request.table_ids, dataset_id=dataset_id)
+        enrich_catalog_task.delay(
+            run_id=run_id,
+            job_id=job_id,
+            table_ids=request.table_ids,
+            dataset_id=dataset_id,
+            use_cache=not request.force,
+        )
         return {
             "status": "pending",
             "message": "Enrichissement démarré en arrière-plan",
@@ -260,7 +270,10 @@ async def enrich_catalog_endpoint(request: EnrichCatalogRequest) -> dict[str, An
 
     def run_enrichment() -> dict[str, Any]:
         return enrich_selected_tables(
-            table_ids=request.table_ids, db_connection=db_conn, job_id=job_id
+            table_ids=request.table_ids,
+            db_connection=db_conn,
+            job_id=job_id,
+            use_cache=not request.force,
         )
 
     try:
@@ -84,6 +84,9 @@ class EnrichCatalogRequest(BaseModel):
     """Requête d'enrichissement avec les IDs des tables sélectionnées."""
 
     table_ids: list[int] = Field(description="IDs des tables à enrichir")
+    force: bool = Field(
+        default=False, description="Ignore le cache LLM et régénère les descriptions"
+    )
 
 
 class ProviderConfigRequest(BaseModel):
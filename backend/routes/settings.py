@@ -218,6 +218,12 @@ EDITABLE_SETTINGS: dict[str, dict[str, Any]] = {
         "max": 50,
         "default": str(CatalogConfig.DEFAULT_MAX_TABLES_PER_BATCH),
     },
+    "llm_max_parallel": {
+        "type": "int",
+        "min": 1,
+        "max": 16,
+        "default": str(CatalogConfig.DEFAULT_LLM_MAX_PARALLEL),
+    },
     "max_chart_rows": {
         "type": "int",
         "min": 100,
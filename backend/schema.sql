@@ -57,6 +57,7 @@ CREATE TABLE IF NOT EXISTS datasources (
     is_active INTEGER DEFAULT 1,
     file_size_bytes INTEGER,
     last_modified TIMESTAMP,
+    data_period TEXT,    -- Période couverte par les données (calculée à l'extraction)
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
@@ -92,6 +93,13 @@ CREATE TABLE IF NOT EXISTS kpis (
     invert_trend BOOLEAN DEFAULT FALSE
 );
 
+CREATE TABLE IF NOT EXISTS llm_cache (
+    cache_key TEXT PRIMARY KEY,      -- sha256(modèle, prompts, schéma de réponse)
+    response TEXT NOT NULL,          -- JSON: réponse structurée validée
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    expires_at TIMESTAMP             -- NULL = pas d'expiration
+);
+
 CREATE TABLE IF NOT EXISTS llm_providers (
     id SERIAL PRIMARY KEY,
     name TEXT UNIQUE NOT NULL,
@@ -295,6 +303,10 @@ CREATE INDEX IF NOT EXISTS idx_prompts_category ON llm_prompts(category);
 CREATE INDEX IF NOT EXISTS idx_prompts_key ON llm_prompts(key);
 CREATE UNIQUE INDEX IF NOT EXISTS idx_reports_share_token ON saved_reports(share_token);
 CREATE INDEX IF NOT EXISTS idx_datasources_dataset ON datasources(dataset_id);
+-- columns(table_id[, name]) : couvert par UNIQUE(table_id, name)
+CREATE INDEX IF NOT EXISTS idx_tables_name ON tables(name);
+-- synonyms(column_id) : couvert par l'index unique (column_id, term)
+CREATE UNIQUE INDEX IF NOT EXISTS idx_synonyms_column_term ON synonyms(column_id, term);
 
 -- =============================================
 -- DEFAULT DATA
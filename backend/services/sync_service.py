@@ -23,7 +23,7 @@ from pathlib import Path
 from typing import TYPE_CHECKING, Callable, Protocol
 
 from catalog.datasets import get_dataset, update_dataset_stats_from_sync
-from catalog.datasources import get_datasource, update_sync_status
+from catalog.datasources import get_datasource, reset_data_period, update_sync_status
 from catalog.jobs import create_catalog_job, update_job_result, update_job_status
 
 if TYPE_CHECKING:
@@ -472,6 +472,12 @@ def sync_datasource_with_airbyte(
             # Le sync PyAirbyte a réussi, les données sont dans DuckDB
             logger.warning("Failed to update dataset stats: %s", stats_err)
 
+        # La période des données (data_period) a pu changer: la recalculer au prochain usage
+        try:
+            reset_data_period(ctx.dataset_id)
+        except Exception as period_err:
+            logger.warning("Failed to reset data period: %s", period_err)
+
         # 7. Finaliser
         update_sync_status(datasource_id, "success")
         update_job_status(job_id, status="completed", current_step="complete")
@@ -18,8 +18,10 @@ import duckdb
 
 from catalog.datasets import get_dataset
 from catalog.jobs import update_job_status
+from catalog.settings import clear_settings_cache
 from catalog_engine.orchestration import enrich_selected_tables, extract_only
 from celery_app import celery_app
+from llm_config.prompts import clear_active_prompt_cache
 
 logger = logging.getLogger(__name__)
 
@@ -55,6 +57,18 @@ def get_duckdb_connection_for_dataset(dataset_id: str) -> tuple[duckdb.DuckDBPyC
     return duckdb.connect(str(duckdb_path), read_only=True), duckdb_path
 
 
+def refresh_config_caches() -> None:
+    """
+    Vide les caches de prompts et de settings du worker au démarrage d'un job.
+
+    Les écritures (API) n'invalident que les caches du process API: sans ce reset,
+    un job pourrait utiliser un prompt ou un réglage modifié depuis moins de 30 s
+    (et le cache LLM stockerait la réponse obtenue avec l'ancien prompt).
+    """
+    clear_active_prompt_cache()
+    clear_settings_cache()
+
+
 @celery_app.task(bind=True, max_retries=1, soft_time_limit=300)  # type: ignore[misc]
 def extract_catalog_task(
     self: Any, run_id: str, job_id: int, dataset_id: str
@@ -76,6 +90,7 @@ def extract_catalog_task(
     db_conn = None
     try:
         logger.info("[Celery] Starting extract job %s for dataset %s", job_id, dataset_id)
+        refresh_config_caches()
 
         # Connexion DuckDB dédiée au worker pour ce dataset spécifique
         db_conn, duckdb_path = get_duckdb_connection_for_dataset(dataset_id)
@@ -106,7 +121,12 @@ def extract_catalog_task(
 
 @celery_app.task(bind=True, max_retries=1, soft_time_limit=1800)  # type: ignore[misc]
 def enrich_catalog_task(
-    self: Any, run_id: str, job_id: int, table_ids: list[int], dataset_id: str
+    self: Any,
+    run_id: str,
+    job_id: int,
+    table_ids: list[int],
+    dataset_id: str,
+    use_cache: bool = True,
 ) -> dict[str, str | dict[str, int]]:
     """
     Task Celery: Enrichissement LLM du catalogue.
@@ -116,6 +136,7 @@ def enrich_catalog_task(
         job_id: ID du job dans la table catalog_jobs
         table_ids: Liste des IDs de tables à enrichir
         dataset_id: UUID du dataset à enrichir (pour isolation)
+        use_cache: Réutilise les réponses LLM en cache; False force de nouveaux appels
 
     ⚠️ IMPORTANT:
     - Timeout 30 min (opérations LLM longues)
@@ -131,11 +152,14 @@ def enrich_catalog_task(
             len(table_ids),
             dataset_id,
         )
+        refresh_config_caches()
 
         # Connexion DuckDB dédiée au worker pour ce dataset spécifique
         db_conn, _ = get_duckdb_connection_for_dataset(dataset_id)
 
-        result = enrich_selected_tables(db_connection=db_conn, job_id=job_id, table_ids=table_ids)
+        result = enrich_selected_tables(
+            db_connection=db_conn, job_id=job_id, table_ids=table_ids, use_cache=use_cache
+        )
 
         # Vérifier si l'enrichissement a retourné une erreur (sans exception)
         if isinstance(result, dict) and result.get("status") == "error":
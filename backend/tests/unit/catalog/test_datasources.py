@@ -11,6 +11,7 @@ from catalog.datasources import (
     get_datasource,
     get_datasource_by_name,
     list_datasources,
+    reset_data_period,
     update_datasource,
     update_sync_status,
 )
@@ -276,6 +277,26 @@ class TestUpdateSyncStatus:
         assert result is True
 
 
+class TestResetDataPeriod:
+    """Tests de reset_data_period."""
+
+    def test_clears_period_for_dataset(self) -> None:
+        """Remet data_period à NULL sur les datasources du dataset."""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_cursor.rowcount = 2
+        mock_conn.cursor.return_value = mock_cursor
+
+        with patch("catalog.datasources.get_connection", return_value=mock_conn):
+            result = reset_data_period("ds-uuid")
+
+        assert result == 2
+        call_sql, call_params = mock_cursor.execute.call_args[0]
+        assert "data_period = NULL" in call_sql
+        assert call_params == ("ds-uuid",)
+        mock_conn.commit.assert_called_once()
+
+
 class TestDeleteDatasource:
     """Tests de delete_datasource."""
 
@@ -0,0 +1,81 @@
+"""Tests pour catalog/llm_cache.py - Cache des réponses LLM."""
+
+from unittest.mock import MagicMock, patch
+
+from catalog.llm_cache import clear_llm_cache, get_llm_cache, set_llm_cache
+
+
+class TestGetLlmCache:
+    """Tests de get_llm_cache."""
+
+    def test_returns_response_when_cached(self) -> None:
+        """Retourne la réponse JSON en cache."""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_cursor.fetchone.return_value = {"response": '{"t": {}}'}
+        mock_conn.cursor.return_value = mock_cursor
+
+        with patch("catalog.llm_cache.get_connection", return_value=mock_conn):
+            result = get_llm_cache("abc")
+
+        assert result == '{"t": {}}'
+        mock_conn.close.assert_called_once()
+
+    def test_returns_none_when_missing_or_expired(self) -> None:
+        """Retourne None si absent ou expiré (filtré en SQL)."""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_cursor.fetchone.return_value = None
+        mock_conn.cursor.return_value = mock_cursor
+
+        with patch("catalog.llm_cache.get_connection", return_value=mock_conn):
+            result = get_llm_cache("abc")
+
+        assert result is None
+        assert "expires_at" in mock_cursor.execute.call_args[0][0]
+
+
+class TestSetLlmCache:
+    """Tests de set_llm_cache."""
+
+    def test_upserts_with_ttl(self) -> None:
+        """Insère ou remplace la réponse avec sa durée de vie."""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_conn.cursor.return_value = mock_cursor
+
+        with patch("catalog.llm_cache.get_connection", return_value=mock_conn):
+            set_llm_cache("abc", "{}", ttl_minutes=60)
+
+        sql, params = mock_cursor.execute.call_args[0]
+        assert "ON CONFLICT (cache_key)" in sql
+        assert params == ("abc", "{}", 60, 60)
+        mock_conn.commit.assert_called_once()
+
+    def test_purges_expired_entries(self) -> None:
+        """Les entrées expirées sont supprimées à l'écriture."""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_conn.cursor.return_value = mock_cursor
+
+        with patch("catalog.llm_cache.get_connection", return_value=mock_conn):
+            set_llm_cache("abc", "{}")
+
+        purge_sql = mock_cursor.execute.call_args_list[0][0][0]
+        assert purge_sql == "DELETE FROM llm_cache WHERE expires_at < CURRENT_TIMESTAMP"
+
+
+class TestClearLlmCache:
+    """Tests de clear_llm_cache."""
+
+    def test_deletes_all_entries(self) -> None:
+        """Vide la table llm_cache."""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_conn.cursor.return_value = mock_cursor
+
+        with patch("catalog.llm_cache.get_connection", return_value=mock_conn):
+            clear_llm_cache()
+
+        mock_cursor.execute.assert_called_once_with("DELETE FROM llm_cache")
+        mock_conn.commit.assert_called_once()
@@ -1,10 +1,19 @@
 """Tests pour catalog/settings.py - CRUD settings."""
 
+from typing import Any
 from unittest.mock import MagicMock, patch
 
 import pytest
 
-from catalog.settings import get_all_settings, get_setting, set_setting
+from catalog.settings import clear_settings_cache, get_all_settings, get_setting, set_setting
+
+
+@pytest.fixture(autouse=True)
+def _isolate_settings_cache() -> Any:
+    """Chaque test part d'un cache de settings vide."""
+    clear_settings_cache()
+    yield
+    clear_settings_cache()
 
 
 class TestGetSetting:
@@ -76,6 +85,61 @@ class TestGetSetting:
         mock_conn.close.assert_called_once()
 
 
+class TestSettingsCache:
+    """Tests du cache des settings."""
+
+    @staticmethod
+    def _mock_conn(value: str | None) -> MagicMock:
+        mock_conn = MagicMock()
+        mock_conn.cursor.return_value.fetchone.return_value = (
+            {"value": value} if value is not None else None
+        )
+        return mock_conn
+
+    def test_reads_database_once(self) -> None:
+        """Deux lectures de la même clé: une seule requête."""
+        mock_conn = self._mock_conn("15")
+
+        with patch("catalog.settings.get_connection", return_value=mock_conn) as mock_get:
+            assert get_setting("max_tables_per_batch") == "15"
+            assert get_setting("max_tables_per_batch") == "15"
+
+        mock_get.assert_called_once()
+
+    def test_caches_missing_key_and_applies_default(self) -> None:
+        """Une clé absente est mise en cache, le défaut reste propre à chaque appel."""
+        mock_conn = self._mock_conn(None)
+
+        with patch("catalog.settings.get_connection", return_value=mock_conn) as mock_get:
+            assert get_setting("missing", default="a") == "a"
+            assert get_setting("missing", default="b") == "b"
+
+        mock_get.assert_called_once()
+
+    def test_set_setting_invalidates_key(self) -> None:
+        """set_setting force la relecture de la clé modifiée."""
+        with patch("catalog.settings.get_connection", return_value=self._mock_conn("4")):
+            get_setting("llm_max_parallel")
+            set_setting("llm_max_parallel", "8")
+
+        with patch("catalog.settings.get_connection", return_value=self._mock_conn("8")):
+            assert get_setting("llm_max_parallel") == "8"
+
+    def test_expires_after_ttl(self) -> None:
+        """Relu depuis la base une fois le TTL écoulé."""
+        with (
+            patch("catalog.settings.get_connection", return_value=self._mock_conn("1")),
+            patch("catalog.settings.time.monotonic", return_value=100.0),
+        ):
+            get_setting("key")
+
+        with (
+            patch("catalog.settings.get_connection", return_value=self._mock_conn("2")),
+            patch("catalog.settings.time.monotonic", return_value=200.0),
+        ):
+            assert get_setting("key") == "2"
+
+
 class TestSetSetting:
     """Tests de set_setting."""
 
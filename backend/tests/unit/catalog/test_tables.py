@@ -6,7 +6,9 @@ import pytest
 
 from catalog.tables import (
     add_column,
+    add_columns,
     add_synonym,
+    add_synonyms,
     add_table,
     get_schema_for_llm,
     get_table_by_id,
@@ -49,6 +51,19 @@ class TestAddTable:
         assert call_args[2] is None  # description
         assert call_args[3] is None  # row_count
 
+    def test_uses_provided_connection(self) -> None:
+        """Utilise la connexion fournie sans commit ni fermeture."""
+        conn = MagicMock()
+        conn.cursor.return_value.fetchone.return_value = {"id": 7}
+
+        with patch("catalog.tables.get_connection") as mock_get:
+            result = add_table(1, "test_table", conn=conn)
+
+        assert result == 7
+        mock_get.assert_not_called()
+        conn.commit.assert_not_called()
+        conn.close.assert_not_called()
+
 
 class TestAddColumn:
     """Tests de add_column."""
@@ -95,6 +110,55 @@ class TestAddColumn:
         assert call_args[6] is True  # is_primary_key
 
 
+class TestAddColumns:
+    """Tests de add_columns."""
+
+    def test_returns_empty_for_no_columns(self) -> None:
+        """Ne touche pas la base si aucune colonne."""
+        with patch("catalog.tables.get_connection") as mock_get:
+            assert add_columns(1, []) == []
+        mock_get.assert_not_called()
+
+    def test_inserts_all_columns_in_one_statement(self) -> None:
+        """Insère toutes les colonnes en une requête et retourne leurs ids."""
+        mock_conn = MagicMock()
+
+        with (
+            patch("catalog.tables.get_connection", return_value=mock_conn),
+            patch("catalog.tables.execute_values") as mock_values,
+        ):
+            mock_values.return_value = [{"id": 10}, {"id": 11}]
+            result = add_columns(
+                3,
+                [
+                    {"name": "id", "data_type": "INT", "is_primary_key": True},
+                    {"name": "email", "data_type": "VARCHAR", "sample_values": "a@b.c"},
+                ],
+            )
+
+        assert result == [10, 11]
+        mock_values.assert_called_once()
+        rows = mock_values.call_args.args[2]
+        assert rows[0] == (3, "id", "INT", None, None, None, True, None)
+        assert rows[1] == (3, "email", "VARCHAR", None, "a@b.c", None, False, None)
+        mock_conn.commit.assert_called_once()
+        mock_conn.close.assert_called_once()
+
+    def test_uses_provided_connection(self) -> None:
+        """Utilise la connexion fournie sans commit ni fermeture."""
+        conn = MagicMock()
+
+        with (
+            patch("catalog.tables.get_connection") as mock_get,
+            patch("catalog.tables.execute_values", return_value=[{"id": 1}]),
+        ):
+            add_columns(3, [{"name": "id", "data_type": "INT"}], conn=conn)
+
+        mock_get.assert_not_called()
+        conn.commit.assert_not_called()
+        conn.close.assert_not_called()
+
+
 class TestAddSynonym:
     """Tests de add_synonym."""
 
@@ -112,6 +176,35 @@ class TestAddSynonym:
         mock_conn.commit.assert_called_once()
 
 
+class TestAddSynonyms:
+    """Tests de add_synonyms."""
+
+    def test_returns_zero_for_no_synonyms(self) -> None:
+        """Ne touche pas la base si aucun synonyme."""
+        with patch("catalog.tables.get_connection") as mock_get:
+            assert add_synonyms([]) == 0
+        mock_get.assert_not_called()
+
+    def test_inserts_all_synonyms_in_one_statement(self) -> None:
+        """Insère tous les synonymes en une requête et retourne leur nombre."""
+        conn = MagicMock()
+
+        with (
+            patch("catalog.tables.get_connection") as mock_get,
+            patch("catalog.tables.execute_values") as mock_values,
+        ):
+            mock_values.return_value = [{"id": 1}, {"id": 2}]
+            inserted = add_synonyms([(1, "mail"), (2, "nom")], conn=conn)
+
+        assert inserted == 2
+        mock_values.assert_called_once()
+        assert mock_values.call_args.args[2] == [(1, "mail"), (2, "nom")]
+        # Doublons (column_id, term) ignorés par PostgreSQL, pas comptés
+        assert "ON CONFLICT DO NOTHING" in mock_values.call_args.args[1]
+        mock_get.assert_not_called()
+        conn.commit.assert_not_called()
+
+
 class TestGetSchemaForLlm:
     """Tests de get_schema_for_llm."""
 
@@ -216,6 +309,49 @@ class TestGetSchemaForLlm:
         # Description should be truncated to 80 chars + "..."
         assert "..." in result
 
+    def test_compact_format(self) -> None:
+        """Format exact d'une table en mode compact."""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+
+        mock_cursor.fetchone.return_value = None
+        mock_cursor.fetchall.side_effect = [
+            [{"id": 1, "name": "test_ds"}],
+            [
+                {"id": 1, "name": "evals", "row_count": 1200},
+                {"id": 2, "name": "vide", "row_count": 0},
+            ],
+            [
+                {
+                    "name": "note",
+                    "data_type": "INT",
+                    "description": "Note client",
+                    "value_range": "1 - 5",
+                    "full_context": "IGNORED",
+                },
+                {
+                    "name": "id",
+                    "data_type": "INT",
+                    "description": None,
+                    "value_range": None,
+                    "full_context": None,
+                },
+            ],
+            [],
+        ]
+        mock_conn.cursor.return_value = mock_cursor
+
+        with patch("catalog.tables.get_connection", return_value=mock_conn):
+            result = get_schema_for_llm()
+
+        assert result == (
+            "Table: evals (1,200 lignes)\n"
+            "- note (INT): Note client [1 - 5]\n"
+            "- id (INT)\n"
+            "\n"
+            "Table: vide\n"
+        )
+
 
 class TestGetTableInfo:
     """Tests de get_table_info."""
@@ -5,20 +5,24 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 from pydantic import BaseModel
-
 from catalog_engine.enrichment import (
     PromptNotConfiguredError,
     _build_full_context,
-    build_response_model,
+    _enrichment_cache_key,
     check_token_limit,
     enrich_with_llm,
+    enrichment_to_dict,
     estimate_tokens,
     validate_catalog_enrichment,
 )
 from catalog_engine.models import (
+    _MAX_ISSUES,
+    CatalogEnrichment,
     CatalogValidationResult,
+    ColumnEnrichment,
     ColumnMetadata,
     ExtractedCatalog,
+    TableEnrichment,
     TableMetadata,
     ValueFrequency,
 )
@@ -78,6 +82,14 @@ class TestCheckTokenLimit:
         is_ok, count, msg = check_token_limit(text, max_input_tokens=1000)
         assert count == 100
 
+    def test_counts_system_prompt(self) -> None:
+        """Le message système est compté avec le prompt."""
+        is_ok, count, msg = check_token_limit(
+            "a" * 2400, max_input_tokens=1000, system_prompt="b" * 2000
+        )
+        assert count == 1100
+        assert is_ok is False
+
 
 class TestPromptNotConfiguredError:
     """Tests de PromptNotConfiguredError."""
@@ -102,47 +114,97 @@ class TestPromptNotConfiguredError:
         assert "seed_prompts" in str(error).lower()
 
 
-class TestBuildResponseModel:
-    """Tests de build_response_model."""
+class TestEnrichmentToDict:
+    """Tests de enrichment_to_dict."""
 
-    def test_returns_pydantic_model(self) -> None:
-        """Retourne un modèle Pydantic."""
-        catalog = ExtractedCatalog(
+    @staticmethod
+    def _catalog() -> ExtractedCatalog:
+        return ExtractedCatalog(
             datasource="test.duckdb",
             tables=[
                 TableMetadata(
                     name="users",
                     row_count=100,
-                    columns=[ColumnMetadata(name="id", data_type="INT")],
-                )
+                    columns=[
+                        ColumnMetadata(name="id", data_type="INT"),
+                        ColumnMetadata(name="email", data_type="VARCHAR"),
+                        ColumnMetadata(name="_airbyte_raw_id", data_type="VARCHAR"),
+                    ],
+                ),
+                TableMetadata(name="orders", row_count=50, columns=[]),
             ],
         )
-        model = build_response_model(catalog)
-        assert issubclass(model, BaseModel)
 
-    def test_model_has_table_fields(self) -> None:
-        """Le modèle a des champs pour chaque table."""
-        catalog = ExtractedCatalog(
-            datasource="test.duckdb",
+    def test_maps_tables_and_columns_by_name(self) -> None:
+        """Convertit les listes LLM en dict indexé par nom."""
+        result = CatalogEnrichment(
             tables=[
-                TableMetadata(name="users", row_count=100, columns=[]),
-                TableMetadata(name="orders", row_count=50, columns=[]),
-            ],
+                TableEnrichment(
+                    name="users",
+                    description="Utilisateurs",
+                    columns=[
+                        ColumnEnrichment(name="id", description="Identifiant", synonyms=["ID"]),
+                        ColumnEnrichment(name="email", description="Adresse email"),
+                    ],
+                )
+            ]
         )
-        model = build_response_model(catalog)
-        assert "users" in model.model_fields
-        assert "orders" in model.model_fields
 
-    def test_table_model_has_description(self) -> None:
-        """Les modèles de table ont un champ description."""
-        catalog = ExtractedCatalog(
-            datasource="test.duckdb",
-            tables=[TableMetadata(name="users", row_count=100, columns=[])],
+        enrichment = enrichment_to_dict(self._catalog(), result)
+
+        assert enrichment["users"] == {
+            "description": "Utilisateurs",
+            "columns": {
+                "id": {"description": "Identifiant", "synonyms": ["ID"]},
+                "email": {"description": "Adresse email", "synonyms": []},
+            },
+        }
+
+    def test_fills_missing_with_empty_descriptions(self) -> None:
+        """Tables et colonnes omises par le LLM: description vide."""
+        result = CatalogEnrichment(
+            tables=[TableEnrichment(name="users", description="Utilisateurs", columns=[])]
+        )
+
+        enrichment = enrichment_to_dict(self._catalog(), result)
+
+        assert enrichment["users"]["columns"]["email"] == {"description": "", "synonyms": []}
+        assert enrichment["orders"] == {"description": "", "columns": {}}
+
+    def test_missing_columns_do_not_share_synonyms(self) -> None:
+        """Chaque colonne omise reçoit sa propre liste (modifiable sans effet de bord)."""
+        enrichment = enrichment_to_dict(self._catalog(), CatalogEnrichment(tables=[]))
+        columns = enrichment["users"]["columns"]
+
+        columns["id"]["synonyms"].append("ID")
+
+        assert columns["email"]["synonyms"] == []
+
+    def test_ignores_unknown_and_internal_names(self) -> None:
+        """Les noms hors catalogue et les colonnes internes sont ignorés."""
+        result = CatalogEnrichment(
+            tables=[
+                TableEnrichment(
+                    name="users",
+                    description="Utilisateurs",
+                    columns=[
+                        ColumnEnrichment(name="_airbyte_raw_id", description="Interne"),
+                        ColumnEnrichment(name="inventee", description="Hallucinée"),
+                    ],
+                ),
+                TableEnrichment(name="ghost", description="Hallucinée"),
+            ]
         )
-        model = build_response_model(catalog)
-        # Le champ users est un modèle avec description et columns
-        users_field = model.model_fields["users"]
-        assert users_field is not None
+
+        enrichment = enrichment_to_dict(self._catalog(), result)
+
+        assert set(enrichment) == {"users", "orders"}
+        assert set(enrichment["users"]["columns"]) == {"id", "email"}
+
+    def test_schema_does_not_depend_on_catalog(self) -> None:
+        """Le schéma JSON envoyé au LLM est statique."""
+        schema = CatalogEnrichment.model_json_schema()
+        assert set(schema["properties"]) == {"tables"}
 
 
 class TestBuildFullContext:
@@ -248,6 +310,12 @@ class TestBuildFullContext:
 class TestEnrichWithLlm:
     """Tests de enrich_with_llm."""
 
+    @pytest.fixture(autouse=True)
+    def _no_default_model(self) -> Any:
+        """Pas de modèle par défaut: le cache des réponses est désactivé."""
+        with patch("catalog_engine.enrichment.get_default_model", return_value=None):
+            yield
+
     @patch("catalog_engine.enrichment.call_llm_structured")
     @patch("catalog_engine.enrichment.get_active_prompt")
     @patch("catalog_engine.enrichment.call_with_retry")
@@ -327,6 +395,167 @@ class TestEnrichWithLlm:
         # Le contexte devrait être utilisé dans le prompt
         mock_retry.assert_called_once()
 
+    @patch("catalog_engine.enrichment.call_llm_structured")
+    @patch("catalog_engine.enrichment.get_active_prompt")
+    def test_injects_context_in_single_prompt(
+        self, mock_prompt: MagicMock, mock_llm: MagicMock
+    ) -> None:
+        """Le contexte des tables remplace {tables_context} dans un seul message."""
+        mock_prompt.return_value = {"content": "Instructions\n\n{tables_context}\nFin"}
+        result = CatalogEnrichment(tables=[TableEnrichment(name="t", description="Test")])
+        mock_llm.return_value = (result, {})
+
+        catalog = ExtractedCatalog(
+            datasource="test.duckdb",
+            tables=[TableMetadata(name="t", row_count=100, columns=[])],
+        )
+        enrich_with_llm(catalog, tables_context="ctx")
+
+        kwargs = mock_llm.call_args.kwargs
+        assert kwargs["response_model"] is CatalogEnrichment
+        assert kwargs["prompt"] == "Instructions\n\nctx\nFin"
+        assert "system_prompt" not in kwargs
+
+
+class TestEnrichmentResponseCache:
+    """Tests du cache des réponses d'enrichissement."""
+
+    @pytest.fixture(autouse=True)
+    def _setup(self) -> Any:
+        """Prompt et modèle par défaut fixes."""
+        with (
+            patch(
+                "catalog_engine.enrichment.get_active_prompt",
+                return_value={"content": "Instructions\n{tables_context}"},
+            ),
+            patch(
+                "catalog_engine.enrichment.get_default_model",
+                return_value={"model_id": "gemini-2.0-flash"},
+            ),
+        ):
+            yield
+
+    @staticmethod
+    def _catalog() -> ExtractedCatalog:
+        return ExtractedCatalog(
+            datasource="test.duckdb",
+            tables=[TableMetadata(name="t", row_count=100, columns=[])],
+        )
+
+    @patch("catalog_engine.enrichment.set_llm_cache")
+    @patch("catalog_engine.enrichment.get_llm_cache")
+    @patch("catalog_engine.enrichment.call_with_retry")
+    def test_returns_cached_response_without_llm_call(
+        self, mock_retry: MagicMock, mock_get: MagicMock, mock_set: MagicMock
+    ) -> None:
+        """Une réponse en cache évite l'appel LLM."""
+        mock_get.return_value = '{"t": {"description": "En cache", "columns": {}}}'
+
+        result = enrich_with_llm(self._catalog(), tables_context="ctx")
+
+        assert result == {"t": {"description": "En cache", "columns": {}}}
+        mock_retry.assert_not_called()
+        mock_set.assert_not_called()
+
+    @patch("catalog_engine.enrichment.set_llm_cache")
+    @patch("catalog_engine.enrichment.get_llm_cache")
+    @patch("catalog_engine.enrichment.call_with_retry")
+    def test_stores_response_on_miss(
+        self, mock_retry: MagicMock, mock_get: MagicMock, mock_set: MagicMock
+    ) -> None:
+        """Une réponse obtenue du LLM est mise en cache sous la même clé."""
+        mock_get.return_value = None
+        mock_retry.return_value = {"t": {"description": "Test", "columns": {}}}
+
+        enrich_with_llm(self._catalog(), tables_context="ctx")
+
+        key = mock_get.call_args.args[0]
+        assert mock_set.call_args.args[:2] == (
+            key,
+            '{"t": {"description": "Test", "columns": {}}}',
+        )
+
+    @patch("catalog_engine.enrichment.set_llm_cache")
+    @patch("catalog_engine.enrichment.get_llm_cache")
+    @patch("catalog_engine.enrichment.call_with_retry")
+    def test_key_depends_on_context(
+        self, mock_retry: MagicMock, mock_get: MagicMock, mock_set: MagicMock
+    ) -> None:
+        """Deux contextes différents n'ont pas la même clé."""
+        mock_get.return_value = None
+        mock_retry.return_value = {"t": {"description": "Test", "columns": {}}}
+
+        enrich_with_llm(self._catalog(), tables_context="ctx1")
+        enrich_with_llm(self._catalog(), tables_context="ctx2")
+
+        keys = {c.args[0] for c in mock_get.call_args_list}
+        assert len(keys) == 2
+
+    @patch("catalog_engine.enrichment.set_llm_cache")
+    @patch("catalog_engine.enrichment.get_llm_cache")
+    @patch("catalog_engine.enrichment.call_with_retry")
+    def test_key_depends_on_prompt_version(
+        self, mock_retry: MagicMock, mock_get: MagicMock, mock_set: MagicMock
+    ) -> None:
+        """Une nouvelle version du prompt ne réutilise pas les réponses de l'ancienne."""
+        mock_get.return_value = None
+        mock_retry.return_value = {"t": {"description": "Test", "columns": {}}}
+
+        enrich_with_llm(self._catalog(), tables_context="ctx")
+        with patch(
+            "catalog_engine.enrichment.get_active_prompt",
+            return_value={"content": "Instructions v2\n{tables_context}"},
+        ):
+            enrich_with_llm(self._catalog(), tables_context="ctx")
+
+        keys = {c.args[0] for c in mock_get.call_args_list}
+        assert len(keys) == 2
+
+    @patch("catalog_engine.enrichment.set_llm_cache")
+    @patch("catalog_engine.enrichment.get_llm_cache")
+    @patch("catalog_engine.enrichment.call_with_retry")
+    def test_use_cache_false_bypasses_cache(
+        self, mock_retry: MagicMock, mock_get: MagicMock, mock_set: MagicMock
+    ) -> None:
+        """use_cache=False appelle toujours le LLM sans lire ni écrire le cache."""
+        mock_retry.return_value = {"t": {"description": "Test", "columns": {}}}
+
+        enrich_with_llm(self._catalog(), tables_context="ctx", use_cache=False)
+
+        mock_get.assert_not_called()
+        mock_set.assert_not_called()
+        mock_retry.assert_called_once()
+
+    @patch("catalog_engine.enrichment.set_llm_cache")
+    @patch("catalog_engine.enrichment.get_llm_cache")
+    @patch("catalog_engine.enrichment.call_with_retry")
+    def test_cache_errors_do_not_fail_enrichment(
+        self, mock_retry: MagicMock, mock_get: MagicMock, mock_set: MagicMock
+    ) -> None:
+        """Un cache indisponible n'empêche pas l'enrichissement."""
+        mock_get.side_effect = Exception("relation llm_cache does not exist")
+        mock_set.side_effect = Exception("relation llm_cache does not exist")
+        mock_retry.return_value = {"t": {"description": "Test", "columns": {}}}
+
+        result = enrich_with_llm(self._catalog(), tables_context="ctx")
+
+        assert result == {"t": {"description": "Test", "columns": {}}}
+
+    def test_response_schema_generated_once(self) -> None:
+        """Le schéma JSON du modèle de réponse n'est pas régénéré à chaque clé."""
+
+        class _Response(BaseModel):
+            value: str
+
+        with patch.object(
+            _Response, "model_json_schema", wraps=_Response.model_json_schema
+        ) as mock_schema:
+            first = _enrichment_cache_key("prompt", _Response)
+            second = _enrichment_cache_key("prompt", _Response)
+
+        assert first == second
+        mock_schema.assert_called_once()
+
 
 class TestValidateCatalogEnrichment:
     """Tests de validate_catalog_enrichment."""
@@ -437,6 +666,32 @@ class TestValidateCatalogEnrichment:
         assert result.columns_ok == 1
         assert result.columns_warning == 1
 
+    def test_missing_table_and_columns_are_warnings(self) -> None:
+        """Table ou colonne absente de l'enrichissement (ou None): warning, 0 synonyme."""
+        catalog = ExtractedCatalog(
+            datasource="test.duckdb",
+            tables=[
+                TableMetadata(
+                    name="t",
+                    row_count=100,
+                    columns=[
+                        ColumnMetadata(name="c1", data_type="INT"),
+                        ColumnMetadata(name="c2", data_type="VARCHAR"),
+                    ],
+                ),
+                TableMetadata(name="absente", row_count=1, columns=[]),
+            ],
+        )
+        enrichment: dict[str, Any] = {
+            "t": {"description": "Table valide", "columns": {"c1": None}},
+        }
+
+        result = validate_catalog_enrichment(catalog, enrichment)
+
+        assert (result.tables_ok, result.tables_warning) == (1, 1)
+        assert (result.columns_ok, result.columns_warning) == (0, 2)
+        assert result.synonyms_total == 0
+
     def test_counts_synonyms(self) -> None:
         """Compte les synonymes."""
         catalog = ExtractedCatalog(
@@ -486,6 +741,20 @@ class TestValidateCatalogEnrichment:
         assert len(result.issues) == 2
         assert any("users" in issue for issue in result.issues)
 
+    def test_bounds_issues_buffer(self) -> None:
+        """Réponse LLM vide: le nombre de problèmes conservés reste borné."""
+        columns = [ColumnMetadata(name=f"c{i}", data_type="INT") for i in range(200)]
+        catalog = ExtractedCatalog(
+            datasource="test.duckdb",
+            tables=[TableMetadata(name="wide", row_count=1, columns=columns)],
+        )
+
+        result = validate_catalog_enrichment(catalog, {})
+
+        assert result.columns_warning == 200
+        assert len(result.issues) == _MAX_ISSUES
+        assert result.issues_truncated == 201 - _MAX_ISSUES
+
     def test_handles_missing_table(self) -> None:
         """Gère les tables manquantes."""
         catalog = ExtractedCatalog(
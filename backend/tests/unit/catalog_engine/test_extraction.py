@@ -1,17 +1,25 @@
 """Tests pour catalog_engine/extraction.py - Extraction métadonnées DuckDB."""
 
+import re
 from unittest.mock import MagicMock, patch
 
+import duckdb
 import pytest
 
 from catalog_engine.extraction import (
+    _PATTERN_LENGTHS,
     COMMON_PATTERNS,
+    _candidate_patterns,
+    _column_kind,
+    _quote_ident,
     build_column_full_context,
     detect_pattern,
     extract_column_stats,
     extract_metadata_from_connection,
+    get_column_full_context,
+    get_sample_values_str,
 )
-from catalog_engine.models import ColumnMetadata, ValueFrequency
+from catalog_engine.models import ColumnMetadata, TableMetadata, ValueFrequency
 
 
 class TestCommonPatterns:
@@ -119,6 +127,64 @@ class TestDetectPattern:
         # 2/4 = 50% -> pas assez mais ne crash pas
         assert pattern is None or pattern == "email"
 
+    def test_stops_at_first_strong_match(self) -> None:
+        """S'arrête dès qu'un pattern matche (quasi) toutes les valeurs."""
+        values = ["2024-01-15", "2023-12-01", "2024-05-20"]
+        never_tested = MagicMock(return_value=None)
+        patterns = (
+            ("date_iso", re.compile(COMMON_PATTERNS["date_iso"]).match),
+            ("x", never_tested),
+        )
+        with patch("catalog_engine.extraction._COMPILED_PATTERNS", patterns):
+            pattern, rate = detect_pattern(values)
+        assert pattern == "date_iso"
+        assert rate == 1.0
+        never_tested.assert_not_called()
+
+    def test_abandons_pattern_that_cannot_win(self) -> None:
+        """Un pattern est abandonné dès qu'il ne peut plus dépasser 70%."""
+        no_match = MagicMock(return_value=None)
+        with patch("catalog_engine.extraction._COMPILED_PATTERNS", (("x", no_match),)):
+            assert detect_pattern([f"v{i}" for i in range(10)]) == (None, None)
+        # 3 échecs sur 10: au mieux 7/10, pas strictement au-dessus de 70%
+        assert no_match.call_count == 3
+
+    def test_keeps_best_pattern_above_threshold(self) -> None:
+        """Le meilleur taux (>70%, <95%) est retenu malgré l'abandon anticipé."""
+        values = [*(f"{i:05d}" for i in range(8)), "abc", "def"]
+        assert detect_pattern(values) == ("postal_code_fr", 0.8)
+
+    def test_does_not_compile_per_call(self) -> None:
+        """Les regex sont compilées au chargement du module, pas à chaque appel."""
+        with patch("catalog_engine.extraction.re.compile") as mock_compile:
+            detect_pattern(["abc", "def"])
+        mock_compile.assert_not_called()
+
+
+class TestCandidatePatterns:
+    """Tests de _candidate_patterns."""
+
+    def test_every_pattern_has_length_bounds(self) -> None:
+        """Chaque pattern a une plage de longueurs."""
+        assert set(_PATTERN_LENGTHS) == set(COMMON_PATTERNS)
+
+    def test_filters_by_length_overlap(self) -> None:
+        """Seuls les patterns compatibles avec les longueurs sont retenus, dans l'ordre."""
+        assert [name for name, _ in _candidate_patterns(5, 5)] == ["postal_code_fr"]
+        assert [name for name, _ in _candidate_patterns(40, 300)] == [
+            "email",
+            "datetime_iso",
+            "url",
+        ]
+
+    def test_short_values_rule_out_all_patterns(self) -> None:
+        """Des valeurs de moins de 5 caractères ne peuvent matcher aucun pattern."""
+        assert _candidate_patterns(1, 4) == ()
+
+    def test_unknown_lengths_keep_all_patterns(self) -> None:
+        """Sans longueurs connues, tous les patterns sont testés."""
+        assert len(_candidate_patterns(None, None)) == len(COMMON_PATTERNS)
+
 
 class TestExtractColumnStats:
     """Tests de extract_column_stats."""
@@ -193,7 +259,8 @@ class TestExtractColumnStats:
         """Extrait les stats numériques."""
         conn = MagicMock()
         base_result = MagicMock()
-        base_result.fetchone.return_value = (0, 100)
+        # null, distinct, puis min, max, avg, median dans la même requête
+        base_result.fetchone.return_value = (0, 100, 1.0, 100.0, 50.5, 45.0)
 
         sample_result = MagicMock()
         sample_result.fetchall.return_value = []
@@ -201,10 +268,7 @@ class TestExtractColumnStats:
         top_result = MagicMock()
         top_result.fetchall.return_value = []
 
-        num_result = MagicMock()
-        num_result.fetchone.return_value = (1.0, 100.0, 50.5, 45.0)  # min, max, avg, median
-
-        conn.execute.side_effect = [base_result, sample_result, top_result, num_result]
+        conn.execute.side_effect = [base_result, sample_result, top_result]
 
         result = extract_column_stats(conn, "t", "c", "INTEGER", 100)
         assert result.value_range == "1.0 - 100.0"
@@ -215,7 +279,8 @@ class TestExtractColumnStats:
         """Extrait les stats texte."""
         conn = MagicMock()
         base_result = MagicMock()
-        base_result.fetchone.return_value = (0, 100)
+        # null, distinct, puis min_len, max_len, avg_len dans la même requête
+        base_result.fetchone.return_value = (0, 100, 5, 255, 50.5)
 
         sample_result = MagicMock()
         sample_result.fetchall.return_value = [("test",)]
@@ -223,10 +288,10 @@ class TestExtractColumnStats:
         top_result = MagicMock()
         top_result.fetchall.return_value = []
 
-        text_result = MagicMock()
-        text_result.fetchone.return_value = (5, 255, 50.5)  # min_len, max_len, avg_len
+        pattern_result = MagicMock()
+        pattern_result.fetchall.return_value = []
 
-        conn.execute.side_effect = [base_result, sample_result, top_result, text_result]
+        conn.execute.side_effect = [base_result, sample_result, top_result, pattern_result]
 
         result = extract_column_stats(conn, "t", "c", "VARCHAR", 100)
         assert result.min_length == 5
@@ -253,6 +318,63 @@ class TestExtractColumnStats:
         assert result.name == "c"
         assert result.null_count == 0
 
+    def test_uses_precomputed_aggregates(self) -> None:
+        """Les agrégats calculés pour la table évitent la requête par colonne."""
+        conn = MagicMock()
+        conn.execute.return_value.fetchall.return_value = []
+
+        result = extract_column_stats(
+            conn, "t", "c", "INTEGER", 100, aggregates=(10, 80, 1, 9, 5.0, 4.0)
+        )
+
+        assert not any("COUNT(DISTINCT" in str(c) for c in conn.execute.call_args_list)
+        assert result.null_count == 10
+        assert result.distinct_count == 80
+        assert result.value_range == "1 - 9"
+        assert result.median == 4.0
+
+    def test_all_null_column_skips_value_queries(self) -> None:
+        """Colonne entièrement NULL: aucune requête d'échantillon ni de distribution."""
+        conn = MagicMock()
+
+        result = extract_column_stats(
+            conn, "t", "c", "VARCHAR", 100, aggregates=(100, 0, None, None, None)
+        )
+
+        conn.execute.assert_not_called()
+        assert result.null_rate == 1.0
+        assert result.sample_values == []
+        assert result.top_values == []
+
+    def test_skips_pattern_sample_when_lengths_rule_out_patterns(self) -> None:
+        """Codes courts (1 à 3 caractères): pas d'échantillon pour la détection de pattern."""
+        conn = MagicMock()
+        conn.execute.return_value.fetchall.return_value = []
+
+        result = extract_column_stats(conn, "t", "c", "VARCHAR", 100, aggregates=(0, 20, 1, 3, 2.0))
+
+        assert not any("LIMIT 100" in str(c) for c in conn.execute.call_args_list)
+        assert result.detected_pattern is None
+
+    def test_falls_back_to_base_stats(self) -> None:
+        """Si l'agrégat numérique échoue pour ce type, seules les stats de base sont lues."""
+        conn = MagicMock()
+        base_result = MagicMock()
+        base_result.fetchone.return_value = (0, 3)
+        empty_result = MagicMock()
+        empty_result.fetchall.return_value = []
+        conn.execute.side_effect = [
+            Exception("No function matches"),
+            base_result,
+            empty_result,
+            empty_result,
+        ]
+
+        result = extract_column_stats(conn, "t", "c", "INTEGER[]", 10)
+
+        assert result.distinct_count == 3
+        assert result.value_range is None
+
 
 class TestExtractMetadataFromConnection:
     """Tests de extract_metadata_from_connection."""
@@ -275,39 +397,34 @@ class TestExtractMetadataFromConnection:
             result = extract_metadata_from_connection(conn)
 
         assert result.datasource == "g7_analytics.duckdb"
+        # full_context est précalculé pendant l'extraction
+        assert all(c.full_context is not None for t in result.tables for c in t.columns)
 
     def test_extracts_all_tables(self) -> None:
-        """Extrait toutes les tables."""
+        """Extrait toutes les tables, chacune sur son curseur, dans l'ordre."""
         conn = MagicMock()
+        conn.execute.return_value.fetchall.return_value = [("table1",), ("table2",)]
+        cursor = conn.cursor.return_value.__enter__.return_value
 
-        tables_result = MagicMock()
-        tables_result.fetchall.return_value = [("table1",), ("table2",)]
-
-        # Mock pour table1
-        row_count_1 = MagicMock()
-        row_count_1.fetchone.return_value = (100,)
-        cols_1 = MagicMock()
-        cols_1.fetchall.return_value = [("id", "INT")]
+        with patch("catalog_engine.extraction._extract_table") as mock_table:
+            mock_table.side_effect = lambda _conn, name: TableMetadata(
+                name=name, row_count=0, columns=[]
+            )
+            result = extract_metadata_from_connection(conn)
 
-        # Mock pour table2
-        row_count_2 = MagicMock()
-        row_count_2.fetchone.return_value = (200,)
-        cols_2 = MagicMock()
-        cols_2.fetchall.return_value = [("name", "VARCHAR")]
+        assert [t.name for t in result.tables] == ["table1", "table2"]
+        assert {call.args[0] for call in mock_table.call_args_list} == {cursor}
 
-        conn.execute.side_effect = [
-            tables_result,
-            row_count_1,
-            cols_1,
-            row_count_2,
-            cols_2,
-        ]
+    def test_extracts_tables_in_parallel_on_real_duckdb(self) -> None:
+        """Extraction parallèle sur une vraie base DuckDB: ordre et statistiques conservés."""
+        conn = duckdb.connect()
+        for i in range(3):
+            conn.execute(f"CREATE TABLE t{i} AS SELECT range AS id FROM range({i + 1})")
 
-        with patch("catalog_engine.extraction.extract_column_stats") as mock_stats:
-            mock_stats.return_value = ColumnMetadata(name="col", data_type="INT")
-            result = extract_metadata_from_connection(conn)
+        result = extract_metadata_from_connection(conn)
 
-        assert len(result.tables) == 2
+        assert [(t.name, t.row_count) for t in result.tables] == [("t0", 1), ("t1", 2), ("t2", 3)]
+        assert result.tables[2].columns[0].distinct_count == 3
 
     def test_extracts_row_count(self) -> None:
         """Extrait le nombre de lignes."""
@@ -321,11 +438,108 @@ class TestExtractMetadataFromConnection:
         cols_result = MagicMock()
         cols_result.fetchall.return_value = []
 
-        conn.execute.side_effect = [tables_result, row_result, cols_result]
+        conn.execute.side_effect = [tables_result, cols_result, row_result]
 
         result = extract_metadata_from_connection(conn)
         assert result.tables[0].row_count == 5000
 
+    def test_binds_table_name_for_columns_lookup(self) -> None:
+        """Le nom de table est passé en paramètre (pas interpolé) pour information_schema."""
+        conn = MagicMock()
+        tables_result = MagicMock()
+        tables_result.fetchall.return_value = [("o'brien",)]
+        row_result = MagicMock()
+        row_result.fetchone.return_value = (1,)
+        cols_result = MagicMock()
+        cols_result.fetchall.return_value = []
+        conn.execute.side_effect = [tables_result, cols_result, row_result]
+
+        extract_metadata_from_connection(conn)
+
+        sql, params = conn.execute.call_args_list[1].args
+        assert "o'brien" not in sql
+        assert params == ["o'brien"]
+
+    def test_aggregates_table_in_one_scan(self) -> None:
+        """Nombre de lignes et agrégats de toutes les colonnes en une seule requête."""
+        conn = MagicMock()
+        tables_result = MagicMock()
+        tables_result.fetchall.return_value = [("users",)]
+        cols_result = MagicMock()
+        cols_result.fetchall.return_value = [
+            ("id", "INTEGER"),
+            ("_airbyte_raw_id", "VARCHAR"),
+            ("name", "VARCHAR"),
+        ]
+        agg_result = MagicMock()
+        # COUNT(*), id: null, distinct, min, max, avg, median, name: null, distinct, longueurs
+        agg_result.fetchone.return_value = (50, 0, 50, 1, 50, 25.5, 25.5, 2, 40, 3, 12, 6.5)
+        conn.execute.side_effect = [tables_result, cols_result, agg_result]
+
+        with patch("catalog_engine.extraction.extract_column_stats") as mock_stats:
+            mock_stats.return_value = ColumnMetadata(name="col", data_type="INT")
+            result = extract_metadata_from_connection(conn)
+
+        agg_sql = conn.execute.call_args_list[2].args[0]
+        assert "_airbyte_raw_id" not in agg_sql
+        assert result.tables[0].row_count == 50
+        passed = [c.kwargs["aggregates"] for c in mock_stats.call_args_list]
+        assert passed == [(0, 50, 1, 50, 25.5, 25.5), (2, 40, 3, 12, 6.5)]
+
+    def test_falls_back_when_table_aggregates_fail(self) -> None:
+        """Si l'agrégat groupé échoue, COUNT(*) seul puis agrégats par colonne."""
+        conn = MagicMock()
+        tables_result = MagicMock()
+        tables_result.fetchall.return_value = [("t",)]
+        cols_result = MagicMock()
+        cols_result.fetchall.return_value = [("tags", "INTEGER[]")]
+        row_result = MagicMock()
+        row_result.fetchone.return_value = (7,)
+        conn.execute.side_effect = [
+            tables_result,
+            cols_result,
+            Exception("No function matches"),
+            row_result,
+        ]
+
+        with patch("catalog_engine.extraction.extract_column_stats") as mock_stats:
+            mock_stats.return_value = ColumnMetadata(name="tags", data_type="INTEGER[]")
+            result = extract_metadata_from_connection(conn)
+
+        assert result.tables[0].row_count == 7
+        assert mock_stats.call_args.kwargs["aggregates"] is None
+
+
+class TestColumnKind:
+    """Tests de _column_kind."""
+
+    def test_numeric_types(self) -> None:
+        """Types numériques, quelle que soit la casse."""
+        for col_type in ["INTEGER", "bigint", "DOUBLE", "DECIMAL(10,2)", "REAL"]:
+            assert _column_kind(col_type) == (True, False)
+
+    def test_text_types(self) -> None:
+        """Types texte."""
+        for col_type in ["VARCHAR", "text", "CHAR(3)"]:
+            assert _column_kind(col_type) == (False, True)
+
+    def test_other_types(self) -> None:
+        """Ni numérique ni texte."""
+        for col_type in ["DATE", "BOOLEAN", "TIMESTAMP"]:
+            assert _column_kind(col_type) == (False, False)
+
+
+class TestQuoteIdent:
+    """Tests de _quote_ident."""
+
+    def test_wraps_in_double_quotes(self) -> None:
+        """Entoure l'identifiant de guillemets doubles."""
+        assert _quote_ident("users") == '"users"'
+
+    def test_escapes_embedded_quotes(self) -> None:
+        """Double les guillemets internes."""
+        assert _quote_ident('we"ird') == '"we""ird"'
+
 
 class TestBuildColumnFullContext:
     """Tests de build_column_full_context."""
@@ -425,3 +639,48 @@ class TestBuildColumnFullContext:
         context = build_column_full_context(col)
         assert "Pattern: email" in context
         assert "95%" in context
+
+
+class TestGetColumnFullContext:
+    """Tests de get_column_full_context."""
+
+    def test_computes_and_stores_context(self) -> None:
+        """Calcule le contexte et le mémorise sur la colonne."""
+        col = ColumnMetadata(name="status", data_type="VARCHAR", distinct_count=3)
+        context = get_column_full_context(col)
+        assert context == build_column_full_context(col)
+        assert col.full_context == context
+
+    def test_reuses_stored_context(self) -> None:
+        """Ne recalcule pas un contexte déjà présent."""
+        col = ColumnMetadata(name="status", data_type="VARCHAR", full_context="déjà calculé")
+        with patch("catalog_engine.extraction.build_column_full_context") as mock_build:
+            assert get_column_full_context(col) == "déjà calculé"
+        mock_build.assert_not_called()
+
+    def test_caches_empty_context(self) -> None:
+        """Un contexte vide est aussi mémorisé."""
+        col = ColumnMetadata(name="id", data_type="INT")
+        assert get_column_full_context(col) == ""
+        assert col.full_context == ""
+
+
+class TestGetSampleValuesStr:
+    """Tests de get_sample_values_str."""
+
+    def test_joins_and_stores(self) -> None:
+        """Joint les valeurs et mémorise le résultat sur la colonne."""
+        col = ColumnMetadata(name="status", data_type="VARCHAR", sample_values=["a", "b"])
+        assert get_sample_values_str(col) == "a, b"
+        assert col.sample_values_str == "a, b"
+
+    def test_reuses_stored_value(self) -> None:
+        """Ne rejoint pas des valeurs déjà mémorisées."""
+        col = ColumnMetadata(
+            name="status", data_type="VARCHAR", sample_values=["a"], sample_values_str="déjà"
+        )
+        assert get_sample_values_str(col) == "déjà"
+
+    def test_none_without_samples(self) -> None:
+        """None si la colonne n'a pas de valeurs d'exemple."""
+        assert get_sample_values_str(ColumnMetadata(name="id", data_type="INT")) is None
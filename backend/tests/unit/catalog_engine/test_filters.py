@@ -0,0 +1,21 @@
+"""Tests pour catalog_engine/filters.py - Exclusion des éléments internes."""
+
+import pytest
+
+from catalog_engine.filters import EXCLUDED_PREFIXES, is_internal_column, is_internal_table
+
+
+class TestIsInternal:
+    """Tests de is_internal_table / is_internal_column."""
+
+    @pytest.mark.parametrize("prefix", EXCLUDED_PREFIXES)
+    def test_excluded_prefixes_are_internal(self, prefix: str) -> None:
+        """Chaque préfixe exclu marque la table et la colonne comme internes."""
+        assert is_internal_table(f"{prefix}raw")
+        assert is_internal_column(f"{prefix}extracted_at")
+
+    @pytest.mark.parametrize("name", ["customers", "_id", "airbyte_", "dlt_loads", ""])
+    def test_user_names_are_not_internal(self, name: str) -> None:
+        """Les noms métier (y compris commençant par un seul '_') sont conservés."""
+        assert not is_internal_table(name)
+        assert not is_internal_column(name)
@@ -0,0 +1,43 @@
+"""Tests pour catalog_engine/__init__.py - Réexports chargés à la demande."""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import catalog_engine
+
+BACKEND_DIR = Path(__file__).resolve().parents[3]
+
+
+class TestLazyExports:
+    """Tests des réexports paresseux (PEP 562)."""
+
+    def test_all_exports_resolve(self) -> None:
+        """Chaque nom de __all__ est accessible depuis le package."""
+        for name in catalog_engine.__all__:
+            assert getattr(catalog_engine, name) is not None
+
+    def test_lazy_exports_cover_all(self) -> None:
+        """Tous les réexports (hors alias locaux) sont déclarés dans _LAZY_EXPORTS."""
+        assert set(catalog_engine._LAZY_EXPORTS) == set(catalog_engine.__all__) - {"PromptMode"}
+
+    def test_resolves_to_submodule_object(self) -> None:
+        """Le nom réexporté est l'objet du sous-module."""
+        from catalog_engine.extraction import extract_metadata_from_connection
+
+        assert catalog_engine.extract_metadata_from_connection is extract_metadata_from_connection
+
+    def test_unknown_name_raises_attribute_error(self) -> None:
+        """Un nom inconnu lève AttributeError."""
+        with pytest.raises(AttributeError, match="does_not_exist"):
+            catalog_engine.does_not_exist  # noqa: B018
+
+    def test_models_import_does_not_load_llm_service(self) -> None:
+        """Importer catalog_engine.models ne charge pas llm_service (litellm)."""
+        code = "import sys, catalog_engine.models; sys.exit('llm_service' in sys.modules)"
+        result = subprocess.run(  # noqa: S603 - argv fixe (interpréteur courant)
+            [sys.executable, "-c", code], cwd=BACKEND_DIR, check=False, capture_output=True
+        )
+        assert result.returncode == 0, result.stderr.decode()
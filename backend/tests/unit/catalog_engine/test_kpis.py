@@ -3,9 +3,11 @@
 from typing import Any
 from unittest.mock import MagicMock, patch
 
+import duckdb
 import pytest
 
 from catalog_engine.kpis import (
+    _build_kpi_schema,
     generate_kpis,
     get_data_period,
     save_kpis,
@@ -52,6 +54,23 @@ class TestValidateKpi:
         assert result.status == "OK"
         assert result.issues == []
 
+    def test_result_dumps_like_validated_model(self) -> None:
+        """Le résultat construit sans validation se sérialise normalement."""
+        kpi = KpiDefinition(
+            id="k",
+            title="Test KPI",
+            sql_value="SELECT 1",
+            sql_trend="SELECT 1",
+            sql_sparkline="SELECT 1",
+            footer="Test",
+        )
+        result = validate_kpi(kpi)
+        assert result.model_dump() == {
+            "kpi_id": "k",
+            "status": "WARNING",
+            "issues": ["id manquant ou trop court"],
+        }
+
     def test_warning_for_missing_id(self) -> None:
         """Warning pour ID manquant."""
         kpi = KpiDefinition(
@@ -135,6 +154,31 @@ class TestValidateKpi:
         assert result.status == "WARNING"
         assert any("sql_sparkline" in issue for issue in result.issues)
 
+    def test_accepts_lowercase_select(self) -> None:
+        """Le SELECT est détecté quelle que soit la casse."""
+        kpi = KpiDefinition(
+            id="test",
+            title="Test",
+            sql_value="select 1",
+            sql_trend="Select 1",
+            sql_sparkline="WITH x AS (select 1) SELECT * FROM x",
+            footer="Test",
+        )
+        assert validate_kpi(kpi).status == "OK"
+
+    def test_ignores_select_inside_identifier(self) -> None:
+        """Un identifiant contenant 'select' ne suffit pas."""
+        kpi = KpiDefinition(
+            id="test",
+            title="Test",
+            sql_value="SELECT 1",
+            sql_trend="SELECT 1",
+            sql_sparkline="selected_rows",
+            footer="Test",
+        )
+        result = validate_kpi(kpi)
+        assert result.issues == ["sql_sparkline invalide (pas de SELECT)"]
+
     def test_warning_for_invalid_sparkline_type(self) -> None:
         """Warning pour sparkline_type invalide."""
         kpi = KpiDefinition(
@@ -283,7 +327,7 @@ class TestGetDataPeriod:
         conn.execute.return_value.fetchone.return_value = (None, None, 0)
 
         result = get_data_period(conn)
-        assert "non déterminée" in result.lower()
+        assert result is None
 
     def test_handles_db_error(self) -> None:
         """Gère les erreurs DB."""
@@ -291,7 +335,103 @@ class TestGetDataPeriod:
         conn.execute.side_effect = Exception("DB Error")
 
         result = get_data_period(conn)
-        assert "non déterminée" in result.lower()
+        assert result is None
+
+    def test_counts_distinct_days_with_duckdb(self) -> None:
+        """Compte les jours distincts (NULL ignorés) sur une vraie base DuckDB."""
+        conn = duckdb.connect()
+        conn.execute(
+            """
+            CREATE TABLE evaluations AS SELECT * FROM (VALUES
+                (TIMESTAMP '2024-05-01 10:00'), (TIMESTAMP '2024-05-01 18:00'),
+                (NULL), (TIMESTAMP '2024-05-03 09:00')
+            ) t(dat_course)
+        """
+        )
+
+        result = get_data_period(conn)
+
+        assert result == "Du 2024-05-01 au 2024-05-03 (2 jours de données)"
+
+
+class TestBuildKpiSchema:
+    """Tests de _build_kpi_schema."""
+
+    def test_empty_catalog(self) -> None:
+        """Schéma vide pour un catalogue sans table."""
+        assert _build_kpi_schema(ExtractedCatalog(datasource="t", tables=[])) == ""
+
+    def test_formats_tables_and_columns(self) -> None:
+        """Un bloc par table séparé par une ligne vide, exemples limités à 3."""
+        catalog = ExtractedCatalog(
+            datasource="t",
+            tables=[
+                TableMetadata(
+                    name="a",
+                    row_count=1500,
+                    columns=[
+                        ColumnMetadata(
+                            name="x",
+                            data_type="INT",
+                            sample_values=["1", "2", "3", "4"],
+                            value_range="1 - 9",
+                        ),
+                    ],
+                ),
+                TableMetadata(
+                    name="b",
+                    row_count=2,
+                    columns=[ColumnMetadata(name="y", data_type="VARCHAR")],
+                ),
+            ],
+        )
+        assert _build_kpi_schema(catalog) == (
+            "Table: a (1,500 lignes)\n"
+            "  - x (INT) [Exemples: 1, 2, 3] [Range: 1 - 9]\n"
+            "\n"
+            "Table: b (2 lignes)\n"
+            "  - y (VARCHAR)\n"
+        )
+
+    def test_budget_large_enough_keeps_everything(self) -> None:
+        """Sans dépassement, le schéma budgété est identique au schéma complet."""
+        catalog = ExtractedCatalog(
+            datasource="t",
+            tables=[
+                TableMetadata(name="a", row_count=1, columns=[]),
+                TableMetadata(name="b", row_count=2, columns=[]),
+            ],
+        )
+        assert _build_kpi_schema(catalog, max_tokens=1000) == _build_kpi_schema(catalog)
+
+    def test_budget_keeps_largest_tables(self) -> None:
+        """Retient les tables les plus volumineuses et signale celles écartées."""
+        catalog = ExtractedCatalog(
+            datasource="t",
+            tables=[
+                TableMetadata(name="small", row_count=10, columns=[]),
+                TableMetadata(name="big", row_count=1000, columns=[]),
+                TableMetadata(name="tiny", row_count=1, columns=[]),
+            ],
+        )
+        # Un bloc "Table: big (1,000 lignes)\n" + séparateur = 27 caractères
+        schema = _build_kpi_schema(catalog, max_tokens=7)
+        assert schema == "Table: big (1,000 lignes)\n\n… (+2 tables)\n"
+
+    def test_budget_preserves_catalog_order(self) -> None:
+        """Les tables retenues restent dans l'ordre du catalogue."""
+        catalog = ExtractedCatalog(
+            datasource="t",
+            tables=[
+                TableMetadata(name="b", row_count=5, columns=[]),
+                TableMetadata(name="a", row_count=9, columns=[]),
+                TableMetadata(name="c", row_count=1, columns=[]),
+            ],
+        )
+        schema = _build_kpi_schema(catalog, max_tokens=12)
+        assert schema.index("Table: b") < schema.index("Table: a")
+        assert "Table: c" not in schema
+        assert schema.endswith("… (+1 tables)\n")
 
 
 class TestGenerateKpis:
@@ -368,12 +508,60 @@ class TestGenerateKpis:
         assert isinstance(result, KpisGenerationResult)
         assert len(result.kpis) == 1
 
+    @patch("catalog_engine.kpis.call_with_retry")
+    @patch("catalog_engine.kpis.get_data_period")
+    @patch("catalog_engine.kpis.get_active_prompt")
+    def test_uses_precomputed_data_period(
+        self,
+        mock_prompt: MagicMock,
+        mock_period: MagicMock,
+        mock_retry: MagicMock,
+    ) -> None:
+        """N'interroge pas DuckDB si la période est fournie."""
+        mock_prompt.return_value = {"content": "{schema}{data_period}{kpi_fields}"}
+        mock_retry.return_value = KpisGenerationResult(kpis=[])
+
+        catalog = ExtractedCatalog(datasource="test.duckdb", tables=[])
+        generate_kpis(catalog, MagicMock(), data_period="Du 2024-05-01 au 2024-05-31")
+
+        mock_period.assert_not_called()
+
+    @patch("catalog_engine.kpis.call_with_retry")
+    @patch("catalog_engine.kpis.check_token_limit")
+    @patch("catalog_engine.kpis.LLMConfig")
+    @patch("catalog_engine.kpis.get_active_prompt")
+    def test_truncates_schema_to_token_budget(
+        self,
+        mock_prompt: MagicMock,
+        mock_config: MagicMock,
+        mock_check: MagicMock,
+        mock_retry: MagicMock,
+    ) -> None:
+        """Tronque le schéma au budget restant au lieu d'envoyer tout le catalogue."""
+        mock_prompt.return_value = {"content": "{schema}{data_period}{kpi_fields}"}
+        mock_retry.return_value = KpisGenerationResult(kpis=[])
+        mock_check.return_value = (True, 0, "OK")
+        fields_tokens = len(KpiDefinition.get_fields_description()) // 4
+        mock_config.MAX_INPUT_TOKENS = fields_tokens + 12
+
+        catalog = ExtractedCatalog(
+            datasource="test.duckdb",
+            tables=[TableMetadata(name=f"t{i}", row_count=i, columns=[]) for i in range(50)],
+        )
+        generate_kpis(catalog, MagicMock(), data_period="P")
+
+        prompt = mock_check.call_args.args[0]
+        assert "Table: t49 " in prompt
+        assert "Table: t0 " not in prompt
+        assert "… (+" in prompt
+
 
 class TestSaveKpis:
     """Tests de save_kpis."""
 
+    @patch("catalog_engine.kpis.execute_values")
     @patch("catalog_engine.kpis.get_connection")
-    def test_saves_kpis_to_db(self, mock_conn: MagicMock) -> None:
+    def test_saves_kpis_to_db(self, mock_conn: MagicMock, mock_values: MagicMock) -> None:
         """Sauvegarde les KPIs en DB."""
         conn = MagicMock()
         cursor = MagicMock()
@@ -393,6 +581,71 @@ class TestSaveKpis:
         stats = save_kpis(result)
         assert stats["kpis"] == 1
 
+    @patch("catalog_engine.kpis.execute_values")
+    @patch("catalog_engine.kpis.get_connection")
+    def test_inserts_all_kpis_in_one_statement(
+        self, mock_conn: MagicMock, mock_values: MagicMock
+    ) -> None:
+        """Insère tous les KPIs en une seule requête, avec display_order."""
+        conn = MagicMock()
+        cursor = MagicMock()
+        conn.cursor.return_value = cursor
+        mock_conn.return_value = conn
+
+        kpis = [
+            KpiDefinition(
+                id=f"kpi-{i}",
+                title="Test",
+                sql_value="SELECT 1",
+                sql_trend="SELECT 1",
+                sql_sparkline="SELECT 1",
+                footer="Test",
+            )
+            for i in range(3)
+        ]
+
+        save_kpis(KpisGenerationResult(kpis=kpis))
+
+        mock_values.assert_called_once()
+        rows = mock_values.call_args.args[2]
+        assert [(row[0], row[-1]) for row in rows] == [("kpi-0", 0), ("kpi-1", 1), ("kpi-2", 2)]
+        # Une seule page, quel que soit le nombre de KPIs
+        assert mock_values.call_args.kwargs["page_size"] == len(rows)
+
+    @patch("catalog_engine.kpis.execute_values")
+    @patch("catalog_engine.kpis.get_connection")
+    def test_row_matches_insert_columns(self, mock_conn: MagicMock, mock_values: MagicMock) -> None:
+        """Chaque ligne suit l'ordre des colonnes de l'INSERT."""
+        mock_conn.return_value = MagicMock()
+        kpi = KpiDefinition(
+            id="taux",
+            title="Taux",
+            sql_value="SELECT 1",
+            sql_trend="SELECT 2",
+            sql_sparkline="SELECT 3",
+            sparkline_type="bar",
+            footer="Mai 2024",
+            trend_label="vs avril",
+            invert_trend=True,
+        )
+
+        save_kpis(KpisGenerationResult(kpis=[kpi]))
+
+        assert mock_values.call_args.args[2] == [
+            (
+                "taux",
+                "Taux",
+                "SELECT 1",
+                "SELECT 2",
+                "SELECT 3",
+                "bar",
+                "Mai 2024",
+                "vs avril",
+                True,
+                0,
+            )
+        ]
+
     @patch("catalog_engine.kpis.get_connection")
     def test_clears_old_kpis(self, mock_conn: MagicMock) -> None:
         """Vide les anciens KPIs."""
@@ -409,13 +662,13 @@ class TestSaveKpis:
         delete_calls = [call for call in cursor.execute.call_args_list if "DELETE" in str(call)]
         assert len(delete_calls) > 0
 
+    @patch("catalog_engine.kpis.execute_values")
     @patch("catalog_engine.kpis.get_connection")
-    def test_handles_insert_error(self, mock_conn: MagicMock) -> None:
-        """Gère les erreurs d'insertion."""
+    def test_handles_insert_error(self, mock_conn: MagicMock, mock_values: MagicMock) -> None:
+        """Gère les erreurs d'insertion (rollback, anciens KPIs conservés)."""
         conn = MagicMock()
         cursor = MagicMock()
-        # Première requête OK (DELETE), deuxième erreur (INSERT)
-        cursor.execute.side_effect = [None, Exception("Insert error")]
+        mock_values.side_effect = Exception("Insert error")
         conn.cursor.return_value = cursor
         mock_conn.return_value = conn
 
@@ -432,6 +685,9 @@ class TestSaveKpis:
         # Ne devrait pas lever d'erreur
         stats = save_kpis(result)
         assert stats["kpis"] == 0
+        conn.rollback.assert_called_once()
+        conn.commit.assert_not_called()
+        conn.close.assert_called_once()
 
     @patch("catalog_engine.kpis.get_connection")
     def test_commits_and_closes(self, mock_conn: MagicMock) -> None:
@@ -447,3 +703,18 @@ class TestSaveKpis:
 
         conn.commit.assert_called_once()
         conn.close.assert_called_once()
+
+    @patch("catalog_engine.kpis.set_async_commit")
+    @patch("catalog_engine.kpis.get_connection")
+    def test_commit_does_not_wait_for_wal_flush(
+        self, mock_conn: MagicMock, mock_async: MagicMock
+    ) -> None:
+        """Écriture régénérable: commit asynchrone, avant la purge."""
+        conn = MagicMock()
+        cursor = MagicMock()
+        conn.cursor.return_value = cursor
+        mock_conn.return_value = conn
+
+        save_kpis(KpisGenerationResult(kpis=[]))
+
+        mock_async.assert_called_once_with(cursor)
@@ -3,6 +3,7 @@
 import pytest
 
 from catalog_engine.models import (
+    _MAX_ISSUES,
     CatalogValidationResult,
     ColumnMetadata,
     ExtractedCatalog,
@@ -210,6 +211,57 @@ class TestCatalogValidationResult:
         assert data["synonyms"] == 25
         assert len(data["issues"]) == 1
 
+    def test_merge_adds_counters_and_issues(self) -> None:
+        """merge cumule les compteurs et concatène les problèmes."""
+        first = CatalogValidationResult()
+        first.tables_ok = 2
+        first.columns_warning = 1
+        first.issues = ["a"]
+        second = CatalogValidationResult()
+        second.tables_ok = 1
+        second.synonyms_total = 4
+        second.issues = ["b"]
+
+        first.merge(second)
+
+        assert first.tables_ok == 3
+        assert first.columns_warning == 1
+        assert first.synonyms_total == 4
+        assert first.issues == ["a", "b"]
+        assert second.issues == ["b"]
+
+    def test_add_issue_caps_buffer(self) -> None:
+        """Au-delà de la limite, les problèmes sont seulement comptés."""
+        result = CatalogValidationResult()
+        for i in range(_MAX_ISSUES + 7):
+            result.add_issue(f"issue {i}")
+
+        assert len(result.issues) == _MAX_ISSUES
+        assert result.issues[-1] == f"issue {_MAX_ISSUES - 1}"
+        assert result.issues_truncated == 7
+        assert result.to_dict()["issues_truncated"] == 7
+
+    def test_merge_respects_cap(self) -> None:
+        """merge ne dépasse pas la limite et cumule les problèmes tronqués."""
+        first = CatalogValidationResult()
+        first.issues = ["a"] * (_MAX_ISSUES - 2)
+        first.issues_truncated = 1
+        second = CatalogValidationResult()
+        second.issues = ["b"] * 5
+        second.issues_truncated = 4
+
+        first.merge(second)
+
+        assert len(first.issues) == _MAX_ISSUES
+        assert first.issues[-2:] == ["b", "b"]
+        assert first.issues_truncated == 1 + 4 + 3
+
+    def test_has_no_instance_dict(self) -> None:
+        """__slots__: pas d'attribut arbitraire."""
+        result = CatalogValidationResult()
+        with pytest.raises(AttributeError):
+            result.unknown = 1  # type: ignore[attr-defined]
+
 
 class TestKpiDefinition:
     """Tests de KpiDefinition."""
@@ -261,6 +313,10 @@ class TestKpiDefinition:
         assert "défaut: area" in desc
         assert "défaut: False" in desc
 
+    def test_get_fields_description_is_cached(self) -> None:
+        """get_fields_description retourne la même chaîne à chaque appel."""
+        assert KpiDefinition.get_fields_description() is KpiDefinition.get_fields_description()
+
 
 class TestKpisGenerationResult:
     """Tests de KpisGenerationResult."""
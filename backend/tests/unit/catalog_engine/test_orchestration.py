@@ -1,14 +1,25 @@
 """Tests pour catalog_engine/orchestration.py - Orchestration workflows."""
 
+import threading
+import time
 from typing import Any
 from unittest.mock import MagicMock, patch
 
 import pytest
 
-from catalog_engine.models import ColumnMetadata, ExtractedCatalog, TableMetadata
+from catalog_engine.kpis import DATA_PERIOD_UNKNOWN
+from catalog_engine.models import (
+    CatalogValidationResult,
+    ColumnMetadata,
+    ExtractedCatalog,
+    TableMetadata,
+)
 from catalog_engine.orchestration import (
     _dummy_context,
     _enrich_tables,
+    _generate_artifacts,
+    _pack_batches,
+    _run_llm_batches,
     enrich_selected_tables,
     extract_only,
 )
@@ -28,13 +39,128 @@ class TestDummyContext:
             assert value is None
 
 
+class TestGenerateArtifacts:
+    """Tests de _generate_artifacts."""
+
+    @patch("catalog_engine.orchestration.get_data_period")
+    @patch("catalog_engine.orchestration.save_suggested_questions")
+    @patch("catalog_engine.orchestration.generate_suggested_questions")
+    @patch("catalog_engine.orchestration.save_kpis")
+    @patch("catalog_engine.orchestration.generate_kpis")
+    def test_saves_kpis_before_questions(
+        self,
+        mock_kpis: MagicMock,
+        mock_save_kpis: MagicMock,
+        mock_questions: MagicMock,
+        mock_save_questions: MagicMock,
+        mock_period: MagicMock,
+    ) -> None:
+        """Les sauvegardes restent ordonnées sur le thread appelant."""
+        writes: list[tuple[str, threading.Thread]] = []
+
+        def record(name: str, count: int) -> dict[str, int]:
+            writes.append((name, threading.current_thread()))
+            return {name: count}
+
+        mock_save_kpis.side_effect = lambda _r: record("kpis", 4)
+        mock_save_questions.side_effect = lambda _q: record("questions", 2)
+        mock_questions.return_value = [{"question": "q"}]
+        mock_period.return_value = "Données de 2024"
+
+        stats = _generate_artifacts(
+            ExtractedCatalog(datasource="t", tables=[]), MagicMock(), {}, None
+        )
+
+        assert [name for name, _ in writes] == ["kpis", "questions"]
+        assert all(thread is threading.current_thread() for _, thread in writes)
+        assert stats["kpis"] == 4
+        assert stats["questions"] == 2
+
+    @patch("catalog_engine.orchestration.get_data_period")
+    @patch("catalog_engine.orchestration.save_suggested_questions")
+    @patch("catalog_engine.orchestration.generate_suggested_questions")
+    @patch("catalog_engine.orchestration.save_kpis")
+    @patch("catalog_engine.orchestration.generate_kpis")
+    def test_resolves_period_before_dispatch(
+        self,
+        mock_kpis: MagicMock,
+        mock_save_kpis: MagicMock,
+        mock_questions: MagicMock,
+        mock_save_questions: MagicMock,
+        mock_period: MagicMock,
+    ) -> None:
+        """La période est lue une fois sur le thread appelant puis transmise aux KPIs."""
+        mock_period.return_value = "Données de 2024"
+        mock_save_kpis.return_value = {"kpis": 0}
+        mock_questions.return_value = []
+        mock_save_questions.return_value = {"questions": 0}
+        db_conn = MagicMock()
+
+        _generate_artifacts(ExtractedCatalog(datasource="t", tables=[]), db_conn, {}, None)
+
+        mock_period.assert_called_once_with(db_conn)
+        assert mock_kpis.call_args.kwargs["data_period"] == "Données de 2024"
+
+    @patch("catalog_engine.orchestration.get_data_period")
+    @patch("catalog_engine.orchestration.save_suggested_questions")
+    @patch("catalog_engine.orchestration.generate_suggested_questions")
+    @patch("catalog_engine.orchestration.save_kpis")
+    @patch("catalog_engine.orchestration.generate_kpis")
+    def test_undetermined_period_uses_placeholder(
+        self,
+        mock_kpis: MagicMock,
+        mock_save_kpis: MagicMock,
+        mock_questions: MagicMock,
+        mock_save_questions: MagicMock,
+        mock_period: MagicMock,
+    ) -> None:
+        """Période indéterminable: libellé par défaut transmis, sans second scan DuckDB."""
+        mock_period.return_value = None
+        mock_save_kpis.return_value = {"kpis": 0}
+        mock_questions.return_value = []
+        mock_save_questions.return_value = {"questions": 0}
+
+        _generate_artifacts(ExtractedCatalog(datasource="t", tables=[]), MagicMock(), {}, None)
+
+        assert mock_kpis.call_args.kwargs["data_period"] == DATA_PERIOD_UNKNOWN
+
+    @patch("catalog_engine.orchestration.get_data_period")
+    @patch("catalog_engine.orchestration.save_suggested_questions")
+    @patch("catalog_engine.orchestration.generate_suggested_questions")
+    @patch("catalog_engine.orchestration.save_kpis")
+    @patch("catalog_engine.orchestration.generate_kpis")
+    def test_overlaps_kpis_and_questions(
+        self,
+        mock_kpis: MagicMock,
+        mock_save_kpis: MagicMock,
+        mock_questions: MagicMock,
+        mock_save_questions: MagicMock,
+        mock_period: MagicMock,
+    ) -> None:
+        """Les appels LLM KPIs et questions tournent en même temps."""
+        barrier = threading.Barrier(2, timeout=5)
+        mock_kpis.side_effect = lambda *_a, **_k: barrier.wait()
+        mock_questions.side_effect = lambda _c: (barrier.wait(), [])[1]
+        mock_period.return_value = "Données de 2024"
+        mock_save_kpis.return_value = {"kpis": 4}
+        mock_save_questions.return_value = {"questions": 0}
+
+        stats = _generate_artifacts(
+            ExtractedCatalog(datasource="t", tables=[]), MagicMock(), {}, None
+        )
+
+        assert not barrier.broken
+        assert stats["kpis"] == 4
+
+
 class TestExtractOnly:
     """Tests de extract_only."""
 
-    @patch("catalog_engine.orchestration.build_column_full_context")
-    @patch("catalog_engine.orchestration.add_column")
+    @patch("catalog_engine.orchestration.update_datasource")
+    @patch("catalog_engine.orchestration.get_column_full_context")
+    @patch("catalog_engine.orchestration.add_columns")
     @patch("catalog_engine.orchestration.add_table")
-    @patch("catalog_engine.orchestration.get_connection")
+    @patch("catalog_engine.orchestration.get_db")
     @patch("catalog_engine.orchestration.add_datasource")
     @patch("catalog_engine.orchestration.extract_metadata_from_connection")
     def test_extracts_metadata(
@@ -45,6 +171,7 @@ class TestExtractOnly:
         mock_table: MagicMock,
         mock_col: MagicMock,
         mock_context: MagicMock,
+        mock_update_ds: MagicMock,
     ) -> None:
         """Extrait les métadonnées."""
         mock_extract.return_value = ExtractedCatalog(
@@ -59,7 +186,7 @@ class TestExtractOnly:
         )
         mock_ds.return_value = 1
         mock_table.return_value = 1
-        mock_col.return_value = 1
+        mock_col.return_value = [1]
         mock_context.return_value = ""
 
         db_conn = MagicMock()
@@ -68,10 +195,35 @@ class TestExtractOnly:
         assert result["status"] == "ok"
         mock_extract.assert_called_once_with(db_conn)
 
-    @patch("catalog_engine.orchestration.build_column_full_context")
-    @patch("catalog_engine.orchestration.add_column")
+    @patch("catalog_engine.orchestration.get_data_period")
+    @patch("catalog_engine.orchestration.update_datasource")
+    @patch("catalog_engine.orchestration.add_datasource")
+    @patch("catalog_engine.orchestration.extract_metadata_from_connection")
+    def test_stores_data_period_on_datasource(
+        self,
+        mock_extract: MagicMock,
+        mock_ds: MagicMock,
+        mock_update_ds: MagicMock,
+        mock_period: MagicMock,
+    ) -> None:
+        """Calcule la période des données une fois et la stocke sur la datasource."""
+        mock_extract.return_value = ExtractedCatalog(datasource="test.duckdb", tables=[])
+        mock_ds.return_value = 7
+        mock_period.return_value = "Du 2024-05-01 au 2024-05-31 (31 jours de données)"
+
+        db_conn = MagicMock()
+        extract_only(db_conn)
+
+        mock_period.assert_called_once_with(db_conn)
+        mock_update_ds.assert_called_once_with(
+            7, data_period="Du 2024-05-01 au 2024-05-31 (31 jours de données)"
+        )
+
+    @patch("catalog_engine.orchestration.update_datasource")
+    @patch("catalog_engine.orchestration.get_column_full_context")
+    @patch("catalog_engine.orchestration.add_columns")
     @patch("catalog_engine.orchestration.add_table")
-    @patch("catalog_engine.orchestration.get_connection")
+    @patch("catalog_engine.orchestration.get_db")
     @patch("catalog_engine.orchestration.add_datasource")
     @patch("catalog_engine.orchestration.extract_metadata_from_connection")
     def test_saves_tables_without_description(
@@ -82,6 +234,7 @@ class TestExtractOnly:
         mock_table: MagicMock,
         mock_col: MagicMock,
         mock_context: MagicMock,
+        mock_update_ds: MagicMock,
     ) -> None:
         """Sauvegarde les tables sans description."""
         mock_extract.return_value = ExtractedCatalog(
@@ -98,10 +251,11 @@ class TestExtractOnly:
         call_args = mock_table.call_args
         assert call_args[1]["description"] is None
 
-    @patch("catalog_engine.orchestration.build_column_full_context")
-    @patch("catalog_engine.orchestration.add_column")
+    @patch("catalog_engine.orchestration.update_datasource")
+    @patch("catalog_engine.orchestration.get_column_full_context")
+    @patch("catalog_engine.orchestration.add_columns")
     @patch("catalog_engine.orchestration.add_table")
-    @patch("catalog_engine.orchestration.get_connection")
+    @patch("catalog_engine.orchestration.get_db")
     @patch("catalog_engine.orchestration.add_datasource")
     @patch("catalog_engine.orchestration.extract_metadata_from_connection")
     def test_returns_stats(
@@ -112,6 +266,7 @@ class TestExtractOnly:
         mock_table: MagicMock,
         mock_col: MagicMock,
         mock_context: MagicMock,
+        mock_update_ds: MagicMock,
     ) -> None:
         """Retourne les stats."""
         mock_extract.return_value = ExtractedCatalog(
@@ -129,7 +284,7 @@ class TestExtractOnly:
         )
         mock_ds.return_value = 1
         mock_table.return_value = 1
-        mock_col.return_value = 1
+        mock_col.return_value = [1, 2]
         mock_context.return_value = ""
 
         db_conn = MagicMock()
@@ -137,8 +292,79 @@ class TestExtractOnly:
 
         assert result["stats"]["tables"] == 1
         assert result["stats"]["columns"] == 2
+        # Une seule insertion groupée pour les colonnes de la table
+        mock_col.assert_called_once()
+        assert [c["name"] for c in mock_col.call_args.args[1]] == ["id", "name"]
 
-    @patch("catalog_engine.orchestration.get_connection")
+    @patch("catalog_engine.orchestration.update_datasource")
+    @patch("catalog_engine.orchestration.add_table")
+    @patch("catalog_engine.orchestration.get_db")
+    @patch("catalog_engine.orchestration.add_datasource")
+    @patch("catalog_engine.orchestration.extract_metadata_from_connection")
+    def test_uses_ids_returned_by_upserts(
+        self,
+        mock_extract: MagicMock,
+        mock_ds: MagicMock,
+        mock_conn: MagicMock,
+        mock_table: MagicMock,
+        mock_update_ds: MagicMock,
+    ) -> None:
+        """N'ouvre pas de connexion de secours pour relire les ids."""
+        mock_extract.return_value = ExtractedCatalog(
+            datasource="test.duckdb",
+            tables=[TableMetadata(name="t", row_count=1, columns=[])],
+        )
+        mock_ds.return_value = 1
+        mock_table.return_value = None
+
+        result = extract_only(MagicMock())
+
+        mock_conn.assert_called_once()
+        assert result["stats"]["tables"] == 0
+
+    @patch("catalog_engine.orchestration.update_datasource")
+    @patch("catalog_engine.orchestration.get_column_full_context")
+    @patch("catalog_engine.orchestration.add_columns")
+    @patch("catalog_engine.orchestration.add_table")
+    @patch("catalog_engine.orchestration.get_db")
+    @patch("catalog_engine.orchestration.add_datasource")
+    @patch("catalog_engine.orchestration.extract_metadata_from_connection")
+    def test_shares_one_connection(
+        self,
+        mock_extract: MagicMock,
+        mock_ds: MagicMock,
+        mock_db: MagicMock,
+        mock_table: MagicMock,
+        mock_col: MagicMock,
+        mock_context: MagicMock,
+        mock_update_ds: MagicMock,
+    ) -> None:
+        """Toute la sauvegarde passe par une seule connexion PostgreSQL."""
+        mock_extract.return_value = ExtractedCatalog(
+            datasource="test.duckdb",
+            tables=[
+                TableMetadata(
+                    name=name,
+                    row_count=1,
+                    columns=[ColumnMetadata(name="id", data_type="INT")],
+                )
+                for name in ("a", "b")
+            ],
+        )
+        mock_ds.return_value = 1
+        mock_table.return_value = 1
+        mock_col.return_value = [1]
+        mock_context.return_value = ""
+        conn = mock_db.return_value.__enter__.return_value
+
+        extract_only(MagicMock())
+
+        mock_db.assert_called_once()
+        assert mock_ds.call_args.kwargs["conn"] is conn
+        assert all(c.kwargs["conn"] is conn for c in mock_table.call_args_list)
+        assert all(c.kwargs["conn"] is conn for c in mock_col.call_args_list)
+
+    @patch("catalog_engine.orchestration.get_db")
     @patch("catalog_engine.orchestration.add_datasource")
     @patch("catalog_engine.orchestration.extract_metadata_from_connection")
     def test_raises_if_datasource_fails(
@@ -207,6 +433,39 @@ class TestEnrichSelectedTables:
         ]
         assert len(update_calls) >= 1
 
+    @patch("catalog_engine.orchestration._enrich_tables")
+    @patch("catalog_engine.orchestration.get_connection")
+    def test_passes_ids_as_array(self, mock_conn: MagicMock, mock_enrich: MagicMock) -> None:
+        """Les IDs sont passés en un seul paramètre tableau (SQL constant)."""
+        conn = MagicMock()
+        cursor = MagicMock()
+        cursor.fetchall.return_value = [{"datasource_name": "test", "data_period": None}]
+        conn.cursor.return_value = cursor
+        mock_conn.return_value = conn
+        mock_enrich.return_value = {"status": "ok", "stats": {}}
+
+        enrich_selected_tables([1, 2, 3], MagicMock())
+
+        assert cursor.execute.call_count == 2
+        for call in cursor.execute.call_args_list:
+            assert "ANY(%s)" in call.args[0]
+            assert all(param == [1, 2, 3] for param in call.args[1])
+
+    @patch("catalog_engine.orchestration._enrich_tables")
+    @patch("catalog_engine.orchestration.get_connection")
+    def test_skips_rows_already_in_state(
+        self, mock_conn: MagicMock, mock_enrich: MagicMock
+    ) -> None:
+        """Seules les tables dont l'état change sont réécrites."""
+        cursor = mock_conn.return_value.cursor.return_value
+        cursor.fetchall.return_value = [{"datasource_name": "test", "data_period": None}]
+        mock_enrich.return_value = {"status": "ok", "stats": {}}
+
+        enrich_selected_tables([1, 2], MagicMock())
+
+        update_sql = cursor.execute.call_args_list[0].args[0]
+        assert "WHERE is_enabled IS DISTINCT FROM" in update_sql
+
     @patch("catalog_engine.orchestration.get_connection")
     def test_returns_error_if_no_tables_found(self, mock_conn: MagicMock) -> None:
         """Retourne erreur si tables non trouvées."""
@@ -223,9 +482,212 @@ class TestEnrichSelectedTables:
         assert "Aucune table trouvée" in result["message"]
 
 
+class TestPackBatches:
+    """Tests de _pack_batches."""
+
+    @staticmethod
+    def _info(name: str, context_chars: int) -> tuple[TableMetadata, str]:
+        return TableMetadata(name=name, row_count=1, columns=[]), "x" * context_chars
+
+    def test_respects_table_count(self) -> None:
+        """Pas plus de max_tables_per_batch tables par batch."""
+        infos = [self._info(f"t{i}", 4) for i in range(5)]
+
+        batches = _pack_batches(infos, max_tables_per_batch=2, max_tokens=1000)
+
+        assert [len(b) for b in batches] == [2, 2, 1]
+
+    def test_splits_on_token_budget(self) -> None:
+        """Un batch est fermé avant de dépasser le budget de tokens, ordre conservé."""
+        # 40, 40, 40, 10 tokens avec un budget de 100
+        infos = [self._info("a", 160), self._info("b", 160), self._info("c", 160)]
+        infos.append(self._info("d", 40))
+
+        batches = _pack_batches(infos, max_tables_per_batch=10, max_tokens=100)
+
+        assert [[t.name for t, _ in b] for b in batches] == [["a", "b"], ["c", "d"]]
+
+    def test_oversized_table_gets_own_batch(self) -> None:
+        """Une table au-delà du budget forme seule son batch."""
+        infos = [self._info("small", 40), self._info("wide", 800), self._info("next", 40)]
+
+        batches = _pack_batches(infos, max_tables_per_batch=10, max_tokens=100)
+
+        assert [[t.name for t, _ in b] for b in batches] == [["small"], ["wide"], ["next"]]
+
+    def test_empty(self) -> None:
+        """Aucune table: aucun batch."""
+        assert _pack_batches([], max_tables_per_batch=10, max_tokens=100) == []
+
+
+class TestRunLlmBatches:
+    """Tests de _run_llm_batches."""
+
+    @staticmethod
+    def _batches(count: int) -> list[list[tuple[TableMetadata, str]]]:
+        """Une table par batch."""
+        return [
+            [(TableMetadata(name=f"t{i}", row_count=1, columns=[]), f"ctx{i}")]
+            for i in range(count)
+        ]
+
+    @patch("catalog_engine.orchestration.validate_catalog_enrichment")
+    @patch("catalog_engine.orchestration.enrich_with_llm")
+    @patch("catalog_engine.orchestration.get_setting")
+    def test_runs_batches_concurrently(
+        self, mock_setting: MagicMock, mock_enrich: MagicMock, mock_validate: MagicMock
+    ) -> None:
+        """Les batches sont envoyés au LLM en parallèle."""
+        mock_setting.return_value = "2"
+        both_started = threading.Barrier(2, timeout=5)
+
+        def _enrich(
+            catalog: ExtractedCatalog, tables_context: str, use_cache: bool
+        ) -> dict[str, Any]:
+            both_started.wait()  # BrokenBarrierError si les appels étaient séquentiels
+            return {catalog.tables[0].name: {}}
+
+        mock_enrich.side_effect = _enrich
+
+        result = _run_llm_batches(self._batches(2), None, max_tables_per_batch=1)
+
+        assert isinstance(result, tuple)
+        enrichments, _validation = result
+        assert set(enrichments) == {"t0", "t1"}
+
+    @patch("catalog_engine.orchestration.validate_catalog_enrichment")
+    @patch("catalog_engine.orchestration.enrich_with_llm")
+    @patch("catalog_engine.orchestration.get_setting")
+    def test_accumulates_validation_across_batches(
+        self, mock_setting: MagicMock, mock_enrich: MagicMock, mock_validate: MagicMock
+    ) -> None:
+        """Les validations des batches sont cumulées dans un seul résultat."""
+        mock_setting.return_value = None
+        mock_enrich.return_value = {}
+
+        def _validate(catalog: ExtractedCatalog, enrichment: dict[str, Any]) -> Any:
+            batch_validation = CatalogValidationResult()
+            batch_validation.tables_ok = 1
+            batch_validation.add_issue(f"{catalog.tables[0].name}: colonne sans description")
+            return batch_validation
+
+        mock_validate.side_effect = _validate
+
+        result = _run_llm_batches(self._batches(3), None, max_tables_per_batch=1)
+
+        assert isinstance(result, tuple)
+        validation = result[1]
+        assert isinstance(validation, CatalogValidationResult)
+        assert validation.tables_ok == 3
+        assert [issue.split(":")[0] for issue in validation.issues] == ["t0", "t1", "t2"]
+
+    @patch("catalog_engine.orchestration.validate_catalog_enrichment")
+    @patch("catalog_engine.orchestration.enrich_with_llm")
+    @patch("catalog_engine.orchestration.get_setting")
+    def test_bounds_concurrency_with_setting(
+        self, mock_setting: MagicMock, mock_enrich: MagicMock, mock_validate: MagicMock
+    ) -> None:
+        """Au plus llm_max_parallel appels LLM simultanés."""
+        mock_setting.return_value = "2"
+        lock = threading.Lock()
+        running = 0
+        peak = 0
+
+        def _enrich(
+            catalog: ExtractedCatalog, tables_context: str, use_cache: bool
+        ) -> dict[str, Any]:
+            nonlocal running, peak
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            time.sleep(0.02)
+            with lock:
+                running -= 1
+            return {catalog.tables[0].name: {}}
+
+        mock_enrich.side_effect = _enrich
+
+        result = _run_llm_batches(self._batches(6), None, max_tables_per_batch=1)
+
+        assert isinstance(result, tuple)
+        assert len(result[0]) == 6
+        assert peak == 2
+
+    @patch("catalog_engine.orchestration.validate_catalog_enrichment")
+    @patch("catalog_engine.orchestration.enrich_with_llm")
+    @patch("catalog_engine.orchestration.get_setting")
+    def test_validates_batches_in_order(
+        self, mock_setting: MagicMock, mock_enrich: MagicMock, mock_validate: MagicMock
+    ) -> None:
+        """Les résultats sont consommés dans l'ordre des batches."""
+        mock_setting.return_value = None
+        mock_enrich.side_effect = lambda _catalog, tables_context, **_kw: {tables_context: {}}
+
+        _run_llm_batches(self._batches(3), None, max_tables_per_batch=1)
+
+        validated = [c.args[0].tables[0].name for c in mock_validate.call_args_list]
+        assert validated == ["t0", "t1", "t2"]
+
+    @patch("catalog_engine.orchestration.validate_catalog_enrichment")
+    @patch("catalog_engine.orchestration.enrich_with_llm")
+    @patch("catalog_engine.orchestration.get_setting")
+    def test_forwards_use_cache(
+        self, mock_setting: MagicMock, mock_enrich: MagicMock, mock_validate: MagicMock
+    ) -> None:
+        """use_cache=False (enrichissement forcé) est transmis à chaque appel LLM."""
+        mock_setting.return_value = None
+        mock_enrich.return_value = {}
+
+        _run_llm_batches(self._batches(2), None, max_tables_per_batch=1, use_cache=False)
+
+        assert [c.kwargs["use_cache"] for c in mock_enrich.call_args_list] == [False, False]
+
+    @patch("catalog_engine.orchestration.validate_catalog_enrichment")
+    @patch("catalog_engine.orchestration.enrich_with_llm")
+    @patch("catalog_engine.orchestration.get_setting")
+    def test_reports_failing_batch(
+        self, mock_setting: MagicMock, mock_enrich: MagicMock, mock_validate: MagicMock
+    ) -> None:
+        """Une erreur sur un batch renvoie l'erreur avec son numéro."""
+        mock_setting.return_value = "1"
+
+        def _enrich(
+            catalog: ExtractedCatalog, tables_context: str, use_cache: bool
+        ) -> dict[str, Any]:
+            if tables_context == "ctx1":
+                raise RuntimeError("quota")
+            return {}
+
+        mock_enrich.side_effect = _enrich
+
+        result = _run_llm_batches(self._batches(3), None, max_tables_per_batch=1)
+
+        assert isinstance(result, dict)
+        assert result["error_type"] == "llm_error"
+        assert "batch 2" in result["message"]
+
+
 class TestEnrichTables:
     """Tests de _enrich_tables."""
 
+    @patch("catalog_engine.orchestration._run_llm_batches")
+    @patch("catalog_engine.orchestration.load_tables_context")
+    def test_sets_total_steps_from_packed_batches(
+        self, mock_context: MagicMock, mock_batches: MagicMock
+    ) -> None:
+        """Le nombre de steps du workflow suit les batches réellement constitués."""
+        mock_context.return_value = [
+            (TableMetadata(name=f"t{i}", row_count=1, columns=[]), f"ctx{i}") for i in range(3)
+        ]
+        mock_batches.return_value = {"status": "error", "message": "stop"}
+        workflow = MagicMock(current_step_index=2)
+
+        _enrich_tables([], MagicMock(), workflow, max_tables_per_batch=1)
+
+        # 2 steps passés + 3 batches + save_descriptions + generate_kpis + generate_questions
+        workflow.set_total_steps.assert_called_once_with(8)
+        assert len(mock_batches.call_args.args[0]) == 3
+
     @patch("catalog_engine.orchestration.save_suggested_questions")
     @patch("catalog_engine.orchestration.generate_suggested_questions")
     @patch("catalog_engine.orchestration.save_kpis")
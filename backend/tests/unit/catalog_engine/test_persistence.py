@@ -1,94 +1,56 @@
 """Tests pour catalog_engine/persistence.py - Persistence PostgreSQL."""
 
-from pathlib import Path
 from typing import Any
 from unittest.mock import MagicMock, patch
 
+import psycopg2.extensions
 import pytest
 
 from catalog_engine.models import ColumnMetadata, ExtractedCatalog, TableMetadata
 from catalog_engine.persistence import (
-    DEFAULT_DB_PATH,
-    get_duckdb_path,
+    load_tables_context,
     save_to_catalog,
     update_descriptions,
 )
 
 
-class TestGetDuckdbPath:
-    """Tests de get_duckdb_path."""
-
-    @patch("catalog_engine.persistence.get_setting")
-    def test_returns_setting_value(self, mock_setting: MagicMock) -> None:
-        """Retourne la valeur du setting."""
-        mock_setting.return_value = "/custom/path/db.duckdb"
-        path = get_duckdb_path()
-        assert path == "/custom/path/db.duckdb"
-
-    @patch("catalog_engine.persistence.get_setting")
-    def test_returns_default_when_no_setting(self, mock_setting: MagicMock) -> None:
-        """Retourne le défaut si pas de setting."""
-        mock_setting.return_value = None
-        path = get_duckdb_path()
-        assert path == DEFAULT_DB_PATH
-
-    @patch("catalog_engine.persistence.get_setting")
-    def test_resolves_relative_path(self, mock_setting: MagicMock) -> None:
-        """Résout les chemins relatifs."""
-        mock_setting.return_value = "data/test.duckdb"
-        path = get_duckdb_path()
-        # Doit être un chemin absolu
-        assert Path(path).is_absolute()
-
-
 class TestSaveToCatalog:
     """Tests de save_to_catalog."""
 
-    @patch("catalog_engine.persistence.add_synonym")
-    @patch("catalog_engine.persistence.add_column")
-    @patch("catalog_engine.persistence.add_table")
-    @patch("catalog_engine.persistence.add_datasource")
-    def test_creates_datasource(
-        self,
-        mock_ds: MagicMock,
-        mock_table: MagicMock,
-        mock_col: MagicMock,
-        mock_syn: MagicMock,
-    ) -> None:
+    @pytest.fixture
+    def mocks(self) -> Any:
+        """Patch la connexion et les fonctions d'écriture du catalogue."""
+        with (
+            patch("catalog_engine.persistence.get_db") as mock_db,
+            patch("catalog_engine.persistence.add_datasource", return_value=1) as mock_ds,
+            patch("catalog_engine.persistence.add_table", return_value=1) as mock_table,
+            patch("catalog_engine.persistence.add_columns") as mock_cols,
+            patch("catalog_engine.persistence.add_synonyms") as mock_syns,
+        ):
+            conn = MagicMock()
+            mock_db.return_value.__enter__.return_value = conn
+            mock_cols.side_effect = lambda _table_id, columns, **_kw: list(range(len(columns)))
+            mock_syns.side_effect = lambda rows, **_kw: len(rows)
+            yield MagicMock(
+                conn=conn,
+                db=mock_db,
+                datasource=mock_ds,
+                table=mock_table,
+                columns=mock_cols,
+                synonyms=mock_syns,
+            )
+
+    def test_creates_datasource(self, mocks: Any) -> None:
         """Crée la datasource."""
-        mock_ds.return_value = 1
-        mock_table.return_value = 1
-        mock_col.return_value = 1
+        catalog = ExtractedCatalog(datasource="g7_analytics.duckdb", tables=[])
 
-        catalog = ExtractedCatalog(
-            datasource="g7_analytics.duckdb",
-            tables=[],
-        )
-        enrichment: dict[str, Any] = {}
+        save_to_catalog(catalog, {})
 
-        save_to_catalog(catalog, enrichment)
+        mocks.datasource.assert_called_once()
+        assert "g7_analytics" in mocks.datasource.call_args[1]["name"]
 
-        mock_ds.assert_called_once()
-        assert "g7_analytics" in mock_ds.call_args[1]["name"]
-
-    @patch("catalog_engine.persistence.get_connection")
-    @patch("catalog_engine.persistence.add_synonym")
-    @patch("catalog_engine.persistence.add_column")
-    @patch("catalog_engine.persistence.add_table")
-    @patch("catalog_engine.persistence.add_datasource")
-    def test_creates_tables(
-        self,
-        mock_ds: MagicMock,
-        mock_table: MagicMock,
-        mock_col: MagicMock,
-        mock_syn: MagicMock,
-        mock_conn: MagicMock,
-    ) -> None:
+    def test_creates_tables(self, mocks: Any) -> None:
         """Crée les tables."""
-        mock_ds.return_value = 1
-        mock_table.return_value = 1
-        mock_col.return_value = 1
-
         catalog = ExtractedCatalog(
             datasource="test.duckdb",
             tables=[
@@ -103,25 +65,10 @@ class TestSaveToCatalog:
 
         stats = save_to_catalog(catalog, enrichment)
         assert stats["tables"] == 2
+        assert mocks.table.call_args_list[0].kwargs["description"] == "Users table"
 
-    @patch("catalog_engine.persistence.get_connection")
-    @patch("catalog_engine.persistence.add_synonym")
-    @patch("catalog_engine.persistence.add_column")
-    @patch("catalog_engine.persistence.add_table")
-    @patch("catalog_engine.persistence.add_datasource")
-    def test_creates_columns(
-        self,
-        mock_ds: MagicMock,
-        mock_table: MagicMock,
-        mock_col: MagicMock,
-        mock_syn: MagicMock,
-        mock_conn: MagicMock,
-    ) -> None:
-        """Crée les colonnes."""
-        mock_ds.return_value = 1
-        mock_table.return_value = 1
-        mock_col.return_value = 1
-
+    def test_creates_columns(self, mocks: Any) -> None:
+        """Crée les colonnes d'une table en un seul appel."""
         catalog = ExtractedCatalog(
             datasource="test.duckdb",
             tables=[
@@ -147,81 +94,143 @@ class TestSaveToCatalog:
 
         stats = save_to_catalog(catalog, enrichment)
         assert stats["columns"] == 2
+        mocks.columns.assert_called_once()
+        columns = mocks.columns.call_args.args[1]
+        assert [c["description"] for c in columns] == ["User ID", "User name"]
 
-    @patch("catalog_engine.persistence.get_connection")
-    @patch("catalog_engine.persistence.add_synonym")
-    @patch("catalog_engine.persistence.add_column")
-    @patch("catalog_engine.persistence.add_table")
-    @patch("catalog_engine.persistence.add_datasource")
-    def test_creates_synonyms(
-        self,
-        mock_ds: MagicMock,
-        mock_table: MagicMock,
-        mock_col: MagicMock,
-        mock_syn: MagicMock,
-        mock_conn: MagicMock,
-    ) -> None:
-        """Crée les synonymes."""
-        mock_ds.return_value = 1
-        mock_table.return_value = 1
-        mock_col.return_value = 1
-
+    def test_creates_synonyms(self, mocks: Any) -> None:
+        """Crée les synonymes de toutes les tables en un seul appel."""
         catalog = ExtractedCatalog(
             datasource="test.duckdb",
             tables=[
                 TableMetadata(
                     name="users",
                     row_count=100,
-                    columns=[ColumnMetadata(name="id", data_type="INT")],
-                )
+                    columns=[
+                        ColumnMetadata(name="id", data_type="INT"),
+                        ColumnMetadata(name="name", data_type="VARCHAR"),
+                    ],
+                ),
+                TableMetadata(
+                    name="orders",
+                    row_count=10,
+                    columns=[ColumnMetadata(name="ref", data_type="VARCHAR")],
+                ),
             ],
         )
         enrichment: dict[str, Any] = {
             "users": {
                 "description": "Users",
                 "columns": {
-                    "id": {"description": "ID", "synonyms": ["user_id", "uid"]},
+                    "name": {"description": "Nom", "synonyms": ["user_name", "nom"]},
                 },
-            }
+            },
+            "orders": {"columns": {"ref": {"synonyms": ["reference"]}}},
         }
 
         stats = save_to_catalog(catalog, enrichment)
-        assert stats["synonyms"] == 2
+
+        assert stats["synonyms"] == 3
+        mocks.synonyms.assert_called_once()
+        # Ids de colonnes renvoyés par add_columns (0, 1 par table)
+        assert mocks.synonyms.call_args.args[0] == [
+            (1, "user_name"),
+            (1, "nom"),
+            (0, "reference"),
+        ]
+
+    def test_single_transaction(self, mocks: Any) -> None:
+        """Toutes les écritures partagent la connexion de get_db."""
+        catalog = ExtractedCatalog(
+            datasource="test.duckdb",
+            tables=[
+                TableMetadata(
+                    name="users",
+                    row_count=1,
+                    columns=[ColumnMetadata(name="id", data_type="INT")],
+                )
+            ],
+        )
+
+        save_to_catalog(catalog, {})
+
+        mocks.db.assert_called_once()
+        for mock in (mocks.datasource, mocks.table, mocks.columns, mocks.synonyms):
+            assert mock.call_args.kwargs["conn"] is mocks.conn
 
     @patch("catalog_engine.persistence.get_connection")
-    @patch("catalog_engine.persistence.add_datasource")
-    def test_raises_if_datasource_creation_fails(
-        self,
-        mock_ds: MagicMock,
-        mock_conn: MagicMock,
-    ) -> None:
+    def test_no_extra_connection_for_lookups(self, mock_conn: MagicMock, mocks: Any) -> None:
+        """Ids via RETURNING des upserts: aucune connexion ouverte pour des lookups."""
+        mocks.table.side_effect = [1, 2]
+        catalog = ExtractedCatalog(
+            datasource="test.duckdb",
+            tables=[
+                TableMetadata(
+                    name=name,
+                    row_count=1,
+                    columns=[ColumnMetadata(name="id", data_type="INT")],
+                )
+                for name in ("users", "orders")
+            ],
+        )
+
+        save_to_catalog(catalog, {})
+
+        mock_conn.assert_not_called()
+        mocks.conn.cursor.return_value.fetchone.assert_not_called()
+
+    def test_commit_does_not_wait_for_wal_flush(self, mocks: Any) -> None:
+        """Catalogue régénérable: synchronous_commit désactivé pour la transaction."""
+        save_to_catalog(ExtractedCatalog(datasource="test.duckdb", tables=[]), {})
+
+        mocks.conn.cursor.return_value.execute.assert_any_call(
+            "SET LOCAL synchronous_commit TO OFF"
+        )
+
+    def test_raises_if_datasource_creation_fails(self, mocks: Any) -> None:
         """Lève erreur si création datasource échoue."""
-        mock_ds.return_value = None
-        conn = MagicMock()
-        cursor = MagicMock()
-        cursor.fetchone.return_value = None
-        conn.cursor.return_value = cursor
-        mock_conn.return_value = conn
+        mocks.datasource.return_value = None
 
         catalog = ExtractedCatalog(datasource="test.duckdb", tables=[])
-        enrichment: dict[str, Any] = {}
 
         with pytest.raises(ValueError, match="Impossible de créer"):
-            save_to_catalog(catalog, enrichment)
+            save_to_catalog(catalog, {})
 
 
 class TestUpdateDescriptions:
     """Tests de update_descriptions."""
 
-    @patch("catalog_engine.persistence.get_connection")
-    def test_updates_table_descriptions(self, mock_conn: MagicMock) -> None:
-        """Met à jour les descriptions de tables."""
+    @staticmethod
+    def _users_catalog() -> ExtractedCatalog:
+        return ExtractedCatalog(
+            datasource="test.duckdb",
+            tables=[
+                TableMetadata(
+                    name="users",
+                    row_count=100,
+                    columns=[ColumnMetadata(name="id", data_type="INT")],
+                )
+            ],
+        )
+
+    @staticmethod
+    def _mock_db(mock_conn: MagicMock, id_rows: list[dict[str, Any]]) -> MagicMock:
         conn = MagicMock()
         cursor = MagicMock()
-        cursor.rowcount = 1
-        cursor.fetchone.return_value = {"id": 1}
+        cursor.fetchall.return_value = id_rows
         conn.cursor.return_value = cursor
         mock_conn.return_value = conn
+        return conn
+
+    @patch("catalog_engine.persistence.execute_values")
+    @patch("catalog_engine.persistence.get_connection")
+    def test_updates_table_descriptions(self, mock_conn: MagicMock, mock_values: MagicMock) -> None:
+        """Met à jour les descriptions de tables."""
+        self._mock_db(
+            mock_conn,
+            [{"table_id": 1, "table_name": "users", "column_id": None, "column_name": None}],
+        )
+        mock_values.return_value = [{"name": "users"}]
 
         catalog = ExtractedCatalog(
             datasource="test.duckdb",
@@ -231,30 +240,20 @@ class TestUpdateDescriptions:
 
         stats = update_descriptions(catalog, enrichment)
         assert stats["tables"] == 1
+        assert mock_values.call_args.args[2] == [("users", "New description")]
 
+    @patch("catalog_engine.persistence.execute_values")
     @patch("catalog_engine.persistence.get_connection")
-    def test_updates_column_descriptions(self, mock_conn: MagicMock) -> None:
-        """Met à jour les descriptions de colonnes."""
-        conn = MagicMock()
-        cursor = MagicMock()
-        cursor.rowcount = 1
-        cursor.fetchone.side_effect = [
-            {"id": 1},  # table id
-            {"id": 10},  # column id (pour synonymes)
-        ]
-        conn.cursor.return_value = cursor
-        mock_conn.return_value = conn
-
-        catalog = ExtractedCatalog(
-            datasource="test.duckdb",
-            tables=[
-                TableMetadata(
-                    name="users",
-                    row_count=100,
-                    columns=[ColumnMetadata(name="id", data_type="INT")],
-                )
-            ],
+    def test_updates_column_descriptions(
+        self, mock_conn: MagicMock, mock_values: MagicMock
+    ) -> None:
+        """Met à jour les descriptions de colonnes par id."""
+        self._mock_db(
+            mock_conn,
+            [{"table_id": 1, "table_name": "users", "column_id": 10, "column_name": "id"}],
         )
+        mock_values.side_effect = [[{"name": "users"}], [{"id": 10}]]
+
         enrichment: dict[str, Any] = {
             "users": {
                 "description": "Table desc",
@@ -262,32 +261,20 @@ class TestUpdateDescriptions:
             }
         }
 
-        stats = update_descriptions(catalog, enrichment)
+        stats = update_descriptions(self._users_catalog(), enrichment)
         assert stats["columns"] == 1
+        assert mock_values.call_args_list[1].args[2] == [(10, "ID desc")]
 
+    @patch("catalog_engine.persistence.execute_values")
     @patch("catalog_engine.persistence.get_connection")
-    def test_adds_synonyms(self, mock_conn: MagicMock) -> None:
-        """Ajoute les synonymes."""
-        conn = MagicMock()
-        cursor = MagicMock()
-        cursor.rowcount = 1
-        cursor.fetchone.side_effect = [
-            {"id": 1},  # table id
-            {"id": 10},  # column id
-        ]
-        conn.cursor.return_value = cursor
-        mock_conn.return_value = conn
-
-        catalog = ExtractedCatalog(
-            datasource="test.duckdb",
-            tables=[
-                TableMetadata(
-                    name="users",
-                    row_count=100,
-                    columns=[ColumnMetadata(name="id", data_type="INT")],
-                )
-            ],
+    def test_adds_synonyms(self, mock_conn: MagicMock, mock_values: MagicMock) -> None:
+        """Ajoute les synonymes en une seule requête."""
+        self._mock_db(
+            mock_conn,
+            [{"table_id": 1, "table_name": "users", "column_id": 10, "column_name": "id"}],
         )
+        mock_values.side_effect = [[{"name": "users"}], [{"id": 10}], [{"id": 1}, {"id": 2}]]
+
         enrichment: dict[str, Any] = {
             "users": {
                 "description": "Table",
@@ -295,18 +282,35 @@ class TestUpdateDescriptions:
             }
         }
 
-        stats = update_descriptions(catalog, enrichment)
+        stats = update_descriptions(self._users_catalog(), enrichment)
         assert stats["synonyms"] == 2
+        assert mock_values.call_args_list[2].args[2] == [(10, "user_id"), (10, "uid")]
 
+    @patch("catalog_engine.persistence.execute_values")
     @patch("catalog_engine.persistence.get_connection")
-    def test_skips_missing_table(self, mock_conn: MagicMock) -> None:
-        """Skip les tables manquantes."""
-        conn = MagicMock()
-        cursor = MagicMock()
-        cursor.rowcount = 0  # No row updated
-        cursor.fetchone.return_value = None  # Table not found
-        conn.cursor.return_value = cursor
-        mock_conn.return_value = conn
+    def test_reads_ids_in_one_query(self, mock_conn: MagicMock, mock_values: MagicMock) -> None:
+        """Une seule lecture des ids, quel que soit le nombre de tables."""
+        conn = self._mock_db(mock_conn, [])
+        mock_values.return_value = []
+
+        catalog = ExtractedCatalog(
+            datasource="test.duckdb",
+            tables=[TableMetadata(name=f"t{i}", row_count=1, columns=[]) for i in range(5)],
+        )
+        update_descriptions(catalog, {f"t{i}": {"description": "d"} for i in range(5)})
+
+        cursor = conn.cursor.return_value
+        selects = [c for c in cursor.execute.call_args_list if "SELECT" in c.args[0]]
+        assert len(selects) == 1
+        assert selects[0].args[1] == ([f"t{i}" for i in range(5)],)
+        mock_values.assert_called_once()
+
+    @patch("catalog_engine.persistence.execute_values")
+    @patch("catalog_engine.persistence.get_connection")
+    def test_skips_missing_table(self, mock_conn: MagicMock, mock_values: MagicMock) -> None:
+        """Skip les colonnes des tables manquantes."""
+        self._mock_db(mock_conn, [])
+        mock_values.return_value = []
 
         catalog = ExtractedCatalog(
             datasource="test.duckdb",
@@ -315,17 +319,17 @@ class TestUpdateDescriptions:
         enrichment: dict[str, Any] = {"missing": {"description": "Desc", "columns": {}}}
 
         stats = update_descriptions(catalog, enrichment)
+        assert stats["tables"] == 0
         assert stats["columns"] == 0
 
+    @patch("catalog_engine.persistence.execute_values")
     @patch("catalog_engine.persistence.get_connection")
-    def test_skips_empty_description(self, mock_conn: MagicMock) -> None:
+    def test_skips_empty_description(self, mock_conn: MagicMock, mock_values: MagicMock) -> None:
         """Skip les descriptions vides."""
-        conn = MagicMock()
-        cursor = MagicMock()
-        cursor.rowcount = 0
-        cursor.fetchone.return_value = {"id": 1}
-        conn.cursor.return_value = cursor
-        mock_conn.return_value = conn
+        self._mock_db(
+            mock_conn,
+            [{"table_id": 1, "table_name": "users", "column_id": None, "column_name": None}],
+        )
 
         catalog = ExtractedCatalog(
             datasource="test.duckdb",
@@ -337,20 +341,89 @@ class TestUpdateDescriptions:
 
         stats = update_descriptions(catalog, enrichment)
         assert stats["tables"] == 0
+        mock_values.assert_not_called()
 
     @patch("catalog_engine.persistence.get_connection")
     def test_commits_and_closes(self, mock_conn: MagicMock) -> None:
         """Commit et ferme la connexion."""
+        conn = self._mock_db(mock_conn, [])
+
+        catalog = ExtractedCatalog(
+            datasource="test.duckdb",
+            tables=[TableMetadata(name="users", row_count=100, columns=[])],
+        )
+        update_descriptions(catalog, {})
+
+        conn.commit.assert_called_once()
+        conn.close.assert_called_once()
+
+    @patch("catalog_engine.persistence.get_connection")
+    def test_commit_does_not_wait_for_wal_flush(self, mock_conn: MagicMock) -> None:
+        """synchronous_commit désactivé pour cette transaction uniquement."""
+        conn = self._mock_db(mock_conn, [])
+
+        update_descriptions(self._users_catalog(), {})
+
+        statements = [c.args[0] for c in conn.cursor.return_value.execute.call_args_list]
+        assert "SET LOCAL synchronous_commit TO OFF" in statements
+
+    @patch("catalog_engine.persistence.get_connection")
+    def test_empty_catalog_skips_db(self, mock_conn: MagicMock) -> None:
+        """Un catalogue vide n'ouvre pas de connexion."""
+        stats = update_descriptions(ExtractedCatalog(datasource="test.duckdb", tables=[]), {})
+
+        assert stats == {"tables": 0, "columns": 0, "synonyms": 0}
+        mock_conn.assert_not_called()
+
+
+class TestLoadTablesContext:
+    """Tests de load_tables_context."""
+
+    @staticmethod
+    def _col(table_id: int, name: str, full_context: str | None = None) -> tuple[Any, ...]:
+        # Ordre du SELECT: table_id, name, data_type, full_context, sample_values, value_range
+        return (table_id, name, "INTEGER", full_context, "1, 2", None)
+
+    @patch("catalog_engine.persistence.get_connection")
+    def test_single_query_for_all_tables(self, mock_conn: MagicMock) -> None:
+        """Une seule requête pour les colonnes de toutes les tables, ordre des tables conservé."""
         conn = MagicMock()
         cursor = MagicMock()
-        cursor.fetchone.return_value = None
+        cursor.__iter__.return_value = iter(
+            [self._col(1, "id"), self._col(2, "order_id", "[PK]"), self._col(2, "user_id")]
+        )
         conn.cursor.return_value = cursor
         mock_conn.return_value = conn
 
-        catalog = ExtractedCatalog(datasource="test.duckdb", tables=[])
-        enrichment: dict[str, Any] = {}
+        tables_rows = [
+            {"id": 2, "name": "orders", "row_count": 10},
+            {"id": 1, "name": "users", "row_count": None},
+            {"id": 3, "name": "empty", "row_count": 0},
+        ]
+        result = load_tables_context(tables_rows)
+
+        # Curseur serveur (nommé): lignes lues par paquets
+        assert conn.cursor.call_args.kwargs["name"]
+        # Lignes en tuples (pas de RealDictCursor)
+        assert conn.cursor.call_args.kwargs["cursor_factory"] is psycopg2.extensions.cursor
+        cursor.execute.assert_called_once()
+        assert cursor.execute.call_args.args[1] == ([2, 1, 3],)
+        conn.close.assert_called_once()
 
-        update_descriptions(catalog, enrichment)
+        assert [t.name for t, _ in result] == ["orders", "users", "empty"]
+        orders, orders_context = result[0]
+        assert [c.name for c in orders.columns] == ["order_id", "user_id"]
+        assert orders.columns[0].sample_values == ["1", "2"]
+        assert orders.columns[0].sample_values_str == "1, 2"
+        assert orders_context == (
+            "\nTable: orders (10 lignes)\nColonnes:\n"
+            "  - order_id (INTEGER) [PK]\n  - user_id (INTEGER)\n"
+        )
+        assert result[1][0].row_count == 0
+        assert result[2][0].columns == []
 
-        conn.commit.assert_called_once()
-        conn.close.assert_called_once()
+    @patch("catalog_engine.persistence.get_connection")
+    def test_no_tables_skips_db(self, mock_conn: MagicMock) -> None:
+        """Aucune table : pas de connexion."""
+        assert load_tables_context([]) == []
+        mock_conn.assert_not_called()
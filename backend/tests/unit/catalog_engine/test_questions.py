@@ -102,8 +102,9 @@ class TestSaveSuggestedQuestions:
         stats = save_suggested_questions([])
         assert stats["questions"] == 0
 
+    @patch("catalog_engine.questions.execute_values")
     @patch("catalog_engine.questions.get_connection")
-    def test_saves_questions_to_db(self, mock_conn: MagicMock) -> None:
+    def test_saves_questions_to_db(self, mock_conn: MagicMock, mock_values: MagicMock) -> None:
         """Sauvegarde les questions en DB."""
         conn = MagicMock()
         cursor = MagicMock()
@@ -119,8 +120,9 @@ class TestSaveSuggestedQuestions:
 
         assert stats["questions"] == 2
 
+    @patch("catalog_engine.questions.execute_values")
     @patch("catalog_engine.questions.get_connection")
-    def test_clears_old_questions(self, mock_conn: MagicMock) -> None:
+    def test_clears_old_questions(self, mock_conn: MagicMock, mock_values: MagicMock) -> None:
         """Vide les anciennes questions."""
         conn = MagicMock()
         cursor = MagicMock()
@@ -135,8 +137,9 @@ class TestSaveSuggestedQuestions:
         delete_calls = [c for c in cursor.execute.call_args_list if "DELETE" in str(c)]
         assert len(delete_calls) > 0
 
+    @patch("catalog_engine.questions.execute_values")
     @patch("catalog_engine.questions.get_connection")
-    def test_sets_display_order(self, mock_conn: MagicMock) -> None:
+    def test_sets_display_order(self, mock_conn: MagicMock, mock_values: MagicMock) -> None:
         """Définit display_order."""
         conn = MagicMock()
         cursor = MagicMock()
@@ -150,18 +153,18 @@ class TestSaveSuggestedQuestions:
 
         save_suggested_questions(questions)
 
-        # Vérifie les INSERT avec display_order
-        insert_calls = [c for c in cursor.execute.call_args_list if "INSERT" in str(c)]
-        # Premier appel avec display_order=0, deuxième avec display_order=1
-        assert len(insert_calls) == 2
+        # Un seul INSERT multi-lignes, display_order=0 puis 1
+        mock_values.assert_called_once()
+        rows = mock_values.call_args.args[2]
+        assert [row[3] for row in rows] == [0, 1]
 
+    @patch("catalog_engine.questions.execute_values")
     @patch("catalog_engine.questions.get_connection")
-    def test_handles_insert_error(self, mock_conn: MagicMock) -> None:
-        """Gère les erreurs d'insertion."""
+    def test_handles_insert_error(self, mock_conn: MagicMock, mock_values: MagicMock) -> None:
+        """Gère les erreurs d'insertion (rollback, anciennes questions conservées)."""
         conn = MagicMock()
         cursor = MagicMock()
-        # DELETE OK, premier INSERT erreur
-        cursor.execute.side_effect = [None, Exception("Insert error")]
+        mock_values.side_effect = Exception("Insert error")
         conn.cursor.return_value = cursor
         mock_conn.return_value = conn
 
@@ -170,9 +173,12 @@ class TestSaveSuggestedQuestions:
         # Ne devrait pas lever d'erreur
         stats = save_suggested_questions(questions)
         assert stats["questions"] == 0
+        conn.rollback.assert_called_once()
+        conn.commit.assert_not_called()
 
+    @patch("catalog_engine.questions.execute_values")
     @patch("catalog_engine.questions.get_connection")
-    def test_handles_missing_fields(self, mock_conn: MagicMock) -> None:
+    def test_handles_missing_fields(self, mock_conn: MagicMock, mock_values: MagicMock) -> None:
         """Gère les champs manquants."""
         conn = MagicMock()
         cursor = MagicMock()
@@ -189,8 +195,9 @@ class TestSaveSuggestedQuestions:
         # Devrait quand même insérer avec None
         assert stats["questions"] == 1
 
+    @patch("catalog_engine.questions.execute_values")
     @patch("catalog_engine.questions.get_connection")
-    def test_commits_and_closes(self, mock_conn: MagicMock) -> None:
+    def test_commits_and_closes(self, mock_conn: MagicMock, mock_values: MagicMock) -> None:
         """Commit et ferme la connexion."""
         conn = MagicMock()
         cursor = MagicMock()
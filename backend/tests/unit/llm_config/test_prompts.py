@@ -1,11 +1,13 @@
 """Tests pour llm_config/prompts.py - CRUD prompts."""
 
+from typing import Any
 from unittest.mock import MagicMock, patch
 
 import pytest
 
 from llm_config.prompts import (
     add_prompt,
+    clear_active_prompt_cache,
     delete_prompt,
     get_active_prompt,
     get_all_prompts,
@@ -17,6 +19,14 @@ from llm_config.prompts import (
 )
 
 
+@pytest.fixture(autouse=True)
+def _isolate_active_prompt_cache() -> Any:
+    """Chaque test part d'un cache de prompts actifs vide."""
+    clear_active_prompt_cache()
+    yield
+    clear_active_prompt_cache()
+
+
 class TestGetPrompts:
     """Tests de get_prompts."""
 
@@ -141,6 +151,67 @@ class TestGetActivePrompt:
         assert result["key"] == "test"
 
 
+class TestActivePromptCache:
+    """Tests du cache de get_active_prompt."""
+
+    @staticmethod
+    def _mock_db(mock_conn: MagicMock, content: str = "Active prompt") -> MagicMock:
+        conn = MagicMock()
+        cursor = MagicMock()
+        cursor.fetchone.return_value = {"id": 1, "key": "k", "content": content}
+        cursor.rowcount = 1
+        conn.cursor.return_value = cursor
+        mock_conn.return_value = conn
+        return cursor
+
+    @patch("llm_config.prompts.get_connection")
+    def test_second_read_uses_cache(self, mock_conn: MagicMock) -> None:
+        """Deux lectures de la même clé: une seule requête."""
+        self._mock_db(mock_conn)
+
+        first = get_active_prompt("k")
+        second = get_active_prompt("k")
+
+        assert first == second
+        mock_conn.assert_called_once()
+
+    @patch("llm_config.prompts.get_connection")
+    def test_returns_independent_copies(self, mock_conn: MagicMock) -> None:
+        """Modifier le dict renvoyé n'altère pas le cache."""
+        self._mock_db(mock_conn)
+
+        get_active_prompt("k")["content"] = "modifié"  # type: ignore[index]
+
+        assert get_active_prompt("k") == {"id": 1, "key": "k", "content": "Active prompt"}
+
+    @patch("llm_config.prompts.get_connection")
+    def test_expires_after_ttl(self, mock_conn: MagicMock) -> None:
+        """Relit la base une fois le TTL écoulé."""
+        self._mock_db(mock_conn)
+
+        with patch("llm_config.prompts.time.monotonic", side_effect=[0.0, 31.0, 31.0]):
+            get_active_prompt("k")
+            get_active_prompt("k")
+
+        assert mock_conn.call_count == 2
+
+    @patch("llm_config.prompts.get_connection")
+    def test_writes_invalidate_cache(self, mock_conn: MagicMock) -> None:
+        """Toute écriture de prompt force une relecture."""
+        self._mock_db(mock_conn)
+        get_active_prompt("k")
+
+        update_prompt_content("k", "nouveau")
+        get_active_prompt("k")
+        set_active_prompt("k", "v2")
+        get_active_prompt("k")
+        delete_prompt(1)
+        get_active_prompt("k")
+
+        # 1 lecture initiale + 3 écritures + 3 relectures
+        assert mock_conn.call_count == 7
+
+
 class TestAddPrompt:
     """Tests de add_prompt."""
 
@@ -5,10 +5,25 @@ from unittest.mock import MagicMock, patch
 import pytest
 from pydantic import BaseModel
 
-from llm_service.calls import call_llm, call_llm_structured, check_llm_status
+from llm_service.calls import _build_messages, call_llm, call_llm_structured, check_llm_status
 from llm_service.errors import LLMError, LLMErrorCode
 
 
+class TestBuildMessages:
+    """Tests de _build_messages."""
+
+    def test_user_only(self) -> None:
+        """Sans system_prompt, un seul message utilisateur."""
+        assert _build_messages("q", None) == [{"role": "user", "content": "q"}]
+
+    def test_system_then_user(self) -> None:
+        """Le message système précède le message utilisateur."""
+        assert _build_messages("q", "sys") == [
+            {"role": "system", "content": "sys"},
+            {"role": "user", "content": "q"},
+        ]
+
+
 class TestCallLlm:
     """Tests de call_llm."""
 
@@ -178,6 +178,7 @@ class TestEnrichCatalogRequest:
         """Requête valide."""
         request = EnrichCatalogRequest(table_ids=[1, 2, 3])
         assert request.table_ids == [1, 2, 3]
+        assert request.force is False
 
 
 class TestProviderConfigRequest:
@@ -86,6 +86,19 @@ class TestGetDb:
             assert mock_conn.close.called
 
 
+class TestSetAsyncCommit:
+    """Tests de set_async_commit."""
+
+    def test_disables_synchronous_commit_for_transaction(self) -> None:
+        """synchronous_commit désactivé pour la transaction courante uniquement."""
+        from db import set_async_commit
+
+        cursor = MagicMock()
+        set_async_commit(cursor)
+
+        cursor.execute.assert_called_once_with("SET LOCAL synchronous_commit TO OFF")
+
+
 class TestDictRow:
     """Tests de DictRow wrapper."""
 
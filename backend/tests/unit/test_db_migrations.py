@@ -155,7 +155,9 @@ class TestRunMigrations:
             run_migrations(conn)
 
         # Vérifier que INSERT INTO _migrations est appelé
-        insert_calls = [c for c in cursor.execute.call_args_list if "INSERT INTO _migrations" in str(c)]
+        insert_calls = [
+            c for c in cursor.execute.call_args_list if "INSERT INTO _migrations" in str(c)
+        ]
         assert len(insert_calls) == 1
         assert "test_001" in str(insert_calls[0])
 
@@ -299,6 +301,72 @@ class TestIndividualMigrations:
         alter_calls = [c for c in cursor.execute.call_args_list if "ALTER TABLE" in str(c)]
         assert len(alter_calls) == 3
 
+    def test_migration_010_datasource_data_period(self) -> None:
+        """Migration 010: ajoute data_period à datasources."""
+        from db_migrations import _migration_010_datasource_data_period
+
+        cursor = MagicMock()
+
+        with (
+            patch("db_migrations._table_exists", return_value=True),
+            patch("db_migrations._column_exists", return_value=False),
+        ):
+            _migration_010_datasource_data_period(cursor)
+
+        alter_calls = [c for c in cursor.execute.call_args_list if "data_period" in str(c)]
+        assert len(alter_calls) == 1
+
+    def test_migration_011_llm_cache(self) -> None:
+        """Migration 011: crée la table llm_cache."""
+        from db_migrations import _migration_011_llm_cache
+
+        cursor = MagicMock()
+
+        with patch("db_migrations._table_exists", return_value=False):
+            _migration_011_llm_cache(cursor)
+
+        create_calls = [c for c in cursor.execute.call_args_list if "llm_cache" in str(c)]
+        assert len(create_calls) == 1
+
+    def test_migration_011_skips_existing_table(self) -> None:
+        """Migration 011: ne recrée pas une table llm_cache existante."""
+        from db_migrations import _migration_011_llm_cache
+
+        cursor = MagicMock()
+
+        with patch("db_migrations._table_exists", return_value=True):
+            _migration_011_llm_cache(cursor)
+
+        cursor.execute.assert_not_called()
+
+    def test_migration_012_catalog_indexes(self) -> None:
+        """Migration 012: crée l'index tables(name) (synonyms couvert par la 013)."""
+        from db_migrations import _migration_012_catalog_indexes
+
+        cursor = MagicMock()
+
+        with patch("db_migrations._table_exists", return_value=True):
+            _migration_012_catalog_indexes(cursor)
+
+        sql = " ".join(str(c) for c in cursor.execute.call_args_list)
+        assert "idx_tables_name ON tables(name)" in sql
+        assert "synonyms" not in sql
+        assert "UNIQUE" not in sql
+
+    def test_migration_013_synonyms_unique(self) -> None:
+        """Migration 013: dédoublonne puis rend (column_id, term) unique."""
+        from db_migrations import _migration_013_synonyms_unique
+
+        cursor = MagicMock()
+
+        with patch("db_migrations._table_exists", return_value=True):
+            _migration_013_synonyms_unique(cursor)
+
+        statements = [str(c.args[0]) for c in cursor.execute.call_args_list]
+        assert "DELETE FROM synonyms" in statements[0]
+        assert "UNIQUE INDEX IF NOT EXISTS idx_synonyms_column_term" in statements[1]
+        assert len(statements) == 2
+
     def test_migration_skips_if_table_missing(self) -> None:
         """Les migrations skip si la table n'existe pas."""
         from db_migrations import _migration_001_share_token
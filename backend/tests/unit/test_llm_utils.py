@@ -117,6 +117,18 @@ class TestParseLlmJson:
         result = parse_llm_json(content)
         assert result == {"value": 100}
 
+    def test_handles_unclosed_fence(self) -> None:
+        """Gère une balise ``` ouvrante sans fermeture."""
+        content = '```json\n{"value": 1}'
+        result = parse_llm_json(content)
+        assert result == {"value": 1}
+
+    def test_handles_fence_with_surrounding_whitespace(self) -> None:
+        """Gère les espaces autour du bloc markdown."""
+        content = '\n  ```json\n{"items": [1, 2]}\n```  \n'
+        result = parse_llm_json(content)
+        assert result == {"items": [1, 2]}
+
 
 class TestExtractJsonFromLlm:
     """Tests de extract_json_from_llm."""